@@ -0,0 +1,57 @@
+"""
+Compare cold starts of `python -m pathsjson.cli --make-exports` with and
+without the compiled cache on a generated paths.json file.
+
+Usage: python -m benchmarks.bench_compiled [N_PATHS] [RUNS]
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+
+
+def make_data(n):
+    data = OrderedDict([('__ENV', {'VERSION': '1.0.0'}),
+                        ('ROOT', ['$$_IMPLICIT_ROOT', 'data'])])
+    for i in range(n):
+        parent = 'ROOT' if i < 10 else 'P_{}'.format(i // 10)
+        data['P_{}'.format(i)] = ['$' + parent, 'd{}'.format(i), '$$VERSION']
+    return data
+
+
+def run(cwd, env, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.check_call([sys.executable, "-m", "pathsjson.cli",
+                               "--make-exports"], cwd=cwd, env=env,
+                              stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(n=2000, runs=5):
+    root = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(root, ".paths.json"), "w") as fp:
+            json.dump(make_data(n), fp)
+
+        env = dict(os.environ, PWD=root, PYTHONPATH=os.getcwd())
+        print("{} paths, best of {} runs".format(n, runs))
+        print("{:<16} {:>8.1f} ms".format("uncached",
+                                          1e3 * run(root, env, runs)))
+
+        env['PATHSJSON_COMPILED_CACHE'] = os.path.join(root, "cache")
+        run(root, env, 1)  # Warm the cache.
+        print("{:<16} {:>8.1f} ms".format("compiled cache",
+                                          1e3 * run(root, env, runs)))
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:3]])
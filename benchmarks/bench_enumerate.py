@@ -0,0 +1,65 @@
+"""
+Compare `enumerate_path` with `glob` and `os.walk` over a synthetic
+partition tree (days x shards, with unrelated sibling files).
+
+Usage: python -m benchmarks.bench_enumerate [N_DAYS] [N_SHARDS]
+"""
+import glob
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from pathsjson.enumeration import enumerate_path
+from pathsjson.path import Path
+
+
+def make_tree(root, n_days, n_shards):
+    for d in range(n_days):
+        for s in range(n_shards):
+            dir_path = os.path.join(root, "data", "day-{}".format(d),
+                                    "shard-{}".format(s))
+            os.makedirs(dir_path)
+            for name in ["part.csv", "log.txt", "_SUCCESS"]:
+                open(os.path.join(dir_path, name), "w").close()
+        os.makedirs(os.path.join(root, "data", "day-{}".format(d), "tmp"))
+
+
+def walk_and_match(root):
+    regex = re.compile(r"day-([^/]+)/shard-([^/]+)/part\.csv$")
+    found = []
+    for dir_path, _, file_names in os.walk(os.path.join(root, "data")):
+        for name in file_names:
+            if regex.search(os.path.join(dir_path, name)):
+                found.append(os.path.join(dir_path, name))
+    return found
+
+
+def main(n_days=100, n_shards=100):
+    root = tempfile.mkdtemp()
+    try:
+        make_tree(root, n_days, n_shards)
+        path = Path(os.path.join(root, "data", "day-{}", "shard-{}",
+                                 "part.csv"), ['DAY', 'SHARD'], [None, None])
+        pattern = os.path.join(root, "data", "day-*", "shard-*", "part.csv")
+
+        cases = [("os.walk + regex", lambda: walk_and_match(root)),
+                 ("glob", lambda: glob.glob(pattern)),
+                 ("enumerate_path", lambda: list(enumerate_path(path))),
+                 ("enumerate_path DAY=0",
+                  lambda: list(enumerate_path(path, DAY=0)))]
+
+        print("{} days x {} shards".format(n_days, n_shards))
+        for name, f in cases:
+            start = time.perf_counter()
+            n = len(f())
+            elapsed = time.perf_counter() - start
+            print("{:<22} {:>8} files {:>10.1f} ms".format(
+                name, n, 1e3 * elapsed))
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:3]])
@@ -0,0 +1,92 @@
+"""
+Compare the time and peak memory of `expand` + `to_paths` with the old
+deepcopy-and-flatten expansion on deep and wide hierarchies.
+
+Usage: python -m benchmarks.bench_expand [DEPTH] [BREADTH]
+"""
+import copy
+import os
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+from pathsjson.path import Path
+from pathsjson.helpers import (expand, is_env_var, is_path_var, to_paths,
+                               to_requirements_of, topo_sort)
+
+
+def make_data(depth, breadth):
+    """
+    :return: `breadth` chains of `depth` path vars, each using its parent
+    """
+    data = OrderedDict([('__ENV', {'VERSION': '1.0.0'}), ('ROOT', ['root'])])
+    for b in range(breadth):
+        parent = 'ROOT'
+        for d in range(depth):
+            k = 'P_{}_{}'.format(b, d)
+            data[k] = ['$' + parent, 'd{}'.format(d), '$$VERSION']
+            parent = k
+    return data
+
+
+def legacy_expand(data):
+    # The deepcopy-and-flatten implementation that `expand` replaced.
+    data = copy.deepcopy(data)
+    ns = data.pop('__ENV', {})
+    expansion = {}
+    for k in topo_sort(to_requirements_of(data), ns):
+        path = []
+        for el in data[k]:
+            if is_path_var(el):
+                path.extend(ns[el[1:]])
+            elif is_env_var(el):
+                path.append([el[2:], ns.get(el[2:])])
+            else:
+                path.append(el)
+        ns[k], expansion[k] = path, path
+    return OrderedDict((k, expansion[k]) for k in data if k in expansion)
+
+
+def legacy_to_paths(expansion):
+    # The flattening `to_paths` that `compile_expansion` replaced.
+    paths = OrderedDict()
+    for k, path in expansion.items():
+        parts, arg_names, default_args = [], [], []
+        for el in path:
+            if isinstance(el, (list, tuple)):
+                parts.append("{}")
+                arg_names.append(el[0])
+                default_args.append(el[1])
+            else:
+                parts.append(el)
+        paths[k] = Path(os.path.join(*parts), arg_names, default_args)
+    return paths
+
+
+def measure(f, data):
+    start = time.perf_counter()
+    f(data)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    f(data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(depth=200, breadth=20):
+    data = make_data(depth, breadth)
+    print("depth={} breadth={}".format(depth, breadth))
+    for name, f in [('legacy expand', legacy_expand),
+                    ('expand', expand),
+                    ('legacy expand + to_paths',
+                     lambda d: legacy_to_paths(legacy_expand(d))),
+                    ('expand + to_paths', lambda d: to_paths(expand(d)))]:
+        elapsed, peak = measure(f, data)
+        print("{:<26} {:>10.1f} ms {:>10.2f} MiB peak".format(
+            name, 1e3 * elapsed, peak / 2.0 ** 20))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:3]])
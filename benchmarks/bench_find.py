@@ -0,0 +1,72 @@
+"""
+Compare finding the paths.json file of many directories in a deep tree
+with `find_file_asc` and with a shared FileFinder, counting the stats.
+
+Usage: python -m benchmarks.bench_find [N_DIRS] [DEPTH]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+
+def make_tree(root, n_dirs, depth):
+    src_dirs = []
+    for i in range(n_dirs):
+        parts = ["d{}".format(j) for j in range(depth)]
+        src_dir = os.path.join(root, "repo", *(parts + ["leaf{}".format(i)]))
+        os.makedirs(src_dir)
+        src_dirs.append(src_dir)
+    os.mkdir(os.path.join(root, "repo", ".git"))
+    return src_dirs
+
+
+class StatCounter:
+    """Count `os.stat` calls (which `os.path.exists` makes)."""
+
+    def __enter__(self):
+        self.n_calls, self._stat = 0, os.stat
+
+        def stat(*args, **kwargs):
+            self.n_calls += 1
+            return self._stat(*args, **kwargs)
+
+        os.stat = stat
+        return self
+
+    def __exit__(self, *exc_info):
+        os.stat = self._stat
+
+
+def run(label, func, src_dirs):
+    with StatCounter() as counter:
+        start = time.perf_counter()
+        for src_dir in src_dirs:
+            func(src_dir)
+        elapsed = time.perf_counter() - start
+    print("{:<26} {:>8.1f} ms {:>8} stats".format(label, 1e3 * elapsed,
+                                                   counter.n_calls))
+
+
+def main(n_dirs=1000, depth=8):
+    from pathsjson.finder import FileFinder
+    from pathsjson.helpers import find_file_asc
+
+    root = tempfile.mkdtemp()
+    try:
+        src_dirs = make_tree(root, n_dirs, depth)
+        print("{} directories, {} deep".format(n_dirs, depth))
+
+        run("find_file_asc", find_file_asc, src_dirs)
+        run("FileFinder", FileFinder().find, src_dirs)
+        run("FileFinder (boundary)", FileFinder(boundaries=[".git"]).find,
+            src_dirs)
+        run("FileFinder (validate)", FileFinder(validate=True).find,
+            src_dirs)
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:3]])
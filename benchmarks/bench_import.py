@@ -0,0 +1,64 @@
+"""
+Measure import/startup cost with `python -X importtime` and fail if it
+regresses.
+
+Each case runs in a fresh interpreter. A case fails if its cumulative
+import time (best of several runs) exceeds its budget, or if it imports a
+module that should stay deferred.
+
+Usage: python -m benchmarks.bench_import [BUDGET_SCALE]
+"""
+import os
+import re
+import subprocess
+import sys
+
+
+# (name, interpreter args, top-level module, budget in us, deferred modules)
+CASES = [
+    ("import pathsjson.automagic", ["-c", "import pathsjson.automagic"],
+     "pathsjson.automagic", 20000, ["jsonschema", "appdirs"]),
+    ("import pathsjson.cli", ["-c", "import pathsjson.cli"],
+     "pathsjson.cli", 50000,
+     ["jsonschema", "appdirs"]),
+]
+
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)$")
+
+
+def import_times(args):
+    """
+    :return: a map of module => cumulative import time in us
+    """
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    proc = subprocess.run([sys.executable, "-X", "importtime"] + args,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                          universal_newlines=True, env=env)
+    times = {}
+    for line in proc.stderr.splitlines():
+        m = LINE_RE.match(line)
+        if m:
+            times[m.group(4)] = int(m.group(2))
+    return times
+
+
+def main(budget_scale=1.0, runs=5):
+    failed = False
+
+    for name, args, top, budget, deferred in CASES:
+        runs_times = [import_times(args) for _ in range(runs)]
+        best = min(times.get(top, 0) for times in runs_times)
+        imported = sorted(m for m in deferred if m in runs_times[0])
+        ok = best <= budget * budget_scale and not imported
+        failed |= not ok
+
+        print("{:<28} {:>8} us (budget {:>6}) {}".format(
+            name, best, int(budget * budget_scale), "ok" if ok else "FAIL"))
+        if imported:
+            print("    eagerly imported: {}".format(", ".join(imported)))
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main(*[float(x) for x in sys.argv[1:2]])
@@ -0,0 +1,55 @@
+"""
+Compare loading a large paths.json file eagerly and lazily, then
+resolving a few of its paths.
+
+Usage: python -m benchmarks.bench_lazy [N_KEYS] [N_USED]
+"""
+import gc
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+
+
+def make_file(root, n_keys):
+    data = OrderedDict([('__ENV', {'VERSION': '1'}), ('ROOT', ['data'])])
+    for i in range(n_keys):
+        parent = 'ROOT' if i % 20 == 0 else 'K{}'.format(i - 1)
+        data['K{}'.format(i)] = ['$' + parent, '$$VERSION', 'p{}'.format(i)]
+
+    file_path = os.path.join(root, ".paths.json")
+    with open(file_path, "w") as fp:
+        json.dump(data, fp)
+    return file_path
+
+
+def main(n_keys=20000, n_used=10):
+    from pathsjson.impl import PathsJSON
+
+    root = tempfile.mkdtemp()
+    try:
+        file_path = make_file(root, n_keys)
+        used = ['K{}'.format(i * n_keys // n_used) for i in range(n_used)]
+        print("{} keys, {} used".format(n_keys, n_used))
+
+        for label, lazy in [("eager", False), ("lazy", True)]:
+            paths = None
+            gc.collect()
+            start = time.perf_counter()
+            paths = PathsJSON(file_path=file_path, lazy=lazy,
+                              enable_user_global_overrides=False)
+            loaded = time.perf_counter()
+            for k in used:
+                paths[k]
+            done = time.perf_counter()
+            print("{:<6} load {:>8.1f} ms  use {:>7.2f} ms".format(
+                label, 1e3 * (loaded - start), 1e3 * (done - loaded)))
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:3]])
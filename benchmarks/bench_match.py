@@ -0,0 +1,79 @@
+"""
+Match a directory listing against thousands of path templates, comparing
+the index with trying each template's regex in turn.
+
+Usage: python -m benchmarks.bench_match [N_TEMPLATES] [N_ENTRIES]
+"""
+import os
+import re
+import sys
+import time
+from collections import OrderedDict
+
+
+def make_paths(n_templates):
+    from pathsjson.helpers import expand, to_paths
+
+    data = OrderedDict([('__ENV', {'VERSION': '1', 'name': None}),
+                        ('ROOT', ['/srv/data'])])
+    for i in range(n_templates):
+        data['K{}'.format(i)] = ['$ROOT', 'g{}'.format(i % 50),
+                                 'k{}'.format(i), '$$VERSION', '$$name']
+    return to_paths(expand(data))
+
+
+def naive_matcher(paths):
+    templates = []
+    for k, path in paths.items():
+        pattern = "([^/]+?)".join(re.escape(lit)
+                                  for lit in path.path.split("{}"))
+        templates.append((k, re.compile(pattern), path.arg_names))
+
+    def match(path_str):
+        for k, regex, names in templates:
+            m = regex.fullmatch(path_str)
+            if m is not None:
+                return k, dict(zip(names, m.groups()))
+        return None
+
+    return match
+
+
+def main(n_templates=5000, n_entries=100000):
+    from pathsjson.matching import PathMatcher
+
+    paths = make_paths(n_templates)
+    entries = []
+    for i in range(n_entries):
+        j = i * n_templates // n_entries  # Listed directory by directory.
+        entries.append(os.path.join('/srv/data', 'g{}'.format(j % 50),
+                                    'k{}'.format(j), '2', 'f{}'.format(i)))
+    print("{} templates, {} entries".format(n_templates, n_entries))
+
+    start = time.perf_counter()
+    matcher = PathMatcher(paths)
+    built = time.perf_counter()
+    print("index build {:>9.1f} ms".format(1e3 * (built - start)))
+
+    start = time.perf_counter()
+    matched = [matcher.match(p) for p in entries]
+    done = time.perf_counter()
+    print("match       {:>9.2f} us/entry".format(
+        1e6 * (done - start) / n_entries))
+
+    start = time.perf_counter()
+    assert list(matcher.match_many(entries)) == matched
+    done = time.perf_counter()
+    print("match_many  {:>9.2f} us/entry".format(
+        1e6 * (done - start) / n_entries))
+
+    naive, step = naive_matcher(paths), max(1, n_entries // 200)
+    start = time.perf_counter()
+    assert [naive(p) for p in entries[::step]] == matched[::step]
+    done = time.perf_counter()
+    print("naive       {:>9.2f} us/entry".format(
+        1e6 * (done - start) / len(entries[::step])))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:3]])
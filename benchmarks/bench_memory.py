@@ -0,0 +1,64 @@
+"""
+Measure the memory held by many resolutions of one path (e.g. a work
+queue of partition files) with tracemalloc.
+
+Usage: python -m benchmarks.bench_memory [N_RESOLUTIONS] [N_DIRS]
+"""
+import gc
+import sys
+import tracemalloc
+
+
+class DictResolution:
+    # The unslotted Resolution, storing the whole path string.
+
+    def __init__(self, path_str):
+        self._path_str = path_str
+
+
+class FullResolution:
+    # A slotted resolution storing the whole path string, to compare with
+    # Resolution's interned directory and name.
+
+    __slots__ = ('_path_str', '_hash')
+
+    def __init__(self, path_str):
+        self._path_str = path_str
+        self._hash = None
+
+
+def measure(make, path_strs):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        objs = [make(p) for p in path_strs]
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del objs
+    return size
+
+
+def main(n_resolutions=1000000, n_dirs=100):
+    from pathsjson.path import Path
+    from pathsjson.resolution import Resolution
+
+    path = Path("/srv/data/warehouse/events/v1/{}/{}.parquet",
+                ["date", "part"], [None, None])
+    args = [("2019-01-{:02}".format(i % n_dirs), "part-{:07}".format(i))
+            for i in range(n_resolutions)]
+    print("{} resolutions in {} directories".format(n_resolutions, n_dirs))
+
+    # Each resolution makes a fresh path string, as in a real queue.
+    def resolve(make):
+        return lambda a: make(path.resolve(*a))
+
+    for label, make in [("str", str), ("dict", DictResolution),
+                        ("full", FullResolution), ("slotted", Resolution)]:
+        size = measure(resolve(make), args)
+        print("{:<8} {:>8.1f} MB {:>6.0f} B/each".format(
+            label, size / 2 ** 20, size / n_resolutions))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:3]])
@@ -0,0 +1,74 @@
+"""
+Count the stat/mkdir calls made when writing many shard files into a few
+directories, before and after the known-directory cache.
+
+Usage: python -m benchmarks.bench_open_dirs [N_FILES] [N_DIRS]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathsjson.resolution import Resolution, forget_known_dirs
+
+
+@contextmanager
+def counting_syscalls(counts):
+    originals = {name: getattr(os, name) for name in ['stat', 'mkdir']}
+
+    def wrap(name, f):
+        def counted(*args, **kwargs):
+            counts[name] += 1
+            return f(*args, **kwargs)
+        return counted
+
+    for name, f in originals.items():
+        setattr(os, name, wrap(name, f))
+    try:
+        yield counts
+    finally:
+        for name, f in originals.items():
+            setattr(os, name, f)
+
+
+def legacy_open(path_str):
+    # What `Resolution.open` used to do before opening.
+    dir_path = os.path.dirname(path_str)
+    if not os.path.exists(dir_path):
+        try:
+            os.makedirs(dir_path)
+        except OSError:
+            pass
+    return open(path_str, "w")
+
+
+def new_open(path_str):
+    return Resolution(path_str).open("w")
+
+
+def main(n_files=20000, n_dirs=10):
+    print("{} files in {} directories".format(n_files, n_dirs))
+    for name, open_f in [("legacy", legacy_open), ("cached", new_open)]:
+        root = tempfile.mkdtemp()
+        forget_known_dirs()
+        path_strs = [os.path.join(root, "d{}".format(i % n_dirs), "sub",
+                                  "shard-{}.txt".format(i))
+                     for i in range(n_files)]
+        try:
+            counts = Counter()
+            start = time.perf_counter()
+            with counting_syscalls(counts):
+                for path_str in path_strs:
+                    with open_f(path_str) as fp:
+                        fp.write("x")
+            elapsed = time.perf_counter() - start
+            print("{:<8} stat={:<8} mkdir={:<6} {:>8.1f} ms".format(
+                name, counts['stat'], counts['mkdir'], 1e3 * elapsed))
+        finally:
+            shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:3]])
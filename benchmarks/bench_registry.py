@@ -0,0 +1,75 @@
+"""
+Compare loading many projects one PathsJSON at a time with loading them
+through a PathsJSONRegistry.
+
+The user globals file is redirected to a temporary directory (via
+XDG_DATA_HOME, so this measures the Linux layout).
+
+Usage: python -m benchmarks.bench_registry [N_PROJECTS] [N_GLOBALS]
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+
+
+def make_tree(root, n_projects, n_globals):
+    globals_data = OrderedDict([('__ENV', {'SCRATCH': '/scratch'}),
+                                ('SCRATCH_DIR', ['$$SCRATCH', 'me'])])
+    for i in range(n_globals):
+        globals_data['G_{}'.format(i)] = ['$SCRATCH_DIR', 'g{}'.format(i)]
+
+    globals_dir = os.path.join(root, "xdg", "pathsjson")
+    os.makedirs(globals_dir)
+    with open(os.path.join(globals_dir, ".paths.json"), "w") as fp:
+        json.dump(globals_data, fp)
+
+    src_dirs = []
+    for i in range(n_projects):
+        src_dir = os.path.join(root, "projects", "p{}".format(i), "src")
+        os.makedirs(src_dir)
+        with open(os.path.join(src_dir, "..", ".paths.json"), "w") as fp:
+            json.dump({"DATA_DIR": ["$$_IMPLICIT_ROOT", "data"],
+                       "WORK_DIR": ["$G_0", "p{}".format(i)]}, fp)
+        src_dirs.append(src_dir)
+
+    return src_dirs
+
+
+def main(n_projects=500, n_globals=200):
+    root = tempfile.mkdtemp()
+    os.environ['XDG_DATA_HOME'] = os.path.join(root, "xdg")
+    try:
+        src_dirs = make_tree(root, n_projects, n_globals)
+
+        from pathsjson.impl import PathsJSON
+        from pathsjson.registry import PathsJSONRegistry
+
+        print("{} projects, {} global paths".format(n_projects, n_globals))
+
+        start = time.perf_counter()
+        for src_dir in src_dirs:
+            PathsJSON(src_dir=src_dir)
+        elapsed = time.perf_counter() - start
+        print("{:<22} {:>8.1f} ms".format("PathsJSON each", 1e3 * elapsed))
+
+        registry = PathsJSONRegistry()
+        start = time.perf_counter()
+        registry.get_many(src_dirs)
+        elapsed = time.perf_counter() - start
+        print("{:<22} {:>8.1f} ms".format("PathsJSONRegistry", 1e3 * elapsed))
+
+        start = time.perf_counter()
+        registry.get_many(src_dirs)
+        elapsed = time.perf_counter() - start
+        print("{:<22} {:>8.1f} ms".format("  again (unchanged)",
+                                          1e3 * elapsed))
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:3]])
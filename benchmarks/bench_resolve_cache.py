@@ -0,0 +1,40 @@
+"""
+Compare `Path.resolve` with and without a resolve cache.
+
+Usage: python -m benchmarks.bench_resolve_cache [N_DISTINCT_ARGS]
+"""
+import os
+import sys
+import timeit
+from pathsjson.path import Path
+
+
+def make_path(cache_size=None):
+    tmpl = os.path.join("data", "shards", "{}", "{}", "part.csv")
+    return Path(tmpl, ['DAY', 'SHARD'], ['2017-01-01', '0'], cache_size)
+
+
+def main(n_distinct=64, number=200000):
+    args = [('2017-01-{:02d}'.format(1 + i % 28), str(i))
+            for i in range(n_distinct)]
+
+    print("{} calls, {} distinct argument tuples".format(number, n_distinct))
+    for name, cache_size in [('uncached', None), ('cached', 1024)]:
+        path = make_path(cache_size)
+
+        def zero_arg():
+            path.resolve()
+
+        def parametrized(i=[0]):
+            i[0] = (i[0] + 1) % n_distinct
+            path.resolve(*args[i[0]])
+
+        for case, f in [('zero-arg', zero_arg),
+                        ('parametrized', parametrized)]:
+            best = min(timeit.repeat(f, repeat=3, number=number))
+            print("{:<10} {:<14} {:>8.3f} us/call".format(
+                name, case, 1e6 * best / number))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:2]])
@@ -0,0 +1,37 @@
+"""
+Compare per-call resolution with `resolve_many` over many partitions.
+
+Usage: python -m benchmarks.bench_resolve_many [N_ROWS]
+"""
+import os
+import sys
+import time
+from pathsjson.path import Path
+
+
+def main(n=1000000):
+    path = Path(os.path.join("data", "shards", "{}", "{}", "part.csv"),
+                ['DAY', 'SHARD'], ['2017-01-01', '0'])
+    days = ['2017-01-{:02d}'.format(1 + i % 28) for i in range(n)]
+    shards = [str(i % 64) for i in range(n)]
+    rows = list(zip(days, shards))
+
+    cases = [
+        ('per-call resolve', lambda: [path.resolve(*r) for r in rows]),
+        ('resolve_many', lambda: list(path.resolve_many(rows))),
+        ('resolve_many dedup', lambda: list(path.resolve_many(rows, True))),
+        ('resolve_columns', lambda: list(path.resolve_columns([days,
+                                                               shards]))),
+    ]
+
+    print("{} rows".format(n))
+    for name, f in cases:
+        start = time.perf_counter()
+        f()
+        elapsed = time.perf_counter() - start
+        print("{:<20} {:>8.3f} s {:>8.3f} us/row".format(
+            name, elapsed, 1e6 * elapsed / n))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:2]])
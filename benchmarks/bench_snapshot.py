@@ -0,0 +1,49 @@
+"""
+Compare what each worker process pays to get the paths: loading the
+paths.json file, unpickling a PathsJSON, or loading a snapshot (from
+bytes or attached from shared memory).
+
+Usage: python -m benchmarks.bench_snapshot [N_KEYS]
+"""
+import pickle
+import shutil
+import sys
+import tempfile
+import timeit
+
+
+def main(n_keys=2000, repeat=5, number=10):
+    from benchmarks.generators import parametrized, write
+    from pathsjson.impl import PathsJSON
+    from pathsjson.snapshot import PathsSnapshot, SharedSnapshot, attach
+
+    root = tempfile.mkdtemp()
+    try:
+        file_path = write(parametrized(n_keys), root)
+
+        def load():
+            return PathsJSON(file_path=file_path,
+                             enable_user_global_overrides=False)
+
+        paths = load()
+        pickled = pickle.dumps(paths)
+        data = paths.snapshot().to_bytes()
+        print("{} keys: pickled PathsJSON {} KB, snapshot {} KB".format(
+            n_keys, len(pickled) // 1024, len(data) // 1024))
+
+        with SharedSnapshot(paths.snapshot()) as shared:
+            for label, func in [
+                    ("load", load),
+                    ("unpickle PathsJSON", lambda: pickle.loads(pickled)),
+                    ("snapshot from bytes",
+                     lambda: PathsSnapshot.from_bytes(data)),
+                    ("attach shared", lambda: attach(shared.name))]:
+                best = min(timeit.repeat(func, repeat=repeat, number=number))
+                print("{:<22} {:>8.2f} ms".format(label,
+                                                  1e3 * best / number))
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:2]])
@@ -0,0 +1,64 @@
+"""
+Time staleness checks over a chain of build stages fanning out to many
+targets: the first check, a recheck with cached stats, and a recheck after
+rebuilding one target.
+
+Usage: python -m benchmarks.bench_stale [N_TARGETS] [N_STAGES]
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+
+
+def make_tree(root, n_targets, n_stages):
+    data = OrderedDict()
+    for i in range(n_targets):
+        for j in range(n_stages):
+            data['T{}_{}'.format(i, j)] = ["$$_IMPLICIT_ROOT",
+                                           "t{}_{}".format(i, j)]
+
+    with open(os.path.join(root, ".paths.json"), "w") as fp:
+        json.dump(data, fp)
+
+    for k, v in data.items():
+        with open(os.path.join(root, v[1]), "w"):
+            pass
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print("{:<26} {:>8.1f} ms {:>6} stale".format(label, 1e3 * elapsed,
+                                                  len(result)))
+
+
+def main(n_targets=2000, n_stages=3):
+    from pathsjson.impl import PathsJSON
+
+    root = tempfile.mkdtemp()
+    try:
+        make_tree(root, n_targets, n_stages)
+        paths = PathsJSON(src_dir=root, enable_user_global_overrides=False)
+        for i in range(n_targets):
+            for j in range(1, n_stages):
+                paths.depends('T{}_{}'.format(i, j),
+                              'T{}_{}'.format(i, j - 1))
+
+        print("{} targets, {} stages".format(n_targets, n_stages))
+        timed("first check", paths.stale)
+        timed("recheck (cached)", paths.stale)
+
+        os.utime(paths['T0_0'])
+        paths.build.mark_built('T0_0')
+        timed("recheck (one rebuilt)", paths.stale)
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:3]])
@@ -0,0 +1,39 @@
+"""
+Time `topo_sort` over synthetic requirement graphs of growing size.
+
+Usage: python -m benchmarks.bench_topo_sort [MAX_NODES]
+"""
+import random
+import sys
+import timeit
+from pathsjson.helpers import topo_sort
+
+
+def make_requirements(n, max_fan_in=3, seed=0):
+    """
+    :return: a random DAG of n path vars where each var requires up to
+        `max_fan_in` earlier vars
+    """
+    rng = random.Random(seed)
+    names = ['P_{}'.format(i) for i in range(n)]
+    g = {}
+    for i, k in enumerate(names):
+        g[k] = set(rng.sample(names[:i], min(i, rng.randint(0, max_fan_in))))
+    return g
+
+
+def main(max_nodes=100000):
+    n = 10
+    print("{:>8} {:>12} {:>12}".format("nodes", "ms", "us/node"))
+    while n <= max_nodes:
+        g = make_requirements(n)
+        number = max(1, 10000 // n)
+        best = min(timeit.repeat(lambda: topo_sort(g), repeat=3,
+                                 number=number)) / number
+        print("{:>8} {:>12.3f} {:>12.3f}".format(n, 1e3 * best,
+                                                 1e6 * best / n))
+        n *= 10
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:2]])
@@ -0,0 +1,45 @@
+"""
+Compare the structural validator with jsonschema-based validation.
+
+Usage: python -m benchmarks.bench_validation [N_PATHS]
+"""
+import json
+import sys
+import timeit
+from collections import OrderedDict
+from pathsjson.validation import (SCHEMA_FILE, validate_structure,
+                                  validate_strict)
+
+
+def make_data(n):
+    data = OrderedDict()
+    data['__ENV'] = OrderedDict(('VAR_{}'.format(i), str(i))
+                                for i in range(n // 10 + 1))
+    data['ROOT'] = ['root']
+    for i in range(n):
+        data['P_{}'.format(i)] = ['$ROOT', 'dir_{}'.format(i), '$$VAR_0']
+    return data
+
+
+def validate_per_call(data):
+    # What `PathsJSON.reload` used to do on every call.
+    import jsonschema
+    with open(SCHEMA_FILE) as fp:
+        jsonschema.validate(data, json.load(fp))
+
+
+def main(n=1000, repeat=5, number=20):
+    data = make_data(n)
+    cases = [('jsonschema.validate (per call)', validate_per_call),
+             ('cached jsonschema validator', validate_strict),
+             ('structural validator', validate_structure)]
+
+    print("{} paths, best of {} x {} calls".format(n, repeat, number))
+    for name, f in cases:
+        best = min(timeit.repeat(lambda: f(data), repeat=repeat,
+                                 number=number))
+        print("{:<32} {:>10.3f} ms/call".format(name, 1e3 * best / number))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:2]])
@@ -0,0 +1,83 @@
+"""
+Generators of synthetic paths.json data for the benchmarks.
+
+Each returns the data structure (an OrderedDict, `__ENV` first) and is
+deterministic, so results compare across commits.
+"""
+import json
+import os
+from collections import OrderedDict
+
+
+def wide(n_keys=2000):
+    """
+    :return: many path vars, each requiring the same root
+    """
+    data = OrderedDict([('__ENV', {'VERSION': '1'}),
+                        ('ROOT', ['$$_IMPLICIT_ROOT', 'data'])])
+    for i in range(n_keys):
+        data['K{}'.format(i)] = ['$ROOT', '$$VERSION', 'k{}'.format(i)]
+    return data
+
+
+def deep(depth=500):
+    """
+    :return: a chain of path vars, each requiring the previous one
+    """
+    data = OrderedDict([('__ENV', {'VERSION': '1'}),
+                        ('K0', ['$$_IMPLICIT_ROOT', 'data', '$$VERSION'])])
+    for i in range(1, depth):
+        data['K{}'.format(i)] = ['$K{}'.format(i - 1), 'k{}'.format(i)]
+    return data
+
+
+def diamond(n_layers=6, width=200):
+    """
+    :return: layers of path vars, each requiring two of the previous layer
+        (so the expanded paths double in length per layer)
+    """
+    data = OrderedDict([('__ENV', {'VERSION': '1'})])
+    for j in range(width):
+        data['L0_{}'.format(j)] = ['$$_IMPLICIT_ROOT', 'r{}'.format(j)]
+
+    for i in range(1, n_layers):
+        for j in range(width):
+            data['L{}_{}'.format(i, j)] = [
+                '$L{}_{}'.format(i - 1, j),
+                '$L{}_{}'.format(i - 1, (j + 1) % width),
+                '$$VERSION']
+    return data
+
+
+def parametrized(n_keys=1000, n_args=4):
+    """
+    :return: path vars with many arguments: an implicit one with a
+        default, a plain one with a default and required ones
+    """
+    env = OrderedDict([('_VERSION', '1'), ('SHARD', '0')])
+    arg_names = ['a{}'.format(i) for i in range(n_args)]
+    env.update((name, None) for name in arg_names)
+
+    data = OrderedDict([('__ENV', env),
+                        ('ROOT', ['$$_IMPLICIT_ROOT', 'data'])])
+    for i in range(n_keys):
+        parts = ['$ROOT', '$$_VERSION', 'k{}'.format(i)]
+        for name in arg_names:
+            parts.extend(['$$' + name, 'd'])
+        parts.append('$$SHARD')
+        data['K{}'.format(i)] = parts
+    return data
+
+
+SHAPES = OrderedDict([('wide', wide), ('deep', deep), ('diamond', diamond),
+                      ('parametrized', parametrized)])
+
+
+def write(data, dir_path, name=".paths.json"):
+    """
+    :return: the path of the paths.json file written into the directory
+    """
+    file_path = os.path.join(dir_path, name)
+    with open(file_path, "w") as fp:
+        json.dump(data, fp)
+    return file_path
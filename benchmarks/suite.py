@@ -0,0 +1,270 @@
+"""
+Run the benchmark suite over generated paths.json files, save the results
+as JSON and compare them with a saved baseline.
+
+Every result is the best time per operation in seconds. The cases cover
+cold imports, `reload`, `expand`, `topo_sort`, `all_resolvable_paths`,
+single and batch resolution, and the CLI exports, over wide, deep,
+diamond and parametrized path graphs (see `benchmarks.generators`).
+
+Usage: python -m benchmarks.suite [--quick] [--only PATTERN]
+           [--save FILE] [--compare BASELINE] [--threshold RATIO]
+
+For example, to check a change for regressions,
+
+    git stash && python -m benchmarks.suite --save base.json
+    git stash pop && python -m benchmarks.suite --compare base.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+
+
+def best(func, repeat=5, min_time=0.05):
+    """
+    :return: the best time per call of func in seconds, calling it enough
+        times per round to take at least min_time
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    return min(timer.repeat(repeat, number)) / number
+
+
+def best_run(args, cwd, env, repeat=5):
+    """
+    :return: the best wall time of running a command in seconds
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.check_call(args, cwd=cwd, env=env,
+                              stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def import_cases(ctx):
+    from benchmarks.bench_import import CASES, import_times
+
+    for name, args, top, _, _ in CASES:
+        yield name.replace(" ", "."), lambda: 1e-6 * min(
+            import_times(args).get(top, 0) for _ in range(ctx.repeat))
+
+
+def load_cases(ctx):
+    from pathsjson.helpers import expand, to_requirements_of, topo_sort
+    from pathsjson.impl import PathsJSON
+
+    for shape, file_path in ctx.files:
+        paths = PathsJSON(file_path=file_path,
+                          enable_user_global_overrides=False)
+        src = paths._src
+        requirements = to_requirements_of(src)
+
+        yield "reload." + shape, lambda: best(paths.reload, ctx.repeat)
+        yield "expand." + shape, lambda: best(lambda: expand(src),
+                                              ctx.repeat)
+        yield "topo_sort." + shape, lambda: best(
+            lambda: topo_sort(requirements, src['__ENV']), ctx.repeat)
+        yield "all_resolvable_paths." + shape, lambda: best(
+            lambda: paths.all_resolvable_paths, ctx.repeat)
+
+
+def resolve_cases(ctx):
+    from pathsjson.impl import PathsJSON
+
+    files = dict(ctx.files)
+    wide = PathsJSON(file_path=files['wide'],
+                     enable_user_global_overrides=False)
+    deep = PathsJSON(file_path=files['deep'],
+                     enable_user_global_overrides=False)
+    params = PathsJSON(file_path=files['parametrized'],
+                       enable_user_global_overrides=False)
+
+    last = 'K{}'.format(ctx.depth - 1)
+    args = ('x', 'y', 'z', 'w')
+    arg_sets = [('2019-01-{:02}'.format(i % 28), str(i), 'z', 'w')
+                for i in range(ctx.batch)]
+
+    yield "resolve.constant", lambda: best(lambda: wide['K0'], ctx.repeat)
+    yield "resolve.deep", lambda: best(lambda: deep[last], ctx.repeat)
+    yield "resolve.defaults", lambda: best(
+        lambda: wide.resolve_path('K0', VERSION='2'), ctx.repeat)
+    yield "resolve.parametrized", lambda: best(
+        lambda: params.resolve_path('K0', *args), ctx.repeat)
+    yield "resolve_many.parametrized", lambda: best(
+        lambda: params.resolve_many('K0', arg_sets), ctx.repeat) / ctx.batch
+
+
+def cli_cases(ctx):
+    shape, file_path = ctx.files[0]
+    cwd = os.path.dirname(file_path)
+    env = dict(os.environ, PWD=cwd, PYTHONPATH=os.getcwd(),
+               XDG_DATA_HOME=os.path.join(ctx.root, "xdg"))
+    env.pop('PATHSJSON_COMPILED_CACHE', None)
+
+    for flag in ['--shell-exports', '--make-exports']:
+        args = [sys.executable, "-m", "pathsjson.cli", flag]
+        yield "cli.{}.{}".format(flag[2:].replace("-", "_"), shape), \
+            lambda: best_run(args, cwd, env, ctx.repeat)
+
+
+# Each yields (name, measure) pairs, where measure() returns the seconds
+# per operation. It's called before the generator resumes, so closing
+# over loop variables is fine.
+CASES = [import_cases, load_cases, resolve_cases, cli_cases]
+
+
+class Context:
+    """
+    The generated files and sizes shared by the cases.
+    """
+
+    def __init__(self, root, quick=False):
+        from benchmarks.generators import SHAPES, write
+
+        scale = 10 if quick else 1
+        self.root = root
+        self.repeat = 3 if quick else 5
+        self.depth = 500 // scale
+        self.batch = 10000 // scale
+        sizes = {'wide': (2000 // scale,), 'deep': (self.depth,),
+                 'diamond': (6, 200 // scale),
+                 'parametrized': (1000 // scale,)}
+
+        self.files = []
+        for shape, generate in SHAPES.items():
+            dir_path = os.path.join(root, shape)
+            os.makedirs(dir_path)
+            self.files.append((shape, write(generate(*sizes[shape]),
+                                            dir_path)))
+
+
+def run(quick=False, only=None):
+    """
+    :param quick: if True, use smaller inputs and fewer rounds
+    :param only: if given, an fnmatch pattern of the cases to run
+    :return: an OrderedDict of case => seconds per operation
+    """
+    root = tempfile.mkdtemp()
+    try:
+        ctx = Context(root, quick)
+        results = OrderedDict()
+        for cases in CASES:
+            for name, measure in cases(ctx):
+                if only is None or fnmatchcase(name, only):
+                    seconds = results[name] = measure()
+                    print("{:<36} {:>12}".format(name, format_time(seconds)))
+                    sys.stdout.flush()
+        return results
+    finally:
+        shutil.rmtree(root)
+
+
+def format_time(seconds):
+    for unit, scale in [("s", 1), ("ms", 1e-3), ("us", 1e-6)]:
+        if seconds >= scale:
+            return "{:.2f} {}".format(seconds / scale, unit)
+    return "{:.1f} ns".format(seconds / 1e-9)
+
+
+def metadata(quick):
+    try:
+        commit = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            stderr=subprocess.DEVNULL, universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return OrderedDict([('commit', commit),
+                        ('date', time.strftime("%Y-%m-%dT%H:%M:%S")),
+                        ('python', platform.python_version()),
+                        ('platform', platform.platform()),
+                        ('quick', quick)])
+
+
+def compare(results, baseline, threshold):
+    """
+    Print the ratio of each result to its baseline.
+
+    :return: the names of the cases slower than threshold times the
+        baseline
+    """
+    regressions = []
+    print("\n{:<36} {:>12} {:>12} {:>7}".format("case", "baseline", "now",
+                                                 "ratio"))
+    for name, seconds in results.items():
+        old = baseline.get(name)
+        if not old:
+            continue
+        ratio = seconds / old
+        slow = ratio > threshold
+        if slow:
+            regressions.append(name)
+        print("{:<36} {:>12} {:>12} {:>6.2f}x{}".format(
+            name, format_time(old), format_time(seconds), ratio,
+            "  REGRESSION" if slow else ""))
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.suite",
+        description="Benchmark pathsjson over generated paths.json files")
+    parser.add_argument('--quick', action='store_true',
+                        help='Use smaller inputs and fewer rounds')
+    parser.add_argument('--only', metavar='PATTERN',
+                        help='Only run the cases matching this fnmatch '
+                             'pattern')
+    parser.add_argument('--save', metavar='FILE',
+                        help='Save the results as JSON')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='Compare with saved results, exiting with 1 on '
+                             'regressions')
+    parser.add_argument('--threshold', metavar='RATIO', type=float,
+                        default=1.5,
+                        help='The slowdown over the baseline that counts as '
+                             'a regression (default 1.5)')
+    args = parser.parse_args(args)
+
+    baseline = None
+    if args.compare is not None:
+        with open(args.compare) as fp:
+            baseline = json.load(fp)
+        if baseline['meta'].get('quick') != args.quick:
+            parser.error("The baseline was {}run with --quick".format(
+                "" if baseline['meta'].get('quick') else "not "))
+
+    results = run(args.quick, args.only)
+
+    if args.save is not None:
+        with open(args.save, "w") as fp:
+            json.dump(OrderedDict([('meta', metadata(args.quick)),
+                                   ('results', results)]), fp, indent=2)
+
+    if baseline is not None:
+        meta = baseline['meta']
+        if (meta.get('python'), meta.get('platform')) != (
+                platform.python_version(), platform.platform()):
+            print("\nNote: the baseline ran on Python {} ({})".format(
+                meta.get('python'), meta.get('platform')))
+
+        regressions = compare(results, baseline['results'], args.threshold)
+        if regressions:
+            print("\n{} regression(s): {}".format(len(regressions),
+                                                 ", ".join(regressions)))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
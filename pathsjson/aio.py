@@ -0,0 +1,245 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from pathsjson.impl import PathsJSON
+from pathsjson.resolution import (Resolution, check_created, ensure_dir,
+                                  leaf_dirs)
+from pathsjson.slots import assign
+
+
+# Python 3.6 lacks get_running_loop, but its get_event_loop doesn't warn.
+_get_running_loop = getattr(asyncio, 'get_running_loop',
+                            asyncio.get_event_loop)
+
+
+def _run(executor, func, *args, **kwargs):
+    loop = _get_running_loop()
+    return loop.run_in_executor(executor,
+                                functools.partial(func, *args, **kwargs))
+
+
+class AsyncFile:
+    """
+    A file whose blocking calls run in a thread pool.
+
+    :param fp: the (blocking) file object
+    :param executor: the executor to run its calls in
+    """
+
+    def __init__(self, fp, executor=None):
+        self.fp = fp
+        self._executor = executor
+
+    def read(self, *args):
+        return _run(self._executor, self.fp.read, *args)
+
+    def readline(self, *args):
+        return _run(self._executor, self.fp.readline, *args)
+
+    def readlines(self, *args):
+        return _run(self._executor, self.fp.readlines, *args)
+
+    def write(self, data):
+        return _run(self._executor, self.fp.write, data)
+
+    def writelines(self, lines):
+        return _run(self._executor, self.fp.writelines, lines)
+
+    def flush(self):
+        return _run(self._executor, self.fp.flush)
+
+    def seek(self, *args):
+        return _run(self._executor, self.fp.seek, *args)
+
+    def close(self):
+        return _run(self._executor, self.fp.close)
+
+
+class _AsyncOpen:
+
+    def __init__(self, resolution, args, kwargs):
+        self._resolution = resolution
+        self._args = args
+        self._kwargs = kwargs
+        self._file = None
+
+    async def __aenter__(self):
+        res = self._resolution
+        fp = await _run(res.executor, res._open, *self._args, **self._kwargs)
+        self._file = AsyncFile(fp, res.executor)
+        return self._file
+
+    async def __aexit__(self, *exc_info):
+        await self._file.close()
+
+
+class AsyncResolution(Resolution):
+    """
+    A Resolution whose file helpers don't block the event loop.
+
+    :param path_str: the resolved path string
+    :param executor: the executor to run blocking calls in (the loop's
+        default executor if None)
+    """
+
+    __slots__ = ('executor',)
+
+    def __init__(self, path_str, executor=None):
+        super().__init__(path_str)
+        assign(self, executor=executor)
+
+    def open(self, *args, **kwargs):
+        """
+        Opens the file and creates its directory if nessessary (see
+        `Resolution.open`), off the event loop.
+
+        Use as `async with res.open() as fp`, where `fp` is an AsyncFile.
+
+        :param args: passed to open
+        :param kwargs: passed to open
+        """
+        return _AsyncOpen(self, args, kwargs)
+
+
+async def ensure_dirs_async(dir_paths, executor=None):
+    """
+    Create many directories concurrently (see `ensure_dirs`).
+
+    :param dir_paths: the directory paths
+    :param executor: the executor to create them in (the loop's default
+        executor if None)
+    :return: the created (or existing) directories that were needed
+    :raises OSError: listing every directory that couldn't be created
+    """
+    leaves = leaf_dirs(dir_paths)
+    results = await asyncio.gather(*[_run(executor, ensure_dir, p)
+                                     for p in leaves])
+    check_created(leaves, results)
+    return leaves
+
+
+class AsyncPathsJSON:
+    """
+    A PathsJSON whose loading (finding, reading and parsing the paths.json
+    and user globals files) runs in a bounded thread pool.
+
+    Resolution stays synchronous since it doesn't touch the file system.
+    Call `load` before resolving and `reload_if_changed` to pick up
+    changes (`auto_reload` isn't supported since it would block).
+
+    :param max_workers: the size of the thread pool
+    :param executor: an executor to use instead of a new thread pool
+    :param options: passed to PathsJSON
+    """
+
+    def __init__(self, file_path=None, src_dir=None, max_workers=4,
+                 executor=None, **options):
+        if options.get('auto_reload'):
+            raise ValueError("auto_reload isn't supported, "
+                             "await reload_if_changed() instead")
+
+        self._file_path = file_path
+        self._src_dir = src_dir
+        self._options = options
+        self._own_executor = executor is None
+        self._executor = (ThreadPoolExecutor(max_workers)
+                          if executor is None else executor)
+        self._paths_json = None
+
+    @property
+    def executor(self):
+        return self._executor
+
+    @property
+    def is_loaded(self):
+        return self._paths_json is not None
+
+    @property
+    def paths_json(self):
+        """The loaded PathsJSON."""
+        if self._paths_json is None:
+            raise RuntimeError("Not loaded, await load() first")
+        return self._paths_json
+
+    async def load(self):
+        """
+        Load (or reload) the path definitions.
+
+        :return: self
+        """
+        if self._paths_json is None:
+            self._paths_json = await _run(self._executor, PathsJSON,
+                                          file_path=self._file_path,
+                                          src_dir=self._src_dir,
+                                          **self._options)
+        else:
+            await _run(self._executor, self._paths_json.reload)
+        return self
+
+    async def reload_if_changed(self):
+        """
+        :return: True if the definitions were reloaded, otherwise False
+            (see `PathsJSON.reload_if_changed`)
+        """
+        return await _run(self._executor, self.paths_json.reload_if_changed)
+
+    async def ensure_dirs(self, keys=None, parents=False):
+        """
+        Create the directories of many path vars concurrently.
+
+        :param keys: the path vars (resolved with their defaults) or None
+            for all resolvable paths
+        :param parents: if True, create the parent directory of each path
+            (i.e. the paths are files), otherwise the path itself
+        :return: the directories that were needed (see `ensure_dirs`)
+        """
+        return await ensure_dirs_async(
+            self.paths_json._dir_paths(keys, parents), self._executor)
+
+    async def enumerate(self, k, **fixed_args):
+        """
+        :return: the list of (path string, {arg name: value}) pairs of
+            existing files (see `PathsJSON.enumerate`)
+        """
+        matches = self.paths_json.enumerate(k, **fixed_args)
+        return await _run(self._executor, list, matches)
+
+    async def close(self):
+        """
+        Shut down the thread pool, unless it was given.
+        """
+        if self._own_executor:
+            await _run(None, self._executor.shutdown)
+
+    async def __aenter__(self):
+        return await self.load()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def __getitem__(self, args):
+        return self.paths_json[args]
+
+    def resolve_path(self, k, *args, **kwargs):
+        return self.paths_json.resolve_path(k, *args, **kwargs)
+
+    def resolve_many(self, k, arg_sets=None, columns=None, dedup=False,
+                     stream=False):
+        return self.paths_json.resolve_many(k, arg_sets, columns, dedup,
+                                            stream)
+
+    def resolve(self, k, *args, **kwargs):
+        return AsyncResolution(self.resolve_path(k, *args, **kwargs),
+                               self._executor)
+
+    @property
+    def all_resolvable_paths(self):
+        return self.paths_json.all_resolvable_paths
+
+    def _ipython_key_completions_(self):
+        return self.paths_json._ipython_key_completions_()
+
+    def __repr__(self):
+        if self._paths_json is None:
+            return "AsyncPathsJSON(<not loaded>)"
+        return "Async" + repr(self._paths_json)
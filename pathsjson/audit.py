@@ -0,0 +1,95 @@
+import os
+import stat
+import time
+from collections import namedtuple
+from pathsjson.enumeration import enumerate_path
+from pathsjson.helpers import map_concurrently
+
+
+PathStat = namedtuple('PathStat', ['key', 'path', 'args', 'exists', 'is_dir',
+                                   'size', 'mtime', 'empty'])
+
+AuditReport = namedtuple('AuditReport', ['entries', 'missing', 'empty',
+                                         'stale', 'elapsed'])
+
+
+def stat_path(key, path_str, args=None):
+    """
+    :param key: the path var
+    :param path_str: its resolved path string
+    :param args: the arguments it was resolved with
+    :return: the PathStat of the path. A directory is empty if it has no
+        entries and a file if it has no bytes.
+    """
+    args = {} if args is None else args
+
+    try:
+        st = os.stat(path_str)
+    except OSError:
+        return PathStat(key, path_str, args, False, False, None, None, False)
+
+    is_dir = stat.S_ISDIR(st.st_mode)
+    if is_dir:
+        try:
+            with os.scandir(path_str) as entries:
+                empty = next(entries, None) is None
+        except OSError:
+            empty = False
+    else:
+        empty = st.st_size == 0
+
+    return PathStat(key, path_str, args, True, is_dir, st.st_size,
+                    st.st_mtime, empty)
+
+
+def _instances(item):
+    k, path = item
+    return [(k, path_str, args) for path_str, args in enumerate_path(path)]
+
+
+def audit_paths(paths, instances=False, max_workers=16, max_age=None,
+                now=None):
+    """
+    Stat many paths concurrently.
+
+    :param paths: a mapping of path var => Path
+    :param instances: if True, audit every existing instance of the
+        parametrized paths (see `enumerate_path`) instead of their
+        resolution with defaults
+    :param max_workers: the number of threads to stat (and enumerate)
+        with, or None to run serially
+    :param max_age: if given, paths last modified more than this many
+        seconds ago are stale
+    :param now: the time to measure ages from (`time.time()` by default)
+    :return: an AuditReport of every entry and the missing, empty and
+        stale ones (as lists of PathStat) and the elapsed seconds
+    """
+    start = time.perf_counter()
+
+    items, parametrized = [], []
+    for k, path in paths.items():
+        if instances and path.arg_names:
+            parametrized.append((k, path))
+            continue
+
+        try:
+            items.append((k, path.resolve(), {}))
+        except (TypeError, ValueError):  # Missing non-default arg
+            pass
+
+    for found in map_concurrently(_instances, parametrized, max_workers):
+        items.extend(found)
+
+    entries = map_concurrently(lambda item: stat_path(*item), items,
+                               max_workers)
+
+    stale = []
+    if max_age is not None:
+        cutoff = (time.time() if now is None else now) - max_age
+        stale = [e for e in entries if e.exists and e.mtime < cutoff]
+
+    return AuditReport(entries,
+                       [e for e in entries if not e.exists],
+                       [e for e in entries if e.empty],
+                       stale,
+                       time.perf_counter() - start)
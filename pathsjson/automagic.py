@@ -1,9 +1,34 @@
 import os
-from pathsjson.impl import PathsJSON
+from pathsjson.lazy import LazyPathsJSON
 
 
 ###############################################################################
 # Load the `.paths.json` file in this PWD or the ancestors of the
-# PWD with (sensible) defaults.
+# PWD with (sensible) defaults -- on first use, so importing is cheap.
+#
+# Set PATHSJSON_COMPILED_CACHE to 1 (or a directory) to reuse the loaded
+# paths across processes (see `PathsJSON`'s `compiled_cache`).
 ###############################################################################
-PATHS = PathsJSON(src_dir=os.environ.get('PWD', os.getcwd()))
+SRC_DIR = os.environ.get('PWD', os.getcwd())
+
+COMPILED_CACHE = os.environ.get('PATHSJSON_COMPILED_CACHE', '')
+
+
+def load(**options):
+    """
+    :param options: passed to PathsJSON
+    :return: a PathsJSON loaded like `PATHS`
+    """
+    from pathsjson.impl import PathsJSON
+
+    compiled_cache = COMPILED_CACHE
+    if compiled_cache.lower() in ('', '0', 'false'):
+        compiled_cache = False
+    elif compiled_cache.lower() in ('1', 'true'):
+        compiled_cache = True
+
+    options.setdefault('compiled_cache', compiled_cache)
+    return PathsJSON(src_dir=SRC_DIR, **options)
+
+
+PATHS = LazyPathsJSON(load)
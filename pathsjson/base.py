@@ -0,0 +1,87 @@
+from collections import OrderedDict
+from pathsjson.resolution import Resolution
+
+
+class BasePaths:
+    """
+    Resolution over a mapping of path var => Path (`self._paths`), shared
+    by PathsJSON and PathsSnapshot.
+
+    Subclasses can hook `_check_reload` (called before each use) and
+    `_count_resolves` (called with the number of paths resolved).
+    """
+
+    __slots__ = ()
+
+    def _check_reload(self):
+        pass
+
+    def _count_resolves(self, n):
+        pass
+
+    def __getitem__(self, args):
+        self._check_reload()
+        self._count_resolves(1)
+
+        if isinstance(args, tuple):
+            return self._paths[args[0]].resolve(*args[1:])
+        else:
+            return self._paths[args].resolve()
+
+    def resolve_path(self, k, *args, **kwargs):
+        self._check_reload()
+        self._count_resolves(1)
+        return self._paths[k].resolve(*args, **kwargs)
+
+    def resolve_many(self, k, arg_sets=None, columns=None, dedup=False,
+                     stream=False):
+        """
+        Resolve one path for many argument sets.
+
+        :param k: the path var
+        :param arg_sets: an iterable of argument sets (see
+            `Path.resolve_many`)
+        :param columns: columnar arguments instead of `arg_sets` (see
+            `Path.resolve_columns`)
+        :param dedup: if True, repeated argument sets are resolved once
+        :param stream: if True, return a generator instead of a list
+        :return: the path strings in input order
+        """
+        if (arg_sets is None) == (columns is None):
+            raise TypeError("Expected exactly one of arg_sets or columns")
+
+        self._check_reload()
+        path = self._paths[k]
+
+        if columns is not None:
+            path_strs = path.resolve_columns(columns, dedup)
+        else:
+            path_strs = path.resolve_many(arg_sets, dedup)
+
+        if stream:
+            return path_strs
+
+        path_strs = list(path_strs)
+        self._count_resolves(len(path_strs))
+        return path_strs
+
+    def resolve(self, k, *args, **kwargs):
+        return Resolution(self.resolve_path(k, *args, **kwargs))
+
+    @property
+    def all_resolvable_paths(self):
+        self._check_reload()
+        paths = OrderedDict()
+        for k, path in self._paths.items():
+            try:
+                paths[k] = path.resolve()
+            except (TypeError, ValueError):  # Missing non-default arg
+                pass
+        return paths
+
+    def _ipython_key_completions_(self):
+        return list(self._paths)
+
+    def __repr__(self):
+        ks = sorted(list(self._paths))
+        return "{}($keys=[{}])".format(type(self).__name__, ", ".join(ks))
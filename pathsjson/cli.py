@@ -2,7 +2,16 @@ import argparse
 import json
 import os
 import sys
-from pathsjson.impl import *
+from collections import OrderedDict
+from pathsjson.helpers import (create_user_globals_file, find_file_asc,
+                               get_user_globals_path)
+
+
+# The mutually exclusive flags, as opposed to options of a command.
+COMMANDS = ['init', 'init_globals', 'make_exports', 'print_global_path',
+            'shell_exports', 'audit', 'serve', 'get']
+
+EXPORT_FORMATS = {'shell': 'export {}="{}"', 'make': '{}?={}', 'env': '{}={}'}
 
 
 def extract_command(args):
@@ -28,11 +37,57 @@ def extract_command(args):
                         action='store_true',
                         help='Print exports for shell')
 
+    parser.add_argument('--audit',
+                        action='store_true',
+                        help='Report missing, empty and stale paths')
 
+    parser.add_argument('--instances',
+                        action='store_true',
+                        help='With --audit, audit every existing instance '
+                             'of parametrized paths')
+
+    parser.add_argument('--max-age',
+                        type=float,
+                        metavar='SECONDS',
+                        help='With --audit, report paths last modified '
+                             'longer ago as stale')
+
+    parser.add_argument('--serve',
+                        action='store_true',
+                        help='Run a resolver daemon for the .paths.json file '
+                             'on a Unix socket')
+
+    parser.add_argument('--daemon',
+                        action='store_true',
+                        help='Answer via the resolver daemon if it runs')
+
+    parser.add_argument('--get',
+                        nargs='+',
+                        metavar='KEY',
+                        help='Print one path: KEY [ARGS...], with NAME=VALUE '
+                             'args passed by name')
+
+    parser.add_argument('--keys',
+                        metavar='PATTERN',
+                        help='Print (or export) only the paths whose keys '
+                             'match the (fnmatch) PATTERN')
+
+    parser.add_argument('--json',
+                        action='store_true',
+                        help='Print paths as JSON')
+
+    parser.add_argument('--null-separated',
+                        action='store_true',
+                        help='End each printed path with NUL, not newline')
+
+    parser.add_argument('--profile',
+                        action='store_true',
+                        help='Print the time each phase of loading took '
+                             '(to stderr)')
 
     args = parser.parse_args(args)
 
-    n_set = sum(getattr(args, k) for k in dir(args) if not k.startswith('_'))
+    n_set = sum(bool(getattr(args, k)) for k in COMMANDS)
 
     if args.print_global_path or n_set > 1:
         print(get_user_globals_path())
@@ -41,24 +96,187 @@ def extract_command(args):
     return args
 
 
+def print_audit(report):
+    for label, entries in [('MISSING', report.missing),
+                           ('EMPTY', report.empty),
+                           ('STALE', report.stale)]:
+        for entry in entries:
+            print('{:<8}{} {}'.format(label, entry.key, entry.path))
+
+    print('{} paths: {} missing, {} empty, {} stale ({:.2f}s)'.format(
+        len(report.entries), len(report.missing), len(report.empty),
+        len(report.stale), report.elapsed))
+
+
+def profile_loads():
+    """
+    Print the phase breakdown of every load to stderr.
+    """
+    from pathsjson.stats import AUDIT_EVENT, LOGGER_NAME
+
+    def hook(event, args):
+        if event == AUDIT_EVENT:
+            sys.stderr.write(args[0].format() + "\n")
+
+    addaudithook = getattr(sys, 'addaudithook', None)  # Python 3.8+
+    if addaudithook is not None:
+        addaudithook(hook)
+        return
+
+    # Loads are logged too, which works on every version.
+    import logging
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.addHandler(logging.StreamHandler(sys.stderr))
+    logger.setLevel(logging.DEBUG)
+
+
+def find_paths_file():
+    from pathsjson.automagic import SRC_DIR
+    return find_file_asc(SRC_DIR)
+
+
+def ask_daemon(words):
+    """
+    :return: the answer of the resolver daemon of the .paths.json file or
+        None if it isn't running
+    """
+    from pathsjson.daemon import request, socket_path_for
+
+    file_path = find_paths_file()
+    if file_path is None:
+        return None
+
+    try:
+        return request(socket_path_for(file_path), words)
+    except OSError:
+        return None
+
+
+def load_paths(keys=None):
+    """
+    :param keys: the path vars (or patterns) needed, or None for all
+    :return: the PathsJSON of the .paths.json file, only expanding what
+        the keys require
+    """
+    if keys is None:
+        from pathsjson.automagic import PATHS
+        return PATHS
+
+    from pathsjson.automagic import load
+    return load(only=keys)
+
+
+def format_paths(paths, style, null_separated=False):
+    """
+    :param paths: a mapping of path var => path string
+    :param style: 'json' or one of EXPORT_FORMATS
+    :param null_separated: if True, end each line with NUL
+    :return: the formatted paths
+    """
+    if style == 'json':
+        return json.dumps(paths, indent=4) + "\n"
+
+    fmt = EXPORT_FORMATS[style] + ("\0" if null_separated else "\n")
+    return "".join(fmt.format(k, v) for k, v in paths.items())
+
+
+def print_paths(style, pattern=None, null_separated=False, use_daemon=False):
+    if use_daemon and pattern is None and style in ('shell', 'make') and \
+            not null_separated:
+        answer = ask_daemon(['{}-exports'.format(style)])
+        if answer is not None:
+            sys.stdout.write(answer)
+            return
+
+    paths = load_paths(None if pattern is None else [pattern])
+    resolvable = paths.all_resolvable_paths
+    if pattern is not None:
+        from fnmatch import fnmatchcase
+        resolvable = OrderedDict((k, v) for k, v in resolvable.items()
+                                 if fnmatchcase(k, pattern))
+
+    sys.stdout.write(format_paths(resolvable, style, null_separated))
+
+
+def get_path(words, use_daemon=False):
+    """
+    :param words: the path var and its args (NAME=VALUE for named args)
+    :return: the resolved path
+    """
+    from pathsjson.daemon import split_args
+
+    if use_daemon and all(len(word.split()) == 1 for word in words):
+        answer = ask_daemon(['get'] + list(words))
+        if answer is not None:
+            return answer[:-1]
+
+    k, (path_args, kwargs) = words[0], split_args(words[1:])
+    try:
+        return load_paths([k]).resolve_path(k, *path_args, **kwargs)
+    except KeyError:
+        raise LookupError("No path var {}".format(k))
+
+
+def print_path(path_str, as_json=False, null_separated=False):
+    if as_json:
+        sys.stdout.write(json.dumps(path_str) + "\n")
+    else:
+        sys.stdout.write(path_str + ("\0" if null_separated else "\n"))
+
+
+def serve():
+    from pathsjson.daemon import serve
+
+    file_path = find_paths_file()
+    if file_path is None:
+        raise IOError("No `.paths.json` file found!")
+
+    def ready(socket_path):
+        sys.stderr.write("Serving {} on {}\n".format(file_path, socket_path))
+        sys.stderr.flush()
+
+    serve(file_path, ready=ready)
+
+
 def _main(args=None):
     args = extract_command(args)
 
-    if args.shell_exports:
-        from pathsjson.automagic import PATHS
+    if args.profile:
+        profile_loads()
+        args.daemon = False  # Profile the load it would skip.
 
-        for k, v in PATHS.all_resolvable_paths.items():
-            print('export {}="{}"'.format(k, v))
+    if args.get:
+        print_path(get_path(args.get, args.daemon), args.json,
+                   args.null_separated)
         sys.exit(0)
 
+    if args.shell_exports:
+        style = 'shell'
     # https://stackoverflow.com/questions/16656789/import-environment-settings-into-makefile-ubuntu-and-osx
-    if args.make_exports:
-        from pathsjson.automagic import PATHS
+    elif args.make_exports:
+        style = 'make'
+    elif args.keys is not None:
+        style = 'env'
+    else:
+        style = None
+
+    if style is not None:
+        print_paths('json' if args.json else style, args.keys,
+                    args.null_separated, args.daemon)
+        sys.exit(0)
 
-        for k, v in PATHS.all_resolvable_paths.items():
-            print('{}?={}'.format(k, v))
+    if args.serve:
+        serve()
         sys.exit(0)
 
+    if args.audit:
+        from pathsjson.automagic import PATHS
+
+        report = PATHS.audit(instances=args.instances, max_age=args.max_age)
+        print_audit(report)
+        sys.exit(1 if report.missing else 0)
+
     if args.init_globals:
         print(create_user_globals_file())
         sys.exit(0)
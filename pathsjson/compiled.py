@@ -0,0 +1,164 @@
+import marshal
+import os
+import sys
+import zlib
+from collections import OrderedDict
+from pathsjson.helpers import env_fingerprint
+from pathsjson.path import Path
+
+
+# Bump whenever the record layout (of compiled files or snapshots) or
+# Path's state changes.
+FORMAT_VERSION = 1
+
+
+def _dedup(obj, seen):
+    """
+    :return: the object with equal strings and tuples replaced by one
+        instance, which marshal then writes once and references
+    """
+    if isinstance(obj, (tuple, frozenset)):
+        obj = type(obj)(_dedup(x, seen) for x in obj)
+    elif not isinstance(obj, str):
+        return obj
+    return seen.setdefault(obj, obj)
+
+
+def encode_paths(paths, dedup=False):
+    """
+    :param paths: the mapping of path var => Path
+    :param dedup: if True, share equal strings and tuples between paths
+        (smaller, but slower to encode)
+    :return: the paths as marshallable (path var, state) pairs
+    """
+    seen = {} if dedup else None
+    return [(k, p.__getstate__() if seen is None
+             else _dedup(p.__getstate__(), seen))
+            for k, p in paths.items()]
+
+
+def decode_paths(encoded, cache_size=None):
+    """
+    :param encoded: the pairs of `encode_paths`
+    :param cache_size: if given, passed to each Path instead of its
+        encoded cache size (0 disables caching)
+    :return: an OrderedDict of path var => Path
+    """
+    paths = OrderedDict()
+    for k, state in encoded:
+        if cache_size is not None:
+            state = state[:3] + (cache_size,) + state[4:]
+        path = paths[k] = Path.__new__(Path)
+        path.__setstate__(state)
+    return paths
+
+
+def get_compiled_cache_dir():
+    """
+    :return: the OS-dependent directory for compiled paths.json files
+    """
+    import appdirs  # Deferred since most imports never need it.
+    return appdirs.user_cache_dir('pathsjson')
+
+
+def compiled_cache_path(cache_dir, file_path, options):
+    """
+    :param cache_dir: the directory of compiled paths.json files
+    :param file_path: the paths.json file
+    :param options: the options that affect loading
+    :return: the path of the compiled file for this file, options and
+        interpreter (marshal's format differs between versions). Colliding
+        names only cost a rebuild since records are checked.
+    """
+    key = repr((sys.implementation.cache_tag, os.path.abspath(file_path),
+                options)).encode('utf-8')
+    return os.path.join(cache_dir, "{:08x}.marshal".format(zlib.crc32(key)))
+
+
+def read_bytes(file_path):
+    """
+    :return: the contents of the file or None if it can't be read
+    """
+    try:
+        with open(file_path, 'rb') as fp:
+            return fp.read()
+    except (IOError, OSError):
+        return None
+
+
+def load_compiled(cache_path, file_path, options, sources, cache_size=None,
+                  env=None):
+    """
+    Load a compiled paths.json file if it's still valid.
+
+    A record is valid if it was compiled from the same file with the same
+    options and sources (the exact file contents) and the environmental
+    variables it depended on still have the same values.
+
+    :param cache_path: the compiled file
+    :param file_path: the paths.json file
+    :param options: the options that affect loading
+    :param sources: the contents of the paths.json and user globals files
+    :param cache_size: passed to each Path
+    :param env: the mapping of environmental variables (`os.environ` by
+        default)
+    :return: a (paths.json data, env var names, paths) triple or None
+    """
+    try:
+        with open(cache_path, 'rb') as fp:
+            record = marshal.loads(fp.read())
+        (version, abs_path, cached_options, cached_sources, env_names,
+         env_values, src, paths) = record
+    except (IOError, OSError, EOFError, ValueError, TypeError):
+        return None
+
+    if (version != FORMAT_VERSION or
+            abs_path != os.path.abspath(file_path) or
+            cached_options != options or
+            cached_sources != sources or
+            env_fingerprint(env_names, env) != env_values):
+        return None
+
+    return (OrderedDict(src), env_names,
+            decode_paths(paths, cache_size or 0))
+
+
+def dump_compiled(cache_path, file_path, options, sources, env_names,
+                  env_values, src, paths):
+    """
+    Write a compiled paths.json file (atomically, failing silently). A
+    missing cache directory is created private to the user, since others
+    mustn't be able to plant records that are unmarshalled.
+
+    :param cache_path: the compiled file
+    :param file_path: the paths.json file
+    :param options: the options that affect loading
+    :param sources: the contents of the paths.json and user globals files
+    :param env_names: the environmental variables the paths depend on
+    :param env_values: their values when loaded (see `env_fingerprint`)
+    :param src: the loaded paths.json data
+    :param paths: the mapping of path var => Path
+    :return: True if written, otherwise False
+    """
+    record = (FORMAT_VERSION, os.path.abspath(file_path), options, sources,
+              tuple(env_names), env_values,
+              {k: dict(v) if isinstance(v, dict) else v
+               for k, v in src.items()},
+              encode_paths(paths))
+
+    tmp_path = "{}.{}.tmp".format(cache_path, os.getpid())
+    try:
+        cache_dir = os.path.dirname(cache_path)
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir, mode=0o700)
+        with open(tmp_path, 'wb') as fp:
+            marshal.dump(record, fp)
+        os.replace(tmp_path, cache_path)
+    except (IOError, OSError, ValueError):
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        return False
+
+    return True
@@ -0,0 +1,366 @@
+"""
+A long-lived resolver that keeps a loaded PathsJSON hot behind a Unix
+domain socket, so shell and Makefile consumers skip the interpreter start
+up and reload on every call.
+
+The protocol is line-based. A request is a command line (words separated
+by spaces), then the client's environment as `NAME=VALUE` lines, then an
+empty line. The response is `OK` or `ERR <message>` on the first line,
+followed by the answer. The commands are:
+
+- `ping`: answers nothing
+- `shell-exports` / `make-exports`: as the CLI switches
+- `get KEY [ARGS...]`: the resolved path, where `NAME=VALUE` arguments
+  are passed by name
+- `stop`: stops the server
+
+The client's environment overrides definitions as usual. The paths are
+loaded once per combination of the relevant variables' values (keeping a
+few) and reloaded whenever the files change.
+
+The socket lives in a directory private to the user and only the user
+can connect to it, since anyone connecting can stop the daemon.
+"""
+import os
+import socket
+import threading
+from collections import OrderedDict
+
+
+SOCKET_ENV_VAR = 'PATHSJSON_SOCKET'
+
+# The environments (relevant variables' values) to keep paths loaded for.
+MAX_ENVS = 8
+
+
+def _cksum_table():
+    table = []
+    for i in range(256):
+        crc = i << 24
+        for _ in range(8):
+            crc = (crc << 1) ^ 0x04C11DB7 if crc & 0x80000000 else crc << 1
+        table.append(crc & 0xFFFFFFFF)
+    return table
+
+
+_CKSUM_TABLE = _cksum_table()
+
+
+def cksum(data):
+    """
+    :param data: the bytes
+    :return: their POSIX `cksum` CRC, which shell clients can compute too
+    """
+    n, length = len(data), bytearray()
+    while n:
+        length.append(n & 0xFF)
+        n >>= 8
+
+    crc = 0
+    for byte in bytes(data) + bytes(length):
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ _CKSUM_TABLE[(crc >> 24) ^ byte]
+    return ~crc & 0xFFFFFFFF
+
+
+def socket_dir():
+    """
+    :return: the directory of daemon sockets: `pathsjson` in
+        $XDG_RUNTIME_DIR or else `pathsjson-UID` in $TMPDIR (or /tmp)
+    """
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, 'pathsjson')
+    return os.path.join(os.environ.get('TMPDIR') or '/tmp',
+                        'pathsjson-{}'.format(os.getuid()))
+
+
+class DaemonError(RuntimeError):
+    """Raised when the resolver daemon answers with an error."""
+
+
+def socket_path_for(file_path):
+    """
+    :param file_path: the paths.json file
+    :return: the socket of its daemon: $PATHSJSON_SOCKET if set, otherwise
+        one named after the checksum of the file's (physical) path in
+        `socket_dir`
+    """
+    if os.environ.get(SOCKET_ENV_VAR):
+        return os.environ[SOCKET_ENV_VAR]
+
+    file_path = os.path.abspath(file_path)
+    file_path = os.path.join(os.path.realpath(os.path.dirname(file_path)),
+                             os.path.basename(file_path))
+    return os.path.join(socket_dir(),
+                        "{}.sock".format(cksum(os.fsencode(file_path))))
+
+
+def make_private_dir(dir_path):
+    """
+    Create a directory only the user can access, unless it exists.
+
+    :param dir_path: the directory path
+    :raises OSError: if it exists but others can access it or it isn't
+        the user's
+    """
+    os.makedirs(dir_path, mode=0o700, exist_ok=True)
+    st = os.lstat(dir_path)
+    if st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise OSError("{} isn't a private directory".format(dir_path))
+
+
+def format_exports(paths_json, style):
+    """
+    :param paths_json: the PathsJSON
+    :param style: 'shell' for `export K="V"` or 'make' for `K?=V` lines
+    :return: the export lines as one string
+    """
+    from pathsjson.cli import format_paths
+    return format_paths(paths_json.all_resolvable_paths, style)
+
+
+def split_args(args):
+    """
+    :param args: argument strings, `NAME=VALUE` for named arguments
+    :return: a (positional args, named args) pair
+    """
+    path_args, kwargs = [], {}
+    for arg in args:
+        name, sep, value = arg.partition("=")
+        if sep:
+            kwargs[name] = value
+        else:
+            path_args.append(arg)
+    return path_args, kwargs
+
+
+def encode_request(words, env=None):
+    """
+    :param words: the command and its arguments
+    :param env: the environment to send (`os.environ` by default)
+    :return: the request bytes
+    """
+    env = os.environ if env is None else env
+    lines = [" ".join(words)]
+    lines.extend("{}={}".format(k, v) for k, v in env.items()
+                 if '\n' not in v)
+    lines.extend(["", ""])
+    return "\n".join(lines).encode('utf-8')
+
+
+def request(socket_path, words, env=None, timeout=5.0):
+    """
+    Ask a running daemon.
+
+    :param socket_path: the daemon's socket
+    :param words: the command and its arguments
+    :param env: the environment to send (`os.environ` by default)
+    :param timeout: the seconds to wait for the daemon
+    :return: the answer
+    :raises OSError: if no daemon answers
+    :raises DaemonError: if the daemon answers with an error
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall(encode_request(words, env))
+
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        sock.close()
+
+    status, _, body = b"".join(chunks).decode('utf-8').partition("\n")
+    if status != "OK":
+        raise DaemonError(status[4:] or "No answer")
+    return body
+
+
+class Resolver:
+    """
+    Answers daemon requests from one paths.json file.
+
+    Requests are answered one at a time, from a PathsJSON per environment
+    (see `paths_for`).
+
+    :param file_path: the paths.json file
+    :param options: passed to PathsJSON (except `env`)
+    """
+
+    def __init__(self, file_path, **options):
+        self._file_path = file_path
+        self._options = options
+        self._lock = threading.Lock()
+        self._env_names = ()
+        self._loaded = OrderedDict()  # env fingerprint => PathsJSON
+        self.stopped = False
+        self.paths_for(os.environ)  # Fail early on a broken file.
+
+    def paths_for(self, env):
+        """
+        :param env: the client's environment
+        :return: the PathsJSON of the client's values of the variables the
+            paths depend on, loaded once for the last MAX_ENVS of them and
+            reloaded if its files changed
+        """
+        from pathsjson.helpers import env_fingerprint
+        from pathsjson.impl import PathsJSON
+
+        fingerprint = env_fingerprint(self._env_names, env)
+        paths_json = self._loaded.pop(fingerprint, None)
+        if paths_json is not None:
+            paths_json.reload_if_changed()
+            if paths_json._env_names != self._env_names:
+                # The file's variables changed, so do the fingerprints.
+                self._loaded.clear()
+                paths_json = None
+
+        if paths_json is None:
+            paths_json = PathsJSON(file_path=self._file_path, env=dict(env),
+                                   **self._options)
+            self._env_names = paths_json._env_names
+            fingerprint = env_fingerprint(self._env_names, env)
+
+        self._loaded[fingerprint] = paths_json
+        while len(self._loaded) > MAX_ENVS:
+            self._loaded.popitem(last=False)
+        return paths_json
+
+    def answer(self, words, env):
+        """
+        :param words: the command and its arguments
+        :param env: the client's environment
+        :return: the answer
+        """
+        if not words:
+            raise ValueError("Empty request")
+
+        command, args = words[0], words[1:]
+
+        if command == 'ping':
+            return ""
+        elif command == 'stop':
+            self.stopped = True
+            return ""
+        elif command not in ('shell-exports', 'make-exports', 'get'):
+            raise ValueError("Unknown command: {}".format(command))
+        elif command == 'get' and not args:
+            raise ValueError("Expected: get KEY [ARGS...]")
+
+        with self._lock:
+            paths_json = self.paths_for(env)
+
+            if command == 'get':
+                path_args, kwargs = split_args(args[1:])
+                return paths_json.resolve_path(args[0], *path_args,
+                                               **kwargs) + "\n"
+            elif command == 'shell-exports':
+                return format_exports(paths_json, 'shell')
+            else:
+                return format_exports(paths_json, 'make')
+
+    def handle(self, conn):
+        """
+        Answer the request on a connection and close it.
+        """
+        conn.settimeout(5.0)  # Don't let a stuck client hold its thread.
+        with conn, conn.makefile('rb') as fp:
+            words = fp.readline().decode('utf-8').split()
+            env = {}
+            for line in fp:
+                line = line.decode('utf-8').rstrip("\n")
+                if not line:
+                    break
+                k, sep, v = line.partition("=")
+                if sep:
+                    env[k] = v
+
+            try:
+                response = "OK\n" + self.answer(words, env)
+            except Exception as e:
+                response = "ERR {}\n".format(str(e).replace("\n", " "))
+
+            conn.sendall(response.encode('utf-8'))
+
+
+def _is_live(socket_path):
+    try:
+        request(socket_path, ['ping'], env={}, timeout=1.0)
+    except (OSError, DaemonError):
+        return False
+    return True
+
+
+def _wake(socket_path):
+    # Unblock the server's accept, so it notices it was stopped.
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        pass
+    finally:
+        sock.close()
+
+
+def serve(file_path, socket_path=None, ready=None, **options):
+    """
+    Serve requests until stopped (by a `stop` request or an interrupt).
+
+    Each connection is read in its own thread, so a slow client doesn't
+    hold up the others. The socket is only accessible to the user, and
+    the default one is created in a private `socket_dir`.
+
+    :param file_path: the paths.json file
+    :param socket_path: the socket to listen on (see `socket_path_for`)
+    :param ready: called with the socket path once listening, if given
+    :param options: passed to PathsJSON
+    :raises OSError: if another daemon already listens on the socket
+    """
+    resolver = Resolver(file_path, **options)
+
+    if socket_path is None:
+        socket_path = socket_path_for(file_path)
+        if not os.environ.get(SOCKET_ENV_VAR):
+            make_private_dir(socket_dir())
+
+    if os.path.exists(socket_path):
+        if _is_live(socket_path):
+            raise OSError("A daemon already listens on {}".format(
+                socket_path))
+        os.unlink(socket_path)  # Left behind by a dead daemon.
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(socket_path)
+        os.chmod(socket_path, 0o600)
+        server.listen(64)
+        if ready is not None:
+            ready(socket_path)
+
+        def handle(conn):
+            try:
+                resolver.handle(conn)
+            except OSError:
+                pass  # The client hung up.
+            if resolver.stopped:
+                _wake(socket_path)
+
+        while not resolver.stopped:
+            conn, _ = server.accept()
+            if resolver.stopped:
+                conn.close()
+                break
+            threading.Thread(target=handle, args=(conn,), daemon=True).start()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
@@ -0,0 +1,175 @@
+import os
+import re
+
+
+_SEP_RE = re.compile("|".join(re.escape(sep)
+                              for sep in (os.sep, os.altsep) if sep))
+
+
+class _Arg:
+    """A placeholder in a path template that matches any value."""
+
+    def __init__(self, name):
+        self.name = name
+
+
+def _bind(path, fixed_args):
+    """
+    Substitute the fixed arguments into a path template.
+
+    Arguments prefixed with an underscore fall back to their defaults (as
+    they do when resolving), every other argument is left open.
+
+    :return: a list of tokens, each a literal string or an _Arg
+    """
+    unknown = set(fixed_args) - set(path.arg_names)
+    if unknown:
+        expected = ", ".join(path.arg_names)
+        raise TypeError("Unknown args: {}. Expected: {}".format(
+            ", ".join(sorted(unknown)), expected))
+
+    literals = path.path.split("{}")
+    tokens = [literals[0]]
+
+    for name, default, literal in zip(path.arg_names, path.defaults,
+                                      literals[1:]):
+        if name in fixed_args:
+            tokens.append(str(fixed_args[name]))
+        elif name.startswith('_') and default is not None:
+            tokens.append(default)
+        else:
+            tokens.append(_Arg(name))
+        tokens.append(literal)
+
+    # Merge adjacent literals.
+    merged = []
+    for tok in tokens:
+        if merged and isinstance(tok, str) and isinstance(merged[-1], str):
+            merged[-1] += tok
+        else:
+            merged.append(tok)
+
+    return [tok for tok in merged if tok != ""]
+
+
+def _to_components(tokens):
+    """
+    Split the tokens into a base directory and per-level components.
+
+    Runs of literal levels are joined so they cost a single stat. Every
+    other level is a (compiled regex, arg names) pair.
+
+    :return: a (base directory, components) pair
+    """
+    # The literal prefix before the first open argument is the base.
+    base = ""
+    if tokens and isinstance(tokens[0], str):
+        prefix = tokens[0]
+        j = max(prefix.rfind(sep) for sep in (os.sep, os.altsep) if sep)
+        if j >= 0:
+            base = os.path.normpath(prefix[:j + 1])
+            tokens = [prefix[j + 1:]] + tokens[1:]
+
+    levels = [[]]
+    for tok in tokens:
+        if isinstance(tok, str):
+            pieces = _SEP_RE.split(tok)
+            levels[-1].append(pieces[0])
+            levels.extend([piece] for piece in pieces[1:])
+        else:
+            levels[-1].append(tok)
+
+    components = []
+    for level in levels:
+        level = [tok for tok in level if tok != ""]
+        if not level or level == [os.curdir]:
+            continue
+
+        if all(isinstance(tok, str) for tok in level):
+            literal = "".join(level)
+            if components and isinstance(components[-1], str):
+                components[-1] = os.path.join(components[-1], literal)
+            else:
+                components.append(literal)
+            continue
+
+        pattern, names, seen = [], [], {}
+        for tok in level:
+            if isinstance(tok, str):
+                pattern.append(re.escape(tok))
+            elif tok.name in seen:
+                pattern.append("(?P=g{})".format(seen[tok.name]))
+            else:
+                seen[tok.name] = len(names)
+                pattern.append("(?P<g{}>.+?)".format(len(names)))
+                names.append(tok.name)
+
+        components.append((re.compile("".join(pattern), re.S), names))
+
+    return base, components
+
+
+def _walk(dir_path, components, i, bindings):
+    component, is_last = components[i], i == len(components) - 1
+
+    if isinstance(component, str):
+        path_str = os.path.join(dir_path, component)
+        if is_last:
+            if os.path.exists(path_str):
+                yield path_str, bindings
+        elif os.path.isdir(path_str):
+            for match in _walk(path_str, components, i + 1, bindings):
+                yield match
+        return
+
+    regex, names = component
+
+    try:
+        entries = sorted(os.scandir(dir_path or os.curdir),
+                         key=lambda entry: entry.name)
+    except OSError:
+        return
+
+    for entry in entries:
+        m = regex.fullmatch(entry.name)
+        if m is None:
+            continue
+
+        entry_bindings = dict(bindings)
+        for name, value in zip(names, m.groups()):
+            if entry_bindings.setdefault(name, value) != value:
+                break  # The same name was bound differently elsewhere.
+        else:
+            path_str = os.path.join(dir_path, entry.name)
+            if is_last:
+                yield path_str, entry_bindings
+            elif entry.is_dir():
+                for match in _walk(path_str, components, i + 1,
+                                   entry_bindings):
+                    yield match
+
+
+def enumerate_path(path, **fixed_args):
+    """
+    Find the existing files that match a path's template.
+
+    Each open argument matches any non-empty file or directory name (so
+    values can't span directories). The file system is walked one level
+    at a time from the literal prefix of the template: literal levels cost
+    a stat and only directories that can still match are scanned.
+
+    :param path: a Path
+    :param fixed_args: argument values to hold fixed. Arguments prefixed
+        with an underscore default to their defaults.
+    :return: a generator of (path string, {arg name: value}) pairs in
+        sorted order. The bindings only hold the open arguments.
+    """
+    base, components = _to_components(_bind(path, fixed_args))
+
+    if not components:
+        if base and os.path.exists(base):
+            yield base, {}
+        return
+
+    for path_str, bindings in _walk(base, components, 0, {}):
+        yield os.path.normpath(path_str), bindings
@@ -0,0 +1,43 @@
+class Expansion(object):
+    """
+    The expanded elements of a path var that shares, rather than copies,
+    the expansions of the path vars it references.
+
+    Each part is a path literal, an [env var name, default] pair, or
+    another Expansion. Iterating flattens the parts into the elements
+    of the path. Flattening is iterative, so deep chains of references
+    are fine.
+    """
+
+    __slots__ = ('parts',)
+
+    def __init__(self, parts=()):
+        self.parts = tuple(parts)
+
+    def __iter__(self):
+        stack = [iter(self.parts)]
+        while stack:
+            for el in stack[-1]:
+                if isinstance(el, Expansion):
+                    stack.append(iter(el.parts))
+                    break
+                yield el
+            else:
+                stack.pop()
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "Expansion({!r})".format(list(self))
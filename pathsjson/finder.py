@@ -0,0 +1,139 @@
+import os
+from collections import OrderedDict
+
+
+# What probing a directory found.
+FOUND, MISSING, BOUNDARY = 'found', 'missing', 'boundary'
+
+
+class FileFinder:
+    """
+    Find the first target file walking towards the root (like
+    `find_file_asc`), remembering what each directory held.
+
+    Every directory visited caches its result, positive or negative, so
+    later lookups anywhere in the same subtree stop at the first visited
+    directory. Cached results never expire unless `validate` is set.
+    Results are kept per target name, so one finder can serve lookups of
+    other names too (see `find`).
+
+    :param target_name: the file name to find by default
+    :param boundaries: marker names (e.g. '.git') of directories to stop
+        at, after probing them for the target
+    :param stop_dirs: directories to stop at, after probing them
+    :param stop_at_mount: if True, stop at mount points
+    :param validate: if True, recheck a cached directory whenever its
+        mtime changed (adding or removing the target or a marker changes
+        it). This still stats every directory, but a directory stat is
+        usually served from the (NFS) attribute cache where a missing
+        file isn't.
+    """
+
+    def __init__(self, target_name=".paths.json", boundaries=(),
+                 stop_dirs=(), stop_at_mount=False, validate=False):
+        self._target_name = target_name
+        self._boundaries = tuple(boundaries)
+        self._stop_dirs = frozenset(os.path.abspath(d) for d in stop_dirs)
+        self._stop_at_mount = stop_at_mount
+        self._validate = validate
+
+        self._probes = {}  # (target, dir) => (FOUND/MISSING/BOUNDARY, mtime)
+        self._results = {}  # (target, dir) => file path or None
+
+    @property
+    def target_name(self):
+        return self._target_name
+
+    def clear(self):
+        self._probes.clear()
+        self._results.clear()
+
+    def _mtime(self, dir_path):
+        try:
+            return os.stat(dir_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _is_boundary(self, dir_path):
+        if dir_path in self._stop_dirs:
+            return True
+
+        for marker in self._boundaries:
+            if os.path.exists(os.path.join(dir_path, marker)):
+                return True
+
+        return self._stop_at_mount and os.path.ismount(dir_path)
+
+    def _state(self, dir_path, target_name):
+        mtime = self._mtime(dir_path) if self._validate else None
+        cached = self._probes.get((target_name, dir_path))
+
+        if cached is not None and cached[1] == mtime:
+            return cached[0]
+
+        if os.path.exists(os.path.join(dir_path, target_name)):
+            state = FOUND
+        elif self._is_boundary(dir_path):
+            state = BOUNDARY
+        else:
+            state = MISSING
+
+        self._probes[target_name, dir_path] = (state, mtime)
+        return state
+
+    def find(self, src_dir=None, target_name=None):
+        """
+        :param src_dir: the directory to start from or the cwd by default.
+        :param target_name: the file name to find instead of the finder's
+        :return: the file path to the target or None if not found
+        """
+        results = None if self._validate else self._results
+        return self._find(src_dir, target_name or self._target_name, results)
+
+    def _find(self, src_dir, target_name, results):
+        """
+        :param results: the mapping of (target, dir) => file path or None to
+            look up and record results in, if any
+        """
+        src_dir = os.path.abspath(src_dir or os.getcwd())
+        visited, dir_path, file_path = [], src_dir, None
+
+        while True:
+            if results is not None and (target_name, dir_path) in results:
+                file_path = results[target_name, dir_path]
+                break
+
+            visited.append(dir_path)
+            state = self._state(dir_path, target_name)
+
+            if state == FOUND:
+                file_path = os.path.join(dir_path, target_name)
+                break
+            elif state == BOUNDARY:
+                break
+
+            next_path = os.path.dirname(dir_path)
+            if next_path == dir_path:
+                break
+            dir_path = next_path
+
+        if results is not None:
+            for dir_path in visited:
+                results[target_name, dir_path] = file_path
+
+        return file_path
+
+    def find_many(self, src_dirs, target_name=None):
+        """
+        Find the target for many start directories, probing each shared
+        ancestor once (once per call if `validate` is set).
+
+        :param src_dirs: the directories to start from
+        :param target_name: the file name to find instead of the finder's
+        :return: a map of directory => file path or None
+        """
+        target_name = target_name or self._target_name
+        results = {} if self._validate else self._results
+        return OrderedDict((src_dir, self._find(src_dir, target_name,
+                                                results))
+                           for src_dir in src_dirs)
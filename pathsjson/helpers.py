@@ -1,8 +1,7 @@
-import appdirs
 import json
 import os
-import copy
-from collections import OrderedDict
+from collections import OrderedDict, deque
+from pathsjson.expansion import Expansion
 from pathsjson.path import Path
 
 
@@ -42,6 +41,35 @@ def to_requirements_of(d):
     return g
 
 
+def subgraph_of(data, keys):
+    """
+    Select the path vars of interest and everything they require.
+
+    :param data: a .paths.json data structure
+    :param keys: the path vars (or fnmatch patterns) of interest
+    :return: a copy of the data with only those path vars, the path vars
+        they (transitively) require and the `__ENV` entry
+    """
+    from fnmatch import fnmatchcase
+
+    requirements = to_requirements_of(data)
+    patterns = [k for k in keys if k not in requirements]
+    frontier = [k for k in keys if k in requirements]
+    if patterns:
+        frontier.extend(k for k in requirements
+                        if any(fnmatchcase(k, p) for p in patterns))
+
+    needed = set()
+    while frontier:
+        k = frontier.pop()
+        if k not in needed and k in requirements:
+            needed.add(k)
+            frontier.extend(requirements[k])
+
+    return OrderedDict((k, v) for k, v in data.items()
+                       if k == '__ENV' or k in needed)
+
+
 def to_dependencies_of(g):
     """
     Compute the dependencies of each path var.
@@ -63,67 +91,173 @@ def to_dependencies_of(g):
     return {k: sorted(v) for k, v in deps.items()}
 
 
+class ResolveError(LookupError):
+    """
+    Raised when path vars can't be resolved.
+
+    :ivar failed: the sorted path vars that can't be resolved
+    :ivar missing: a map of path var => sorted undefined names it requires
+    :ivar cycles: a list of cycles, each a list of path vars that starts
+        and ends on the same path var
+    """
+
+    def __init__(self, failed, missing=None, cycles=None):
+        self.failed = failed
+        self.missing = missing or {}
+        self.cycles = cycles or []
+
+        details = ["undefined ${} (required by {})".format(name, k)
+                   for k, names in sorted(self.missing.items())
+                   for name in names]
+        details.extend("cycle " + " -> ".join(cycle)
+                       for cycle in self.cycles)
+
+        msg = "Resolve failed on {}".format(", ".join(failed))
+        if details:
+            msg += ": " + "; ".join(details)
+
+        super(ResolveError, self).__init__(msg)
+
+
+def find_cycles(requirements, vertices):
+    """
+    Find the cycles among the given vertices of a requirements graph.
+
+    :param requirements: the requirements graph of a paths.json file.
+    :param vertices: the vertices to search, e.g. those that a topological
+        sort could not order
+    :return: a list of cycles, each a list of vertices starting and ending
+        on the same vertex
+    """
+    vertices = set(vertices)
+    state, cycles = {}, []  # state: 1 = on the stack, 2 = done
+
+    for root in sorted(vertices):
+        if root in state:
+            continue
+
+        state[root] = 1
+        path = [root]
+        stack = [iter(sorted(requirements[root] & vertices))]
+
+        while stack:
+            for m in stack[-1]:
+                if m not in state:
+                    state[m] = 1
+                    path.append(m)
+                    stack.append(iter(sorted(requirements[m] & vertices)))
+                    break
+                elif state[m] == 1:
+                    cycles.append(path[path.index(m):] + [m])
+            else:
+                state[path.pop()] = 2
+                stack.pop()
+
+    return cycles
+
+
 def topo_sort(requirements, ns=None):
     """
     Topographical sort over the requirements graph.
 
+    This runs in O(V + E) (plus sorting the dependents of each vertex for
+    reproducible results) and leaves `requirements` untouched.
+
     :param requirements: the requirements graph of a paths.json file.
     :param ns: an (optional) map of path variable to path that allows external
         bindings, e.g. a global file.
     :return: a topographical ordering suitable for processing the dependency
         graph
+    :raises ResolveError: listing every path var that can't be resolved,
+        the undefined names, and the cycles
     """
     ns = ns or {}
     ordering = []
-    frontier = sorted([k for k, v in requirements.items() if not v])
+    n_required = {k: len(v) for k, v in requirements.items()}
+    frontier = deque(sorted(k for k, n in n_required.items() if not n))
     deps = to_dependencies_of(requirements)
 
     while frontier:
-        n = frontier.pop(0)
+        n = frontier.popleft()
         ordering.append(n)
-        for m in deps.get(n, []):
-            requirements[m].remove(n)
-            if not requirements[m]:
+        for m in deps.get(n, ()):
+            n_required[m] -= 1
+            if not n_required[m]:
                 frontier.append(m)
 
+    if len(ordering) == len(requirements):
+        return ordering
+
     # These are the *remaining* unresolved requirements!
-    for k, edges in requirements.items():
-        for edge in edges:
-            if edge not in ns:
-                raise LookupError('Resolve failed on {}'.format(k))
+    remaining = {k for k, n in n_required.items() if n}
+    failed = sorted(k for k in remaining
+                    if any(edge not in ns for edge in requirements[k]))
+
+    if failed:
+        missing = {}
+        for k in failed:
+            names = sorted(edge for edge in requirements[k]
+                           if edge not in requirements and edge not in ns)
+            if names:
+                missing[k] = names
+
+        raise ResolveError(failed, missing,
+                           find_cycles(requirements, remaining))
 
     return ordering
 
 
-def expand(data):
+def expand_one(path, expansion, ns):
+    """
+    Expand one path var whose requirements are already expanded.
+
+    :param path: the path var's definition
+    :param expansion: a map of path var => Expansion holding its
+        requirements
+    :param ns: the `__ENV` entry
+    :return: the Expansion
+    """
+    parts = []
+
+    for el in path:
+        if is_path_var(el):
+            parts.append(expansion[el[1:]])  # shared reference
+        elif is_env_var(el):
+            name = el[2:]
+            parts.append([name, ns.get(name)])  # default binding
+        else:
+            parts.append(el)  # simple literal
+
+    return Expansion(parts)
+
+
+def expand(data, shared=None):
     """
     Expand the paths.json data structure into intermediary format.
 
+    The data structure isn't modified or copied. Each expansion references
+    the expansions of the path vars it uses, so shared prefixes are stored
+    once no matter how deep the hierarchy is.
+
     :param data: The paths.json data structure
-    :return: a mapping of path_name => [path_element, ...]. Each element is
-        either a string (for path literal) or a pair of environmental variable
-        name to default value.
+    :param shared: an (optional) map of path var => Expansion to use as is,
+        e.g. the user's globals expanded once for many paths.json files.
+        The caller must ensure they're what expanding would produce.
+    :return: a mapping of path_name => Expansion. Iterating an expansion
+        yields its elements. Each element is either a string (for path
+        literal) or a pair of environmental variable name to default value.
     """
-    data = copy.deepcopy(data)  # This makes debugging easier and safer.
-
-    ns = data.pop('__ENV', {})
+    ns = data.get('__ENV', {})
     ks = topo_sort(to_requirements_of(data), ns)
 
     # Build expansion.
     expansion = {}
     for k in ks:
-        path = []
-
-        for el in data[k]:
-            if is_path_var(el):
-                path.extend(ns[el[1:]])  # lookup literal
-            elif is_env_var(el):
-                name = el[2:]
-                path.append([name, ns.get(name)])  # default binding
-            else:
-                path.append(el)  # simple literal
+        if shared and k in shared:
+            expansion[k] = shared[k]
+            continue
 
-        ns[k], expansion[k] = path, path
+        expansion[k] = expand_one(data[k], expansion, ns)
 
     # Ensure sorted order for determinism.
     sorted_expansion = OrderedDict()
@@ -134,31 +268,102 @@ def expand(data):
     return sorted_expansion
 
 
-def to_paths(expansion):
-    """
-    Converts an exanded paths.json data structure into a mapping of paths.
+def _lookup(compiled, exp):
+    # Entries keep their Expansion alive, so a (temporary) Expansion's id
+    # can't be reused by another while it's memoized. Check anyway.
+    entry = compiled.get(id(exp))
+    return entry[1] if entry is not None and entry[0] is exp else None
 
-    :param expansion: the expansion of a paths.json data structure
-    :return: a dict of path_name => Path
+
+def compile_expansion(expansion, compiled):
     """
-    paths = OrderedDict()
+    Flatten an expansion into the arguments of a Path.
 
-    for k, path in expansion.items():
+    Referenced expansions are compiled first (iteratively, so deep chains
+    are fine) and their results are reused rather than re-flattened.
+
+    :param expansion: an Expansion
+    :param compiled: a memo of id(Expansion) => (Expansion, result) shared
+        between calls
+    :return: a (path format string or None if empty, arg names, defaults)
+        triple
+    """
+    stack = [expansion]
+
+    while stack:
+        exp = stack[-1]
+        if _lookup(compiled, exp) is not None:
+            stack.pop()
+            continue
+
+        pending = [el for el in exp.parts
+                   if isinstance(el, Expansion) and
+                   _lookup(compiled, el) is None]
+        if pending:
+            stack.extend(pending)
+            continue
+
+        stack.pop()
         parts, arg_names, default_args = [], [], []
 
-        for el in path:
-            if isinstance(el, (list, tuple)):
+        for el in exp.parts:
+            if isinstance(el, Expansion):
+                path, names, defaults = _lookup(compiled, el)
+                if path is not None:
+                    parts.append(path)
+                arg_names.extend(names)
+                default_args.extend(defaults)
+            elif isinstance(el, (list, tuple)):
                 parts.append("{}")
                 arg_names.append(el[0])
                 default_args.append(el[1])
             else:
                 parts.append(el)
 
-        paths[k] = Path(os.path.join(*parts), arg_names, default_args)
+        compiled[id(exp)] = (exp, (os.path.join(*parts) if parts else None,
+                                   tuple(arg_names), tuple(default_args)))
+
+    return _lookup(compiled, expansion)
+
+
+def to_paths(expansion, cache_size=None):
+    """
+    Converts an exanded paths.json data structure into a mapping of paths.
+
+    This is where expansions get flattened.
+
+    :param expansion: the expansion of a paths.json data structure
+    :param cache_size: the size of each path's resolve cache or None to
+        disable caching
+    :return: a dict of path_name => Path
+    """
+    paths = OrderedDict()
+    compiled = {}
+
+    for k, exp in expansion.items():
+        paths[k] = to_path(k, exp, compiled, cache_size)
 
     return paths
 
 
+def to_path(k, expansion, compiled, cache_size=None):
+    """
+    :param k: the path var
+    :param expansion: its expansion
+    :param compiled: the memo of `compile_expansion`
+    :param cache_size: the size of the path's resolve cache or None
+    :return: the Path
+    """
+    if not isinstance(expansion, Expansion):
+        expansion = Expansion(expansion)
+
+    path, arg_names, default_args = compile_expansion(expansion, compiled)
+    if path is None:
+        raise ValueError("{} expands to an empty path".format(k))
+
+    return Path(path, arg_names, default_args, cache_size)
+
+
 def find_file_asc(src_dir=None, target_name=".paths.json", limit=None):
     """
     Walk file system towards root in search of the first target.
@@ -184,29 +389,94 @@ def find_file_asc(src_dir=None, target_name=".paths.json", limit=None):
             limit -= 1
 
 
-def patch_with_env(data):
+def env_names_in(data):
+    """
+    :param data: the paths.json data structure.
+    :return: the sorted names of the environmental variables that can
+        override a definition, i.e. the `__ENV` entries and path vars
+    """
+    names = set(data)
+    names.discard('__ENV')
+    names.update(data.get('__ENV', ()))
+    return tuple(sorted(names))
+
+
+def patch_with_env(data, env=None, names=None):
     """
     Patch the paths.json data structure with environmental variables in place.
 
-    Note this only patches *defined* paths or environmental variables.
+    Note this only patches *defined* paths or environmental variables, and
+    only looks those names up rather than scanning the environment.
 
     :param data: the paths.json data structure.
+    :param env: the mapping of environmental variables (`os.environ` by
+        default)
+    :param names: the names to look up, if already known (see
+        `env_names_in`)
     :return: the data structure
     """
-    for k, v in os.environ.items():
-
-        if k in data['__ENV']:
-            data['__ENV'][k] = v
-        elif k in data:
+    env_data = data['__ENV']
+    if names is None:
+        names = env_names_in(data)
+
+    for k, v in env_fingerprint(names, env):
+        if v is None:
+            continue
+        elif k in env_data:
+            env_data[k] = v
+        else:
             data[k] = v
 
     return data
 
 
+def file_fingerprint(file_path):
+    """
+    Cheaply identify the current version of a file with a single stat.
+
+    :param file_path: the file to fingerprint
+    :return: a (mtime_ns, size, inode) tuple or None if the file is missing
+    """
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def map_concurrently(func, items, max_workers=None):
+    """
+    :param func: the function to apply
+    :param items: a sequence of items
+    :param max_workers: if given, apply it with a pool of this many threads
+    :return: the list of results in the order of the items
+    """
+    if max_workers and len(items) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers) as pool:
+            return list(pool.map(func, items))
+    return [func(item) for item in items]
+
+
+def env_fingerprint(names, env=None):
+    """
+    :param names: the environmental variable names of interest
+    :param env: the mapping of environmental variables (`os.environ` by
+        default)
+    :return: a tuple of the current (name, value) pairs for the names,
+        with None for unset names
+    """
+    if env is None:
+        env = os.environ
+    return tuple((k, env.get(k)) for k in names)
+
+
 def get_user_globals_path():
     """
     :return: the OS-dependent path to the user's global paths.json file.
     """
+    import appdirs  # Deferred since most imports never need it.
     return os.path.join(appdirs.user_data_dir('pathsjson'), ".paths.json")
 
 
@@ -248,16 +518,19 @@ def load_user_globals():
         return None
 
 
-def patch_with_user_globals(data, skip_noexist=True):
+def patch_with_user_globals(data, skip_noexist=True, global_data=None):
     """
     Patch the paths.json data structure with the user's globals in place.
 
     :param data: the paths.json data structure
     :param skip_noexist: skip applying global data if it doesn't exist
         otherwise raise an error for a non-existant file
+    :param global_data: the (already loaded) global data to apply instead
+        of loading the user's global file. It's left untouched.
     :return: the patched data
     """
-    global_data = load_user_globals()
+    if global_data is None:
+        global_data = load_user_globals()
 
     if global_data is None:
         if skip_noexist:
@@ -265,14 +538,14 @@ def patch_with_user_globals(data, skip_noexist=True):
         else:
             raise IOError("Global data missing and skip_no_exist=False")
 
-    env_updates = global_data.pop('__ENV', None)
+    env_updates = global_data.get('__ENV')
     if env_updates:
         if '__ENV' not in data:
-            data['__ENV'] = env_updates
+            data['__ENV'] = OrderedDict(env_updates)
         else:
             data['__ENV'].update(env_updates)
 
-    data.update(global_data)
+    data.update((k, v) for k, v in global_data.items() if k != '__ENV')
 
     return data
 
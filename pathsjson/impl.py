@@ -1,30 +1,92 @@
 import json
-import jsonschema
 import os
 from collections import OrderedDict
-from pathsjson.resolution import Resolution
+from pathsjson.base import BasePaths
+from pathsjson.path import CacheInfo
+from pathsjson.resolution import ensure_dirs
+from pathsjson.stats import LoadStats, perf_counter, report_load
 from pathsjson.helpers import *
+from pathsjson.validation import SCHEMA_FILE, validate as validate_data
 
 
-SELF_DIR = os.path.dirname(os.path.realpath(__file__))
+class PathsJSON(BasePaths):
+    """
+    The loaded path definitions of a paths.json file.
 
-SCHEMA_FILE = os.path.join(SELF_DIR, "schema.json")
-
-
-class PathsJSON:
+    :param validate: True for the fast structural check, 'strict' to
+        validate against `schema.json` with jsonschema, or False to skip
+    :param auto_reload: if True, check for changes (see `reload_if_changed`)
+        before every resolution
+    :param cache_size: if given, memoize up to this many resolutions per
+        path (see `cache_info`). Reloading discards the caches of paths
+        whose definitions changed.
+    :param compiled_cache: if True (or a directory path), reuse the loaded
+        paths across processes via a compiled file in the user cache
+        directory (or the given one) while the paths.json file, the user
+        globals file and the relevant environmental variables are
+        unchanged
+    :param env: the mapping of environmental variables that override
+        definitions (`os.environ` by default)
+    :param registry: the PathsJSONRegistry to share parsing and the user
+        globals with, if any
+    :param finder: the FileFinder to search for `target_name` with (sharing
+        its cached lookups), if any
+    :param only: if given, the path vars (or fnmatch patterns) to load.
+        Only they and the path vars they require are expanded. A compiled
+        cache of the whole file is used (filtered) but not written.
+    :param lazy: if True, loading only indexes the definitions and each
+        path var is expanded on first use (see `LazyPaths`). Undefined
+        references and cycles are reported on use or by `check`.
+        `compiled_cache` is ignored in this mode.
+    :param on_load: a callable taking the LoadStats after every load, if
+        any (see `stats`)
+    """
 
     def __init__(self, file_path=None, src_dir=None, target_name=".paths.json",
                  enable_env_overrides=True, enable_user_global_overrides=True,
-                 validate=True):
+                 validate=True, auto_reload=False, cache_size=None,
+                 compiled_cache=False, env=None, registry=None, finder=None,
+                 only=None, lazy=False, on_load=None):
+        find_time = None
         if file_path is None:
-            file_path = find_file_asc(src_dir, target_name)
+            start = perf_counter()
+            if finder is not None:
+                file_path = finder.find(src_dir, target_name)
+            else:
+                file_path = find_file_asc(src_dir, target_name)
             if file_path is None:
                 raise IOError("No `{}` file found!".format(target_name))
+            find_time = perf_counter() - start
 
         self._file_path = file_path
         self._enable_env_overrides = enable_env_overrides
         self._enable_user_global_overrides = enable_user_global_overrides
         self._validate = validate
+        self._auto_reload = auto_reload
+        self._cache_size = cache_size
+        self._env = env
+        self._registry = registry
+        self._only = None if only is None else tuple(only)
+        self._lazy = lazy
+        self._on_load = on_load
+        self._stats = LoadStats(file_path)
+        self._find_time = find_time
+
+        self._compiled_cache_path = None
+        if compiled_cache and not lazy:
+            from pathsjson.compiled import (compiled_cache_path,
+                                            get_compiled_cache_dir)
+            if compiled_cache is True:
+                compiled_cache = get_compiled_cache_dir()
+            self._compiled_cache_path = compiled_cache_path(
+                compiled_cache, file_path, self._load_options())
+
+        self._build = None
+        self._matcher = None
+        self._fingerprint = None
+        self._env_names = ()
+        self._expansion = OrderedDict()
+        self._paths = OrderedDict()
 
         self.reload()
 
@@ -36,56 +98,386 @@ class PathsJSON:
         enable_env_overrides = self._enable_env_overrides
         enable_user_global_overrides = self._enable_user_global_overrides
         validate = self._validate
+        stats = self._stats
+
+        stats.start()
+        if self._find_time is not None:
+            stats.phases['find'] = self._find_time
+            self._find_time = None
+
+        # Stat before reading so a write racing the read triggers a reload.
+        file_fingerprints = self._file_fingerprints()
+        self._matcher = None
+
+        with open(file_path, 'rb') as fp:
+            src_bytes = fp.read()
+        stats.lap('read')
 
-        with open(file_path) as fp:
-            data = json.load(fp, object_pairs_hook=OrderedDict)
+        if self._compiled_cache_path is not None:
+            loaded = self._load_compiled(src_bytes, file_fingerprints)
+            stats.lap('compiled')
+            if loaded:
+                stats.compiled = True
+                return self._loaded()
 
-            if '__ENV' not in data:
-                data['__ENV'] = {}
+        registry, layer = self._registry, None
 
-            if enable_user_global_overrides:
+        if registry is not None:
+            data = registry.parse(file_path, src_bytes)
+        else:
+            data = json.loads(src_bytes.decode('utf-8'),
+                              object_pairs_hook=OrderedDict)
+
+        if '__ENV' not in data:
+            data['__ENV'] = {}
+        stats.lap('parse')
+
+        if enable_user_global_overrides:
+            if registry is not None:
+                global_data, layer = registry.user_globals()
+                if global_data is not None:
+                    data = patch_with_user_globals(data,
+                                                   global_data=global_data)
+            else:
                 data = patch_with_user_globals(data)
+            stats.lap('globals')
+
+        env_values = ()
+        if enable_env_overrides:
+            self._env_names = env_names_in(data)
+            env_values = env_fingerprint(self._env_names, self._env)
+            data = patch_with_env(data, {k: v for k, v in env_values
+                                         if v is not None},
+                                  self._env_names)
 
-            if enable_env_overrides:
-                data = patch_with_env(data)
+        inject_special_variables(data, file_path)
+        stats.lap('env')
 
-            inject_special_variables(data, file_path)
+        validate_data(data, validate)
+        stats.lap('validate')
+
+        self._src = data
+        if self._only is not None:
+            data = subgraph_of(data, self._only)
+
+        if self._lazy:
+            from pathsjson.lazypaths import LazyPaths
+            previous = self._paths if isinstance(self._paths, LazyPaths) \
+                else None
+            self._paths = LazyPaths(data, layer, self._cache_size, previous)
+            stats.lap('index')
+        else:
+            if layer is None:
+                expansion = expand(data)
+            else:
+                expansion = expand(data, layer.expansions)
+            stats.lap('expand')
+            self._rebuild_paths(expansion, layer)
+            stats.lap('paths')
 
-            if validate:
-                with open(SCHEMA_FILE) as fp:
-                    jsonschema.validate(data, json.load(fp))
-            self._src = data
-            self._paths = to_paths(expand(data))
+        self._fingerprint = (file_fingerprints, env_values)
 
+        if self._compiled_cache_path is not None and self._only is None:
+            self._dump_compiled(src_bytes)
+            stats.lap('dump')
+
+        return self._loaded()
+
+    def _loaded(self):
+        stats = self._stats
+        stats.loads += 1
+        stats.n_keys = len(self._paths)
+        report_load(stats, self._on_load)
         return self
 
-    def __getitem__(self, args):
-        if isinstance(args, tuple):
-            k, args = args[0], args[1:]
+    def _load_options(self):
+        # Not `only`: partial loads share (and filter) the whole file's cache.
+        return (self._enable_env_overrides,
+                self._enable_user_global_overrides,
+                self._validate)
+
+    def _sources(self, src_bytes):
+        globals_bytes = None
+        if self._enable_user_global_overrides:
+            from pathsjson.compiled import read_bytes
+            globals_bytes = read_bytes(get_user_globals_path())
+        return src_bytes, globals_bytes
+
+    def _load_compiled(self, src_bytes, file_fingerprints):
+        from pathsjson.compiled import load_compiled
+
+        compiled = load_compiled(self._compiled_cache_path, self._file_path,
+                                 self._load_options(),
+                                 self._sources(src_bytes), self._cache_size,
+                                 self._env)
+        if compiled is None:
+            return False
+
+        self._src, self._env_names, self._paths = compiled
+        if self._only is not None:
+            keys = subgraph_of(self._src, self._only)
+            self._paths = OrderedDict((k, p) for k, p in self._paths.items()
+                                      if k in keys)
+        self._expansion = OrderedDict()
+        self._fingerprint = (file_fingerprints,
+                             env_fingerprint(self._env_names, self._env))
+        return True
+
+    def _dump_compiled(self, src_bytes):
+        from pathsjson.compiled import dump_compiled
+
+        dump_compiled(self._compiled_cache_path, self._file_path,
+                      self._load_options(), self._sources(src_bytes),
+                      self._env_names, self._fingerprint[1], self._src,
+                      self._paths)
+
+    def reload_if_changed(self):
+        """
+        Reload the path definitions only if their sources changed.
+
+        The sources are the paths.json file, the user globals file (if
+        enabled) and the environmental variables that can override a
+        definition (if enabled). Checking costs one stat per file.
+
+        :return: True if the definitions were reloaded, otherwise False
+        """
+        fingerprint = (self._file_fingerprints(),
+                       env_fingerprint(self._env_names, self._env))
+
+        if fingerprint == self._fingerprint:
+            return False
+
+        self.reload()
+        return True
+
+    def _file_fingerprints(self):
+        fingerprints = [file_fingerprint(self._file_path)]
+
+        if self._enable_user_global_overrides:
+            fingerprints.append(file_fingerprint(get_user_globals_path()))
+
+        return tuple(fingerprints)
+
+    def _rebuild_paths(self, expansion, layer=None):
+        """
+        Replace the paths, rebuilding only those whose expansion changed.
+
+        Paths expanded by a (registry's) GlobalsLayer are taken from it,
+        copied with their own resolve caches if caching is enabled.
+        """
+        old_expansion, old_paths = self._expansion, self._paths
+
+        shared = layer.expansions if layer is not None else {}
+        changed = OrderedDict((k, v) for k, v in expansion.items()
+                              if v is not shared.get(k) and
+                              old_expansion.get(k) != v)
+        new_paths = to_paths(changed, self._cache_size)
+
+        paths = OrderedDict()
+        for k, v in expansion.items():
+            if k in new_paths:
+                paths[k] = new_paths[k]
+            elif v is shared.get(k) and old_expansion.get(k) is not v:
+                paths[k] = layer.paths[k]
+                if self._cache_size:
+                    paths[k] = paths[k].with_cache_size(self._cache_size)
+            else:
+                paths[k] = old_paths[k]
+
+        self._expansion, self._paths = expansion, paths
+
+    @property
+    def env_overrides(self):
+        """
+        The environmental variables that overrode definitions in the last
+        load, as a mapping of name => value.
+        """
+        return OrderedDict((k, v) for k, v in self._fingerprint[1]
+                           if v is not None)
+
+    def cache_info(self):
+        """
+        :return: the CacheInfo summed over every path's resolve cache or
+            None if caching is disabled
+        """
+        if not self._cache_size:
+            return None
+
+        hits = misses = currsize = 0
+        for path in self._loaded_paths():
+            info = path.cache.info()
+            hits, misses = hits + info.hits, misses + info.misses
+            currsize += info.currsize
+
+        return CacheInfo(hits, misses, self._cache_size, currsize)
+
+    def clear_cache(self):
+        """
+        Empty every path's resolve cache and reset the counters.
+        """
+        for path in self._loaded_paths():
+            if path.cache is not None:
+                path.cache.clear()
+
+    def _loaded_paths(self):
+        loaded = getattr(self._paths, 'loaded', self._paths)
+        return loaded.values()
+
+    def check(self):
+        """
+        Load every path var, raising what loading eagerly would have.
+
+        This only does work in lazy mode (see `LazyPaths.check`).
+
+        :raises ResolveError: listing every path var that can't be resolved
+        :raises ValueError: if a path var expands to an empty path
+        """
+        self._check_reload()
+        if self._lazy:
+            self._paths.check()
+
+    def _check_reload(self):
+        if self._auto_reload:
+            self.reload_if_changed()
+
+    @property
+    def stats(self):
+        """
+        The LoadStats of the last load (per phase timings) and the number
+        of loads and resolutions so far.
+        """
+        return self._stats
+
+    def _count_resolves(self, n):
+        self._stats.resolves += n
+
+    def enumerate(self, k, **fixed_args):
+        """
+        Find the existing files matching a path var's template.
+
+        :param k: the path var
+        :param fixed_args: argument values to hold fixed
+        :return: a generator of (path string, {arg name: value}) pairs
+            (see `enumerate_path`)
+        """
+        from pathsjson.enumeration import enumerate_path
+
+        self._check_reload()
+        return enumerate_path(self._paths[k], **fixed_args)
+
+    def match(self, path_str):
+        """
+        Find the path var and arguments that resolve to a path string.
+
+        The index of templates is built on first use after each reload (in
+        lazy mode this loads every path var).
+
+        :param path_str: a path string
+        :return: a (path var, {arg name: value}) pair or None (see
+            `PathMatcher.match`)
+        """
+        return self._get_matcher().match(path_str)
+
+    def match_many(self, path_strs):
+        """
+        :param path_strs: an iterable of path strings
+        :return: a generator of the results of `match` for each
+        """
+        return self._get_matcher().match_many(path_strs)
+
+    def _get_matcher(self):
+        self._check_reload()
+        if self._matcher is None:
+            from pathsjson.matching import PathMatcher
+            self._matcher = PathMatcher(self._paths)
+        return self._matcher
+
+    def ensure_dirs(self, keys=None, parents=False, max_workers=None):
+        """
+        Create the directories of many path vars in one pass.
+
+        :param keys: the path vars (resolved with their defaults) or None
+            for all resolvable paths
+        :param parents: if True, create the parent directory of each path
+            (i.e. the paths are files), otherwise the path itself
+        :param max_workers: if given, create them with a pool of this many
+            threads
+        :return: the directories that were needed (see `ensure_dirs`)
+        """
+        return ensure_dirs(self._dir_paths(keys, parents), max_workers)
+
+    def _dir_paths(self, keys, parents):
+        if keys is None:
+            path_strs = self.all_resolvable_paths.values()
         else:
-            k, args = args, tuple()
+            path_strs = [self.resolve_path(k) for k in keys]
 
-        return self.resolve_path(k, *args)
+        if parents:
+            path_strs = [os.path.dirname(p) for p in path_strs]
 
-    def resolve_path(self, k, *args, **kwargs):
-        return self._paths[k].resolve(*args, **kwargs)
+        return path_strs
 
-    def resolve(self, k, *args, **kwargs):
-        return Resolution(self.resolve_path(k, *args, **kwargs))
+    def audit(self, keys=None, instances=False, max_workers=16,
+              max_age=None):
+        """
+        Stat the resolvable paths concurrently.
+
+        :param keys: the path vars to audit or None for all of them
+        :param instances: if True, audit every existing instance of the
+            parametrized paths instead of their resolution with defaults
+        :param max_workers: the number of threads, or None to run serially
+        :param max_age: if given, paths last modified more than this many
+            seconds ago are stale
+        :return: an AuditReport (see `audit_paths`)
+        """
+        from pathsjson.audit import audit_paths
+
+        self._check_reload()
+        if keys is None:
+            paths = self._paths
+        else:
+            paths = OrderedDict((k, self._paths[k]) for k in keys)
+
+        return audit_paths(paths, instances, max_workers, max_age)
 
     @property
-    def all_resolvable_paths(self):
-        paths = OrderedDict()
-        for k in self._paths:
-            try:
-                paths[k] = self.resolve_path(k)
-            except ValueError:  # Missing non-default arg
-                pass
-        return paths
-
-    def _ipython_key_completions_(self):
-        return list(self._paths)
-
-    def __repr__(self):
-        ks = sorted(list(self._paths))
-        return "PathsJSON($keys=[{}])".format(", ".join(ks))
+    def build(self):
+        """
+        The BuildGraph of the path vars (see `depends` and `stale`).
+        """
+        if self._build is None:
+            from pathsjson.staleness import BuildGraph
+            self._build = BuildGraph(self.resolve_path)
+        return self._build
+
+    def depends(self, target, *sources):
+        """
+        Declare that a path var is made from others.
+
+        :param target: the path var that's produced
+        :param sources: the path vars it consumes
+        """
+        self.build.depends(target, *sources)
+
+    def stale(self, targets=None):
+        """
+        :param targets: a path var or path vars to check, or None for every
+            declared target
+        :return: the targets that are out of date (by modification time)
+            in build order (see `BuildGraph.stale`)
+        """
+        return self.build.stale(targets)
+
+    def snapshot(self):
+        """
+        Freeze the current paths for other processes, e.g. to pass to
+        workers or to publish in shared memory (see `SharedSnapshot`).
+
+        In lazy mode this loads every path var.
+
+        :return: a PathsSnapshot of the compiled templates only
+        """
+        from pathsjson.snapshot import PathsSnapshot
+
+        self._check_reload()
+        return PathsSnapshot(self._paths.items(), self._file_path)
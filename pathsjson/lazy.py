@@ -0,0 +1,42 @@
+import threading
+
+
+class LazyPathsJSON:
+    """
+    A stand-in for a PathsJSON that's only loaded on first use.
+
+    Item access, attribute access and `repr` load the instance (once,
+    thread-safely) and delegate to it.
+
+    :param factory: a callable returning the PathsJSON
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self):
+        return self._instance is not None
+
+    def load(self):
+        """
+        :return: the PathsJSON, loading it if necessary
+        """
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+                instance = self._instance
+        return instance
+
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
+
+    def __getitem__(self, args):
+        return self.load()[args]
+
+    def __repr__(self):
+        return repr(self.load())
@@ -0,0 +1,138 @@
+from collections.abc import Mapping
+from pathsjson.helpers import *
+
+
+class LazyPaths(Mapping):
+    """
+    A mapping of path var => Path that expands and compiles each path var
+    (and the path vars it requires) on first access.
+
+    Building it only indexes the definitions. Expansions and compiled
+    prefixes are memoized, so each path var is expanded once however many
+    path vars require it. Undefined references and cycles raise a
+    ResolveError when a path var that depends on them is accessed.
+
+    :param data: the (patched and validated) paths.json data structure
+    :param layer: a GlobalsLayer whose expansions are used as is and whose
+        paths are copied with their own resolve caches (if enabled)
+    :param cache_size: the size of each path's resolve cache or None
+    :param previous: the LazyPaths of the previous load, whose paths are
+        reused (with their caches) where the expansion didn't change
+    """
+
+    def __init__(self, data, layer=None, cache_size=None, previous=None):
+        self._data = data
+        self._ns = data.get('__ENV', {})
+        self._keys = [k for k in data if k != '__ENV']
+        self._cache_size = cache_size
+        self._previous = previous
+        if previous is not None:
+            previous._previous = None  # Don't chain every load.
+
+        self._shared, self._shared_paths = {}, {}
+        if layer is not None:
+            self._shared, self._shared_paths = layer.expansions, layer.paths
+
+        self._expansion = {}
+        self._paths = {}
+        self._compiled = {}
+
+    @property
+    def loaded(self):
+        """The mapping of path var => Path of the path vars loaded so far."""
+        return self._paths
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, k):
+        return k != '__ENV' and k in self._data
+
+    def __getitem__(self, k):
+        path = self._paths.get(k)
+        if path is None:
+            path = self._paths[k] = self._load(k)
+        return path
+
+    def _requirements(self, k):
+        return [el[1:] for el in self._data[k] if is_path_var(el)]
+
+    def _expand(self, k):
+        """
+        Expand the path var and its (unexpanded) requirements depth first.
+        """
+        expansion, shared, data = self._expansion, self._shared, self._data
+        stack, visiting = [(k, iter(self._requirements(k)))], {k}
+
+        while stack:
+            n, requirements = stack[-1]
+
+            for m in requirements:
+                if m in expansion:
+                    continue
+                elif m in shared:
+                    expansion[m] = shared[m]
+                elif m in visiting or m == '__ENV' or m not in data:
+                    return self._fail(k)
+                else:
+                    stack.append((m, iter(self._requirements(m))))
+                    visiting.add(m)
+                    break
+            else:
+                stack.pop()
+                visiting.discard(n)
+                expansion[n] = expand_one(data[n], expansion, self._ns)
+
+        return expansion[k]
+
+    def _fail(self, k):
+        # Report like a full expansion would, but for this subgraph only.
+        sub = subgraph_of(self._data, [k])
+        topo_sort(to_requirements_of(sub), self._ns)
+
+        # Unreachable unless the reference is an `__ENV` name, which a
+        # full expansion tolerates, so do just what it does.
+        expansion = expand(sub, self._expansion)
+        self._expansion.update(expansion)
+        return expansion[k]
+
+    def _load(self, k):
+        if k not in self:
+            raise KeyError(k)
+
+        shared = k in self._shared
+        if shared:
+            exp = self._expansion[k] = self._shared[k]
+        else:
+            exp = self._expansion.get(k)
+            if exp is None:
+                exp = self._expand(k)
+
+        previous = self._previous
+        if previous is not None:
+            old_path = previous._paths.get(k)
+            if old_path is not None and previous._expansion[k] == exp:
+                return old_path
+
+        if shared:
+            path = self._shared_paths[k]
+            if self._cache_size:
+                path = path.with_cache_size(self._cache_size)
+            return path
+
+        return to_path(k, exp, self._compiled, self._cache_size)
+
+    def check(self):
+        """
+        Load every path var.
+
+        :raises ResolveError: listing every path var that can't be
+            resolved (see `topo_sort`)
+        :raises ValueError: if a path var expands to an empty path
+        """
+        topo_sort(to_requirements_of(self._data), self._ns)
+        for k in self._keys:
+            self[k]
@@ -0,0 +1,161 @@
+import os
+import re
+from pathsjson.enumeration import _Arg, _bind
+
+
+_NOT_SEP = "[^{}]".format("".join(re.escape(sep) for sep in (os.sep, os.altsep)
+                                  if sep))
+
+
+def _segments(dir_path):
+    """
+    :return: the segments of a normalized directory path, where an
+        absolute path starts with an empty segment
+    """
+    if dir_path in (os.curdir, ""):
+        return []
+    return (dir_path.rstrip(os.sep) or "").split(os.sep)
+
+
+class _Node:
+    __slots__ = ('children', 'templates')
+
+    def __init__(self):
+        self.children = {}
+        self.templates = []
+
+
+class PathMatcher:
+    """
+    An index of path templates for reverse lookups, i.e. from a path
+    string to the path var and arguments that resolve to it.
+
+    Templates are filed in a trie under the directories of their literal
+    prefix, so a lookup walks the directories of the path once and only
+    tries the regexes of templates filed along the way (deepest first,
+    then the templates with the most literal text). Constant paths are
+    looked up directly.
+
+    Like `enumerate_path`, argument values match single file or directory
+    names (not spanning directories) and arguments prefixed with an
+    underscore match their defaults.
+
+    :param paths: a mapping of path var => Path
+    """
+
+    def __init__(self, paths):
+        self._constants = {}
+        self._root = _Node()
+
+        for order, (k, path) in enumerate(paths.items()):
+            tokens = _bind(path, {})
+            if not any(isinstance(tok, _Arg) for tok in tokens):
+                path_str = os.path.normpath("".join(tokens))
+                self._constants.setdefault(path_str, k)
+                continue
+
+            self._add(k, order, tokens)
+
+        self._sort(self._root)
+
+    def _add(self, k, order, tokens):
+        # Split off the directories of the literal prefix.
+        node = self._root
+        if isinstance(tokens[0], str):
+            prefix = tokens[0]
+            j = max(prefix.rfind(sep) for sep in (os.sep, os.altsep) if sep)
+            if j >= 0:
+                for segment in _segments(os.path.normpath(prefix[:j + 1])):
+                    node = node.children.setdefault(segment, _Node())
+                tokens = [prefix[j + 1:]] + tokens[1:]
+
+        pattern, names, seen, n_literal = [], [], {}, 0
+        for tok in tokens:
+            if isinstance(tok, str):
+                pattern.append(re.escape(tok))
+                n_literal += len(tok)
+            elif tok.name in seen:
+                pattern.append("(?P=g{})".format(seen[tok.name]))
+            else:
+                seen[tok.name] = len(names)
+                pattern.append("(?P<g{}>{}+?)".format(len(names), _NOT_SEP))
+                names.append(tok.name)
+
+        regex = re.compile("".join(pattern), re.S)
+        node.templates.append((-n_literal, order, k, regex, names))
+
+    def _sort(self, root):
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            node.templates.sort(key=lambda t: t[:2])
+            node.templates = [t[2:] for t in node.templates]
+            stack.extend(node.children.values())
+
+    def _candidates(self, dir_path):
+        """
+        :return: the (offset of the rest of the path, templates) pairs of
+            the nodes along the directory, deepest first
+        """
+        node, offset, found = self._root, 0, []
+        if node.templates:
+            found.append((0, node.templates))
+
+        for segment in _segments(dir_path):
+            node = node.children.get(segment)
+            if node is None:
+                break
+            offset += len(segment) + 1
+            if node.templates:
+                found.append((offset, node.templates))
+
+        found.reverse()
+        return found
+
+    def _match(self, path_str, candidates):
+        for offset, templates in candidates:
+            rest = path_str[offset:]
+            for k, regex, names in templates:
+                m = regex.fullmatch(rest)
+                if m is not None:
+                    return k, dict(zip(names, m.groups()))
+        return None
+
+    def match(self, path_str):
+        """
+        :param path_str: a path string
+        :return: the (path var, {arg name: value}) pair of the first
+            template matching the (normalized) path or None
+        """
+        path_str = os.path.normpath(path_str)
+
+        k = self._constants.get(path_str)
+        if k is not None:
+            return k, {}
+
+        return self._match(path_str,
+                           self._candidates(os.path.dirname(path_str)))
+
+    def match_many(self, path_strs):
+        """
+        Match many path strings, walking the trie once per directory.
+
+        :param path_strs: an iterable of path strings
+        :return: a generator of the results of `match`
+        """
+        constants, by_dir = self._constants, {}
+
+        for path_str in path_strs:
+            path_str = os.path.normpath(path_str)
+
+            k = constants.get(path_str)
+            if k is not None:
+                yield k, {}
+                continue
+
+            dir_path = os.path.dirname(path_str)
+            candidates = by_dir.get(dir_path)
+            if candidates is None:
+                candidates = by_dir[dir_path] = self._candidates(dir_path)
+
+            yield self._match(path_str, candidates)
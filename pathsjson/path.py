@@ -1,12 +1,205 @@
 import os
+import sys
+import threading
+from collections import OrderedDict, namedtuple
+from collections.abc import Mapping
+from pathsjson.slots import assign, immutable
+
+
+_SEPS = tuple(sep for sep in (os.sep, os.altsep) if sep)
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+def _as_list(column):
+    # NumPy arrays (and the like) convert to native values in one call.
+    tolist = getattr(column, 'tolist', None)
+    return tolist() if tolist is not None else list(column)
+
+
+def _cache_key(args, kwargs):
+    """
+    :return: a key of the arguments that tells apart equal values of
+        different types (e.g. 1, True and 1.0, which format differently).
+        Strings only equal strings, so all-string positional arguments are
+        their own key.
+    :raises TypeError: if an argument is unhashable
+    """
+    if not kwargs:
+        for a in args:
+            if type(a) is not str:
+                break
+        else:
+            return args
+
+    key = tuple([(type(a), a) for a in args])
+    if kwargs:
+        key += tuple(sorted((k, type(v), v) for k, v in kwargs.items()))
+    return key
+
+
+def _as_call_args(arg_set):
+    if isinstance(arg_set, Mapping):
+        return (), arg_set
+    elif isinstance(arg_set, (tuple, list)):
+        return tuple(arg_set), {}
+    else:
+        return (arg_set,), {}
+
+
+class ResolveCache:
+    """
+    A bounded LRU cache of resolved path strings.
+
+    Lookups count as hits or misses (see `info`). Inserting beyond
+    `maxsize` evicts the least recently used entry. It's thread-safe, so a
+    shared PathsJSON can resolve from many threads.
+    """
+
+    def __init__(self, maxsize=1024):
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive")
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        :return: the cached value or None on a miss
+        :raises TypeError: if the key is unhashable
+        """
+        with self._lock:
+            value = self._data.get(key)
+
+            if value is None:
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+
+        return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            data = self._data
+            data[key] = value
+            if len(data) > self.maxsize:
+                data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self))
 
 
 class Path:
+    """
+    A path template, immutable once created.
+
+    Its cache is the only state that changes when resolving.
+    """
+
+    __slots__ = ('_path', '_arg_names', '_defaults', '_cache', '_implicit',
+                 '_prefix', '_suffix', '_norm_prefix', '_default_str')
+
+    __setattr__ = __delattr__ = immutable
+
+    def __init__(self, path, arg_names=None, defaults=None, cache_size=None):
+        assign(self, _path=path,
+               _arg_names=tuple([] if arg_names is None else arg_names),
+               _defaults=tuple([] if defaults is None else defaults),
+               _cache=ResolveCache(cache_size) if cache_size else None)
+        self._compile()
+
+    def _compile(self):
+        """
+        Precompute what every resolution would otherwise recompute.
+
+        This is the names that are skipped when arguments are missing, the
+        resolution with all defaults (the constant case), and the
+        normalized literal prefix of the path before its first argument.
+        """
+        arg_names, path = self._arg_names, self._path
+
+        name_strs = (x[0] if isinstance(x, list) else x for x in arg_names)
+        assign(self, _implicit=frozenset(s for s in name_strs
+                                         if s.startswith('_')),
+               _prefix="", _suffix=path, _norm_prefix=None,
+               _default_str=None)
+
+        i = path.find("{")
+        j = max(path.rfind(sep, 0, i) for sep in _SEPS) if i > 0 else -1
+        if j >= 0:
+            prefix = path[:j + 1]
+            norm_prefix = os.path.normpath(prefix)
+            if norm_prefix != os.curdir:
+                if not norm_prefix.endswith(_SEPS):
+                    norm_prefix += os.sep
+                assign(self, _prefix=sys.intern(prefix),
+                       _suffix=path[j + 1:],
+                       _norm_prefix=sys.intern(norm_prefix))
+
+        if not arg_names:
+            assign(self, _default_str=path)
+        elif None not in self._defaults:
+            try:
+                assign(self, _default_str=self._format(self._defaults))
+            except (IndexError, KeyError, ValueError):
+                pass  # Let resolution raise it.
+
+    def __getstate__(self):
+        cache = self._cache
+        return (self._path, self._arg_names, self._defaults,
+                None if cache is None else cache.maxsize,
+                self._implicit, self._prefix, self._suffix,
+                self._norm_prefix, self._default_str)
+
+    def __setstate__(self, state):
+        (path, arg_names, defaults, cache_size, implicit, prefix, suffix,
+         norm_prefix, default_str) = state
+        if norm_prefix is not None:
+            prefix, norm_prefix = sys.intern(prefix), sys.intern(norm_prefix)
+        assign(self, _path=path, _arg_names=arg_names, _defaults=defaults,
+               _cache=ResolveCache(cache_size) if cache_size else None,
+               _implicit=implicit, _prefix=prefix, _suffix=suffix,
+               _norm_prefix=norm_prefix, _default_str=default_str)
+
+    def with_cache_size(self, cache_size=None):
+        """
+        :param cache_size: the size of the copy's own resolve cache or None
+            to disable caching
+        :return: a copy of this path with an empty resolve cache
+        """
+        state = self.__getstate__()
+        path = Path.__new__(Path)
+        path.__setstate__(state[:3] + (cache_size,) + state[4:])
+        return path
+
+    def _format(self, path_args):
+        """
+        Interpolate and normalize, only normalizing the interpolated suffix
+        when that's equivalent to normalizing the whole path.
+        """
+        norm_prefix = self._norm_prefix
+        if norm_prefix is None:
+            return os.path.normpath(self._path.format(*path_args))
 
-    def __init__(self, path, arg_names=None, defaults=None):
-        self._path = path
-        self._arg_names = tuple([] if arg_names is None else arg_names)
-        self._defaults = tuple([] if defaults is None else defaults)
+        suffix = self._suffix.format(*path_args)
+        if '..' not in suffix and not suffix.startswith(_SEPS):
+            suffix = os.path.normpath(suffix)
+            if suffix != os.curdir:
+                return norm_prefix + suffix
+
+        return os.path.normpath(self._prefix + suffix)
 
     @property
     def path(self):
@@ -20,6 +213,11 @@ class Path:
     def defaults(self):
         return self._defaults
 
+    @property
+    def cache(self):
+        """The ResolveCache of this path or None if caching is disabled."""
+        return self._cache
+
     def __eq__(self, other):
         return (self.path == other.path and
                 self.arg_names == other.arg_names and
@@ -41,20 +239,46 @@ class Path:
         it will try to use the defaults for all arguments prefixed with an
         underscore.
 
+        If this path has a cache, resolutions are memoized on the given
+        arguments and their types. Calls with unhashable arguments bypass
+        the cache.
+
         :param args: positional arguments for interpolation
         :param kwargs: keyword-based arguments for interpolation
         :return: a path string
         """
+        if not args and not kwargs and self._default_str is not None:
+            return self._default_str
+
+        cache = self._cache
+        if cache is None or not self._arg_names:
+            return self._resolve(args, kwargs)
+
+        try:
+            key = _cache_key(args, kwargs)
+            path_str = cache.get(key)
+        except TypeError:  # Unhashable arguments
+            return self._resolve(args, kwargs)
+
+        if path_str is None:
+            path_str = cache[key] = self._resolve(args, kwargs)
+
+        return path_str
+
+    def _resolve(self, args, kwargs):
         arg_names = self.arg_names
         n_args_expected = len(arg_names)
         if n_args_expected == 0:
             return self.path
 
-        skip_func_args, n_args, path_args = set(), len(args) + len(kwargs), []
+        # Fast path: exactly one positional argument per name.
+        if not kwargs and len(args) == n_args_expected:
+            return self._format(args)
 
-        if n_args < len(arg_names):
-            name_strs = (x[0] if isinstance(x, list) else x for x in arg_names)
-            skip_func_args = {s for s in name_strs if s.startswith('_')}
+        skip_func_args, n_args, path_args = (), len(args) + len(kwargs), []
+
+        if n_args < n_args_expected:
+            skip_func_args = self._implicit
 
         args = list(args)
 
@@ -76,4 +300,152 @@ class Path:
             expected = ", ".join(arg_names)
             raise TypeError("Too many args. Expected: {}".format(expected))
 
-        return os.path.normpath(self.path.format(*path_args))
+        return self._format(path_args)
+
+    def resolve_many(self, arg_sets, dedup=False):
+        """
+        Resolve the path for each argument set.
+
+        :param arg_sets: an iterable of argument sets. A mapping is passed
+            as keyword arguments, a tuple or list as positional arguments,
+            and anything else as the only positional argument.
+        :param dedup: if True, repeated argument sets are resolved once
+        :return: a generator of path strings
+        """
+        n_args_expected, fmt, resolve = (len(self._arg_names), self._format,
+                                         self.resolve)
+        seen = {} if dedup else None
+        key = None
+
+        for arg_set in arg_sets:
+            if type(arg_set) is tuple:
+                args, kwargs = arg_set, None
+            else:
+                args, kwargs = _as_call_args(arg_set)
+
+            if seen is not None:
+                try:
+                    key = _cache_key(args, kwargs)
+                    path_str = seen.get(key)
+                except TypeError:  # Unhashable arguments
+                    key = None
+                else:
+                    if path_str is not None:
+                        yield path_str
+                        continue
+
+            if kwargs:
+                path_str = resolve(*args, **kwargs)
+            elif len(args) == n_args_expected and n_args_expected:
+                path_str = fmt(args)
+            else:
+                path_str = resolve(*args)
+
+            if key is not None:
+                seen[key] = path_str
+
+            yield path_str
+
+    def resolve_columns(self, columns, dedup=False):
+        """
+        Resolve the path for each row of columnar arguments.
+
+        When every argument is given, each distinct value of a column is
+        formatted once and the rows are joined from those strings (unless
+        a value would need normalizing, e.g. "..", in which case every row
+        is resolved as by `resolve_many`).
+
+        :param columns: equal-length columns (e.g. lists or NumPy arrays)
+            either as a sequence in positional order or as a mapping of
+            argument name => column
+        :param dedup: if True, repeated rows are resolved once
+        :return: an iterator of path strings
+        """
+        if isinstance(columns, Mapping):
+            names = list(columns)
+            columns = [_as_list(columns[k]) for k in names]
+
+            arg_names = self._arg_names
+            if (len(names) == len(arg_names) == len(set(arg_names)) and
+                    set(names) == set(arg_names)):
+                # Every argument is given, so reorder into positional form.
+                columns = [columns[names.index(k)] for k in arg_names]
+            else:
+                if len(set(len(column) for column in columns)) > 1:
+                    raise ValueError("Columns must have the same length")
+                rows = (dict(zip(names, row)) for row in zip(*columns))
+                return self.resolve_many(rows, dedup)
+        else:
+            columns = [_as_list(column) for column in columns]
+
+        if len(set(len(column) for column in columns)) > 1:
+            raise ValueError("Columns must have the same length")
+
+        path_strs = None
+        if columns and len(columns) == len(self._arg_names):
+            path_strs = self._format_columns(columns)
+
+        if path_strs is None:
+            path_strs = self.resolve_many(zip(*columns), dedup)
+        return path_strs
+
+    def _format_columns(self, columns):
+        """
+        Format each distinct value of each column once, then join the rows.
+
+        This equals `_format` per row when the literal suffix is already
+        normalized and no value is empty, all dots or has a separator, as
+        normalizing then leaves the suffix as it is.
+
+        :return: an iterator of path strings or None if that isn't so
+        """
+        norm_prefix = self._norm_prefix
+        if norm_prefix is None:
+            return None
+
+        from string import Formatter
+
+        literals, fields, auto = [], [], 0
+        for literal, name, spec, conversion in Formatter().parse(self._suffix):
+            literals.append(literal)
+            if name is None:
+                continue
+            if name == '':
+                i, auto = auto, auto + 1
+            elif name.isdigit():
+                i = int(name)
+            else:
+                return None
+            if i >= len(columns) or '{' in spec:
+                return None
+            fields.append((i, "{{{}{}}}".format(
+                "!" + conversion if conversion else "",
+                ":" + spec if spec else "")))
+        if len(literals) == len(fields):
+            literals.append("")
+
+        sample = "x".join(literals)
+        if sample.startswith(_SEPS) or os.path.normpath(sample) != sample:
+            return None
+
+        formatted = []
+        for i, field in fields:
+            fmt, strs, memo = field.format, [], {}
+            for value in columns[i]:
+                key = value if type(value) is str else (type(value), value)
+                try:
+                    value_str = memo[key]
+                except KeyError:
+                    value_str = memo[key] = fmt(value)
+                    if (not value_str.strip('.') or
+                            any(sep in value_str for sep in _SEPS)):
+                        return None
+                except TypeError:  # Unhashable value
+                    return None
+                strs.append(value_str)
+            formatted.append(strs)
+
+        literals[0] = norm_prefix + literals[0]
+        template = "{}".join(x.replace("{", "{{").replace("}", "}}")
+                             for x in literals)
+        return map(template.format, *formatted)
@@ -0,0 +1,195 @@
+import json
+import os
+from collections import OrderedDict, namedtuple
+from pathsjson.finder import FileFinder
+from pathsjson.helpers import *
+from pathsjson.impl import PathsJSON
+
+
+GlobalsLayer = namedtuple('GlobalsLayer', ['expansions', 'paths'])
+
+
+def copy_data(data):
+    """
+    Copy a paths.json data structure deep enough for patching.
+
+    :param data: the paths.json data structure
+    :return: a copy sharing only the (immutable) strings
+    """
+    copied = OrderedDict()
+    for k, v in data.items():
+        if isinstance(v, dict):
+            v = OrderedDict(v)
+        elif isinstance(v, list):
+            v = list(v)
+        copied[k] = v
+    return copied
+
+
+def closed_keys_of(global_data):
+    """
+    Find the global path vars whose expansion doesn't depend on the file
+    they're applied to.
+
+    Globals override the definitions (and `__ENV` entries) of the file, so
+    a global path var is closed if it only uses `__ENV` entries defined by
+    the globals and other closed path vars.
+
+    :param global_data: the user's global data
+    :return: the set of closed path vars
+    """
+    env = global_data.get('__ENV', {})
+    requirements = to_requirements_of(global_data)
+    dependents = to_dependencies_of(requirements)
+    n_required = {k: len(v) for k, v in requirements.items()}
+
+    candidates = {k for k, path in path_vars_in(global_data)
+                  if all(el[2:] in env for el in path if is_env_var(el))}
+    frontier = [k for k in candidates if not n_required[k]]
+
+    closed = set()
+    while frontier:
+        k = frontier.pop()
+        closed.add(k)
+        for m in dependents.get(k, ()):
+            n_required[m] -= 1
+            if not n_required[m] and m in candidates:
+                frontier.append(m)
+
+    return closed
+
+
+class PathsJSONRegistry:
+    """
+    Load the paths.json files of many projects, sharing the work.
+
+    The user's global file is parsed once (per change), and its path vars
+    that don't depend on a project are expanded and compiled once for all
+    projects. Parsed files are cached on their contents and the files are
+    found through a shared FileFinder.
+
+    :param target_name: the file name to find
+    :param finder: the FileFinder to search with (a new one by default)
+    :param options: passed to each PathsJSON
+    """
+
+    def __init__(self, target_name=".paths.json", finder=None, **options):
+        self._target_name = target_name
+        self._options = options
+        self._env = options.get('env')
+        self._enable_env_overrides = options.get('enable_env_overrides', True)
+
+        if finder is None:
+            finder = FileFinder(target_name)
+        self.finder = finder
+
+        self._instances = {}
+        self._parsed = {}
+        self._globals_path = None
+        self._globals = None  # (fingerprint, env values, data, layer)
+
+    def find(self, src_dir=None):
+        """
+        :param src_dir: the directory to start from or the cwd by default
+        :return: the file path of the first paths.json file found walking
+            towards the root (see FileFinder) or None
+        """
+        return self.finder.find(src_dir)
+
+    def get(self, src_dir=None, file_path=None):
+        """
+        :param src_dir: the directory to search from (see `find`)
+        :param file_path: the paths.json file, instead of searching
+        :return: the PathsJSON of the file, reloaded if it changed since
+            it was last returned
+        """
+        if file_path is None:
+            file_path = self.find(src_dir)
+            if file_path is None:
+                raise IOError("No `{}` file found!".format(self._target_name))
+
+        file_path = os.path.abspath(file_path)
+        instance = self._instances.get(file_path)
+
+        if instance is None:
+            instance = PathsJSON(file_path=file_path, registry=self,
+                                 **self._options)
+            self._instances[file_path] = instance
+        else:
+            instance.reload_if_changed()
+
+        return instance
+
+    def get_many(self, src_dirs):
+        """
+        :param src_dirs: the directories to search from
+        :return: a map of directory => PathsJSON
+        """
+        return OrderedDict((src_dir, self.get(src_dir))
+                           for src_dir in src_dirs)
+
+    def parse(self, file_path, src_bytes):
+        """
+        :param file_path: the paths.json file
+        :param src_bytes: its contents
+        :return: a copy of the parsed data, parsing only if the contents
+            changed since the last parse
+        """
+        cached = self._parsed.get(file_path)
+
+        if cached is None or cached[0] != src_bytes:
+            data = json.loads(src_bytes.decode('utf-8'),
+                              object_pairs_hook=OrderedDict)
+            cached = self._parsed[file_path] = (src_bytes, data)
+
+        return copy_data(cached[1])
+
+    def user_globals(self):
+        """
+        :return: a (global data or None, GlobalsLayer or None) pair. Don't
+            modify either.
+        """
+        if self._globals_path is None:
+            self._globals_path = get_user_globals_path()
+
+        fingerprint = file_fingerprint(self._globals_path)
+        cached = self._globals
+
+        if cached is not None and cached[0] == fingerprint:
+            if cached[2] is None or cached[1] == self._env_values(cached[2]):
+                return cached[2], cached[3]
+
+        global_data = load_user_globals()
+        layer = None
+
+        if global_data is not None:
+            global_data.setdefault('__ENV', OrderedDict())
+            layer = self._build_layer(global_data)
+
+        self._globals = (fingerprint, self._env_values(global_data),
+                         global_data, layer)
+
+        return global_data, layer
+
+    def _env_values(self, global_data):
+        if global_data is None or not self._enable_env_overrides:
+            return ()
+        return env_fingerprint(env_names_in(global_data), self._env)
+
+    def _build_layer(self, global_data):
+        data = copy_data(global_data)
+        if self._enable_env_overrides:
+            data = patch_with_env(data, self._env)
+
+        # Path vars overridden by the environment aren't shared.
+        closed = {k for k in closed_keys_of(global_data)
+                  if data[k] == global_data[k]}
+        if not closed:
+            return None
+
+        subset = OrderedDict((k, v) for k, v in data.items()
+                             if k in closed or k == '__ENV')
+        expansions = expand(subset)
+
+        # Without caches, which each PathsJSON has its own of.
+        return GlobalsLayer(expansions, to_paths(expansions))
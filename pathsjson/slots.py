@@ -0,0 +1,15 @@
+def assign(obj, **attrs):
+    """
+    Initialize the slots of an immutable object (see `immutable`).
+    """
+    for name, value in attrs.items():
+        object.__setattr__(obj, name, value)
+
+
+def immutable(obj, *args):
+    """
+    A `__setattr__`/`__delattr__` that refuses every change.
+
+    :raises AttributeError: always
+    """
+    raise AttributeError("{} is immutable".format(type(obj).__name__))
@@ -0,0 +1,166 @@
+import marshal
+import os
+import struct
+import sys
+from collections import OrderedDict
+from pathsjson.base import BasePaths
+from pathsjson.compiled import FORMAT_VERSION, decode_paths, encode_paths
+
+# The shared memory starts with the length of the snapshot's bytes, since
+# the segment may be rounded up to a page.
+_HEADER = struct.Struct("<Q")
+
+
+class PathsSnapshot(BasePaths):
+    """
+    A frozen, compact view of loaded paths for resolving in other
+    processes.
+
+    It holds only the compiled templates (no source data, environment or
+    file state), never reloads and pickles as its marshalled bytes (see
+    `to_bytes`). It resolves like a PathsJSON. Make one with
+    `PathsJSON.snapshot`.
+
+    :param paths: the mapping of path var => Path
+    :param file_path: the paths.json file it was loaded from, if any
+    """
+
+    __slots__ = ('_paths', '_file_path')
+
+    def __init__(self, paths, file_path=None):
+        self._paths = OrderedDict(paths)
+        self._file_path = file_path
+
+    @property
+    def file_path(self):
+        return self._file_path
+
+    def to_bytes(self):
+        """
+        :return: the snapshot as bytes (see `from_bytes`)
+        """
+        return marshal.dumps((FORMAT_VERSION, self._file_path,
+                              encode_paths(self._paths, dedup=True)))
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        :param data: the bytes (or any buffer, e.g. a memoryview) of
+            `to_bytes`
+        :return: the PathsSnapshot
+        :raises ValueError: if the data is of another format version
+        """
+        version, file_path, states = marshal.loads(data)
+        if version != FORMAT_VERSION:
+            raise ValueError("Snapshot format {} isn't {}".format(
+                version, FORMAT_VERSION))
+
+        return cls(decode_paths(states), file_path)
+
+    def __reduce__(self):
+        return PathsSnapshot.from_bytes, (self.to_bytes(),)
+
+    def __contains__(self, k):
+        return k in self._paths
+
+    def __iter__(self):
+        return iter(self._paths)
+
+    def __len__(self):
+        return len(self._paths)
+
+
+# The names of the segments this process published.
+_PUBLISHED = set()
+
+
+def _attach_shared_memory(name):
+    """
+    Attach to a segment without leaving it to this process's resource
+    tracker, which would unlink it when this process exits.
+
+    Before Python 3.13, `SharedMemory` always registers the segment, so it
+    is unregistered again. Not in the publisher or its multiprocessing
+    children though: they share the publisher's tracker, which only keeps
+    a set of names, so that would drop the publisher's registration.
+
+    :return: the SharedMemory
+    """
+    from multiprocessing import parent_process, resource_tracker
+    from multiprocessing.shared_memory import SharedMemory
+
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name, track=False)
+
+    shm = SharedMemory(name)
+    if (os.name == 'posix' and name not in _PUBLISHED and
+            parent_process() is None):
+        resource_tracker.unregister("/" + name, "shared_memory")
+    return shm
+
+
+class SharedSnapshot:
+    """
+    A PathsSnapshot published in shared memory, for worker processes to
+    `attach` to by name instead of each loading the paths.json file (or
+    unpickling a snapshot per task).
+
+    The publishing process owns the segment: `close` (or leaving the
+    `with` block) unlinks it. Any process can attach, and attaching never
+    leaves the segment to that process's resource tracker. Needs Python
+    3.8+.
+
+    :param snapshot: the PathsSnapshot
+    """
+
+    def __init__(self, snapshot):
+        from multiprocessing.shared_memory import SharedMemory
+
+        data = snapshot.to_bytes()
+        self._shm = SharedMemory(create=True, size=_HEADER.size + len(data))
+        _HEADER.pack_into(self._shm.buf, 0, len(data))
+        self._shm.buf[_HEADER.size:_HEADER.size + len(data)] = data
+        self._name = self._shm.name
+        _PUBLISHED.add(self._name)
+
+    @property
+    def name(self):
+        """The name to `attach` with."""
+        return self._name
+
+    def close(self):
+        shm, self._shm = self._shm, None
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+            _PUBLISHED.discard(self._name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def attach(name):
+    """
+    Load a snapshot from shared memory.
+
+    This isn't zero-copy: the published bytes are unmarshalled in place,
+    but every Path is decoded into this process's memory, like
+    `PathsSnapshot.from_bytes` does. It saves each worker reading and
+    parsing the paths.json file, not the Path objects.
+
+    :param name: the name of the SharedSnapshot
+    :return: the PathsSnapshot
+    """
+    shm = _attach_shared_memory(name)
+    try:
+        n, = _HEADER.unpack_from(shm.buf, 0)
+        data = shm.buf[_HEADER.size:_HEADER.size + n]
+        try:
+            return PathsSnapshot.from_bytes(data)
+        finally:
+            data.release()
+    finally:
+        shm.close()
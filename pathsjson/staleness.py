@@ -0,0 +1,139 @@
+import os
+from collections import OrderedDict
+from pathsjson.helpers import map_concurrently, topo_sort
+
+
+def _mtime_of(path_str):
+    try:
+        return os.stat(path_str).st_mtime_ns
+    except OSError:
+        return None
+
+
+class BuildGraph:
+    """
+    Make-style staleness of path vars.
+
+    Each rule makes a target path var from source path vars. A target is
+    stale (i.e. needs a rebuild) if it's missing, if a source is newer or
+    missing, or if a source is itself stale. Sources without a rule are
+    inputs, which are never stale.
+
+    Each check stats every path it needs again, in one concurrent batch,
+    so edits to any file show up. With `cache_mtimes`, modification times
+    are kept between checks instead and only unseen paths are statted:
+    then `mark_built` rebuilt targets (and `refresh` after editing inputs)
+    or their old times still count. The subgraph (and its ordering) of
+    each set of targets is cached either way.
+
+    :param resolve: a function of path var => path string
+    :param max_workers: the number of threads to stat with, or None to
+        stat serially
+    :param cache_mtimes: if True, keep modification times between checks
+    """
+
+    def __init__(self, resolve, max_workers=16, cache_mtimes=False):
+        self._resolve = resolve
+        self._max_workers = max_workers
+        self._cache_mtimes = cache_mtimes
+        self._sources = OrderedDict()  # target => [source, ...]
+        self._mtimes = {}  # path string => mtime_ns or None if missing
+        self._plans = {}  # targets => (requirements, ordering)
+
+    @property
+    def rules(self):
+        """The mapping of target => [source, ...]."""
+        return OrderedDict((k, list(v)) for k, v in self._sources.items())
+
+    def depends(self, target, *sources):
+        """
+        Declare that the target is made from the sources (in addition to
+        any sources declared before).
+
+        :param target: the path var that's produced
+        :param sources: the path vars it consumes
+        """
+        existing = self._sources.setdefault(target, [])
+        existing.extend(k for k in sources if k not in existing)
+        self._plans.clear()
+
+    def _plan(self, targets):
+        """
+        :return: the (requirements, topological ordering) of the subgraph
+            the targets depend on, cached until the rules change
+        """
+        plan = self._plans.get(targets)
+        if plan is not None:
+            return plan
+
+        requirements, frontier = {}, list(targets)
+        while frontier:
+            k = frontier.pop()
+            if k not in requirements:
+                requirements[k] = set(self._sources.get(k, ()))
+                frontier.extend(requirements[k])
+
+        plan = self._plans[targets] = (requirements, topo_sort(requirements))
+        return plan
+
+    def mtimes(self, keys):
+        """
+        :param keys: the path vars
+        :return: a map of path var => mtime_ns or None if missing, statting
+            the paths concurrently (only the uncached ones with
+            `cache_mtimes`)
+        """
+        path_strs = {k: self._resolve(k) for k in keys}
+        mtimes = self._mtimes if self._cache_mtimes else {}
+
+        unseen = sorted(set(p for p in path_strs.values() if p not in mtimes))
+        for path_str, mtime in zip(unseen, map_concurrently(
+                _mtime_of, unseen, self._max_workers)):
+            mtimes[path_str] = mtime
+
+        return {k: mtimes[p] for k, p in path_strs.items()}
+
+    def stale(self, targets=None):
+        """
+        :param targets: a path var or path vars to check, or None for every
+            target with a rule
+        :return: the stale targets in build order, including the stale
+            targets the given ones depend on
+        :raises ResolveError: if the rules have a cycle
+        """
+        if targets is None:
+            targets = tuple(self._sources)
+        elif isinstance(targets, str):
+            targets = (targets,)
+        else:
+            targets = tuple(targets)
+
+        requirements, ordering = self._plan(targets)
+        mtimes = self.mtimes(ordering)
+
+        stale = set()
+        for k in ordering:
+            sources, mtime = requirements[k], mtimes[k]
+            if sources and (mtime is None or
+                            any(s in stale or mtimes[s] is None or
+                                mtimes[s] > mtime for s in sources)):
+                stale.add(k)
+
+        return [k for k in ordering if k in stale]
+
+    def mark_built(self, *keys):
+        """
+        Forget the cached modification times of the path vars, e.g. after
+        rebuilding them (only needed with `cache_mtimes`).
+
+        :param keys: the path vars
+        """
+        for k in keys:
+            self._mtimes.pop(self._resolve(k), None)
+
+    def refresh(self):
+        """
+        Forget every cached modification time (only needed with
+        `cache_mtimes`).
+        """
+        self._mtimes.clear()
@@ -0,0 +1,102 @@
+import sys
+from collections import OrderedDict
+from time import perf_counter
+
+
+AUDIT_EVENT = 'pathsjson.load'
+
+LOGGER_NAME = 'pathsjson'
+
+
+class LoadStats:
+    """
+    The timings of the last load of a PathsJSON and its counters.
+
+    Phases that didn't run (e.g. `globals` when user global overrides are
+    disabled) are left out. In order, they are `find` (searching for the
+    file, only on the first load), `read` (stat and read), `compiled`
+    (trying the compiled cache), `parse`, `globals`, `env` (including the
+    special variables), `validate`, `expand`, `paths` (compiling the
+    templates), `index` (instead of the last two in lazy mode) and `dump`
+    (writing the compiled cache).
+
+    `loads` counts the loads and `resolves` the paths resolved since the
+    PathsJSON was created (streamed batches aren't counted).
+
+    :param file_path: the paths.json file
+    """
+
+    def __init__(self, file_path=None):
+        self.file_path = file_path
+        self.phases = OrderedDict()
+        self.compiled = False
+        self.n_keys = 0
+        self.loads = 0
+        self.resolves = 0
+        self._last = None
+
+    @property
+    def total(self):
+        """The seconds the last load took, in all."""
+        return sum(self.phases.values())
+
+    def start(self):
+        self.phases = OrderedDict()
+        self.compiled = False
+        self._last = perf_counter()
+
+    def lap(self, phase):
+        """
+        Record the time since the last lap (or start) as a phase.
+        """
+        now = perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def as_dict(self):
+        return OrderedDict([('file_path', self.file_path),
+                            ('phases', OrderedDict(self.phases)),
+                            ('total', self.total),
+                            ('compiled', self.compiled),
+                            ('n_keys', self.n_keys),
+                            ('loads', self.loads),
+                            ('resolves', self.resolves)])
+
+    def format(self):
+        """
+        :return: a human readable breakdown of the phases
+        """
+        total = self.total
+        lines = ["{} ({} keys{})".format(
+            self.file_path, self.n_keys,
+            ", compiled cache" if self.compiled else "")]
+        for phase, seconds in self.phases.items():
+            lines.append("  {:<10}{:>9.2f} ms {:>5.1f}%".format(
+                phase, 1e3 * seconds, 100 * seconds / total if total else 0))
+        lines.append("  {:<10}{:>9.2f} ms".format("total", 1e3 * total))
+        return "\n".join(lines)
+
+
+def report_load(stats, on_load=None):
+    """
+    Report a finished load to the callback, as a `pathsjson.load` audit
+    event (see `sys.addaudithook`) and to the `pathsjson` logger at DEBUG.
+
+    The logger is only used if the program imported `logging`, so it
+    costs nothing otherwise.
+
+    :param stats: the LoadStats of the load
+    :param on_load: a callable taking the LoadStats or None
+    """
+    if on_load is not None:
+        on_load(stats)
+
+    audit = getattr(sys, 'audit', None)  # Python 3.8+
+    if audit is not None:
+        audit(AUDIT_EVENT, stats)
+
+    logging = sys.modules.get('logging')
+    if logging is not None:
+        logger = logging.getLogger(LOGGER_NAME)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Loaded %s", stats.format())
@@ -0,0 +1,108 @@
+import json
+import os
+
+
+SELF_DIR = os.path.dirname(os.path.realpath(__file__))
+
+SCHEMA_FILE = os.path.join(SELF_DIR, "schema.json")
+
+ENV_KEY = '__ENV'
+
+_SCHEMA_VALIDATOR = None
+
+
+class ValidationError(ValueError):
+    """Raised when a paths.json data structure has an invalid shape."""
+
+
+def _is_str(x):
+    return isinstance(x, str)
+
+
+def validate_structure(data):
+    """
+    Validate the shape of a paths.json data structure without jsonschema.
+
+    This mirrors `schema.json`: the `__ENV` entry maps names to strings
+    or nulls and every path var maps to an array of strings.
+
+    :param data: the paths.json data structure
+    :return: the data structure
+    :raises ValidationError: on the first violation found
+    """
+    if not isinstance(data, dict):
+        raise ValidationError("paths.json must be an object")
+
+    for k, v in data.items():
+        if k == ENV_KEY:
+            if not isinstance(v, dict):
+                raise ValidationError("__ENV must be an object")
+            for name, default in v.items():
+                if default is not None and not _is_str(default):
+                    msg = "__ENV.{} must be a string or null"
+                    raise ValidationError(msg.format(name))
+        elif k.startswith(ENV_KEY):
+            continue  # Unconstrained by the schema.
+        elif not isinstance(v, list):
+            raise ValidationError("{} must be an array of strings".format(k))
+        else:
+            # A plain loop, since this runs for every element of the file.
+            for el in v:
+                if not isinstance(el, str):
+                    msg = "{} must be an array of strings"
+                    raise ValidationError(msg.format(k))
+
+    return data
+
+
+def get_schema_validator():
+    """
+    Build (once) and return the jsonschema validator for `schema.json`.
+
+    The schema is read and checked on the first call only; later calls
+    reuse the compiled validator.
+
+    :return: a jsonschema validator instance
+    """
+    global _SCHEMA_VALIDATOR
+
+    if _SCHEMA_VALIDATOR is None:
+        import jsonschema  # Optional: only needed for strict validation.
+
+        with open(SCHEMA_FILE) as fp:
+            schema = json.load(fp)
+
+        cls = jsonschema.validators.validator_for(schema)
+        cls.check_schema(schema)
+        _SCHEMA_VALIDATOR = cls(schema)
+
+    return _SCHEMA_VALIDATOR
+
+
+def validate_strict(data):
+    """
+    Validate a paths.json data structure against `schema.json`.
+
+    :param data: the paths.json data structure
+    :return: the data structure
+    :raises jsonschema.ValidationError: if the data is invalid
+    """
+    get_schema_validator().validate(data)
+    return data
+
+
+def validate(data, mode=True):
+    """
+    Validate a paths.json data structure.
+
+    :param data: the paths.json data structure
+    :param mode: False to skip validation, 'strict' to use jsonschema, or
+        any other truthy value for the fast structural validator
+    :return: the data structure
+    """
+    if not mode:
+        return data
+    elif mode == 'strict':
+        return validate_strict(data)
+    else:
+        return validate_structure(data)
@@ -20,19 +20,21 @@ CLASSIFIERS = ["Development Status :: 3 - Alpha",
                "Intended Audience :: Developers",
                "Topic :: Scientific/Engineering :: Information Analysis",
                "License :: OSI Approved :: MIT License",
-               "Programming Language :: Python :: 2.7",
                "Programming Language :: Python :: 3",
-               "Programming Language :: Python :: 3.2",
-               "Programming Language :: Python :: 3.3",
-               "Programming Language :: Python :: 3.4",
-               "Programming Language :: Python :: 3.5",
                "Programming Language :: Python :: 3.6",
+               "Programming Language :: Python :: 3.7",
+               "Programming Language :: Python :: 3.8",
+               "Programming Language :: Python :: 3.9",
                "Topic :: Software Development :: Build Tools",
                "Topic :: Software Development :: Code Generators",
                "Topic :: System :: Filesystems",
                "Topic :: Utilities"]
 
-INSTALL_REQUIRES = ['appdirs', 'jsonschema']
+PYTHON_REQUIRES = '>=3.6'
+
+INSTALL_REQUIRES = ['appdirs']
+
+EXTRAS_REQUIRE = {'strict': ['jsonschema']}
 
 ##############################################################################
 
@@ -69,7 +71,10 @@ if __name__ == "__main__":
         package_dir={"pathsjson": "pathsjson"},
         package_data={"pathsjson": ["pathsjson/*.json"]},
         entry_points={'console_scripts': ['pathsjson = pathsjson.cli:main']},
+        scripts=['bin/pathsjson-client'],
         include_package_data=True,
         classifiers=CLASSIFIERS,
+        python_requires=PYTHON_REQUIRES,
         install_requires=INSTALL_REQUIRES,
+        extras_require=EXTRAS_REQUIRE,
     )
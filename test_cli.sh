@@ -72,6 +72,24 @@ diff .paths.json cli_tests/test_5.expected.txt
 
 rm .paths.json
 
+###############################################################################
+# 6. Test --get
+###############################################################################
+
+(PWD=cli_tests/full_env \
+    coverage run --source=pathsjson --append -m pathsjson.cli \
+    --get LATEST_DATA > cli_tests/outputs/test_6.txt) || true
+diff cli_tests/outputs/test_6.txt cli_tests/test_6.expected.txt
+
+###############################################################################
+# 7. Test --keys with --json
+###############################################################################
+
+(PWD=cli_tests/full_env \
+    coverage run --source=pathsjson --append -m pathsjson.cli \
+    --keys '*DATA*' --json > cli_tests/outputs/test_7.txt) || true
+diff cli_tests/outputs/test_7.txt cli_tests/test_7.expected.txt
+
 ###############################################################################
 # tearDown
 ###############################################################################
@@ -1,6 +1,8 @@
 import copy
 import os
 import json
+import shutil
+import tempfile
 
 from contextlib import contextmanager
 
@@ -53,3 +55,51 @@ def delete_and_replace(path):
         finally:
             if os.path.exists(path):
                 os.unlink(path)
+
+
+class TempProjectMixin:
+    """
+    A temporary project directory per test for a unittest.TestCase, removed
+    after the test. Call `make_project` in `setUp`.
+    """
+
+    def make_project(self, data=None):
+        """
+        Make the directory (`self.root`) and name its paths.json file
+        (`self.file_path`).
+
+        :param data: if given, the paths.json data to write
+        """
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.file_path = os.path.join(self.root, ".paths.json")
+        if data is not None:
+            self.write(data)
+
+    def write(self, data, file_path=None):
+        """
+        Write a paths.json file (`self.file_path` by default) and its
+        directories. Its mtime moves on a second, so a rewrite is seen
+        regardless of the file system's timestamp granularity.
+        """
+        if file_path is None:
+            file_path = self.file_path
+        if not os.path.isdir(os.path.dirname(file_path)):
+            os.makedirs(os.path.dirname(file_path))
+
+        with open(file_path, "w") as fp:
+            json.dump(data, fp)
+        st = os.stat(file_path)
+        os.utime(file_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+    def touch(self, *parts):
+        """
+        Create an empty file (and its directories) under `self.root`.
+
+        :return: the file path
+        """
+        file_path = os.path.join(self.root, *parts)
+        if not os.path.isdir(os.path.dirname(file_path)):
+            os.makedirs(os.path.dirname(file_path))
+        open(file_path, "w").close()
+        return file_path
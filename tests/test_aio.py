@@ -0,0 +1,96 @@
+import asyncio
+import os
+import unittest
+from pathsjson.aio import *
+from tests import *
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class TestAsyncPathsJSON(TempProjectMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.make_project({"__ENV": {"name": None},
+                           "OUT_DIR": ["$$_IMPLICIT_ROOT", "out"],
+                           "OUT_FILE": ["$OUT_DIR", "$$name"]})
+
+    def make(self, **kwargs):
+        return AsyncPathsJSON(src_dir=self.root,
+                              enable_user_global_overrides=False, **kwargs)
+
+    def test_load_and_resolve(self):
+        async def go():
+            async with self.make() as paths:
+                return (paths['OUT_DIR'], paths['OUT_FILE', 'x'],
+                        paths.resolve_many('OUT_FILE', ['a', 'b']))
+
+        out_dir = os.path.join(self.root, "out")
+        self.assertEqual(run(go()), (out_dir, os.path.join(out_dir, "x"),
+                                     [os.path.join(out_dir, "a"),
+                                      os.path.join(out_dir, "b")]))
+
+    def test_not_loaded(self):
+        paths = self.make()
+        self.assertFalse(paths.is_loaded)
+        with self.assertRaisesRegexp(RuntimeError, "await load"):
+            paths['OUT_DIR']
+        run(paths.close())
+
+    def test_auto_reload_unsupported(self):
+        with self.assertRaisesRegexp(ValueError, "auto_reload"):
+            self.make(auto_reload=True)
+
+    def test_reload_if_changed(self):
+        async def go():
+            async with self.make() as paths:
+                unchanged = await paths.reload_if_changed()
+                self.write({"OUT_DIR": ["/elsewhere"]})
+                changed = await paths.reload_if_changed()
+                return unchanged, changed, paths['OUT_DIR']
+
+        self.assertEqual(run(go()), (False, True, "/elsewhere"))
+
+    def test_open(self):
+        async def go():
+            async with self.make() as paths:
+                res = paths.resolve('OUT_FILE', 'x')
+                async with res.open("w") as fp:
+                    await fp.write("hello")
+                async with res.open() as fp:
+                    return await fp.read()
+
+        self.assertEqual(run(go()), "hello")
+
+    def test_ensure_dirs(self):
+        async def go():
+            async with self.make() as paths:
+                return await paths.ensure_dirs(["OUT_DIR"])
+
+        out_dir = os.path.join(self.root, "out")
+        self.assertEqual(run(go()), [out_dir])
+        self.assertTrue(os.path.isdir(out_dir))
+
+    def test_ensure_dirs_async(self):
+        dir_paths = [os.path.join(self.root, "a", "b"),
+                     os.path.join(self.root, "a"),
+                     os.path.join(self.root, "c")]
+        leaves = run(ensure_dirs_async(dir_paths))
+        self.assertEqual(leaves, [os.path.join(self.root, "c"),
+                                  os.path.join(self.root, "a", "b")])
+        self.assertTrue(all(os.path.isdir(p) for p in dir_paths))
+
+    def test_enumerate(self):
+        os.makedirs(os.path.join(self.root, "out", "y"))
+
+        async def go():
+            async with self.make() as paths:
+                return await paths.enumerate('OUT_FILE')
+
+        self.assertEqual(run(go()), [(os.path.join(self.root, "out", "y"),
+                                      {"name": "y"})])
@@ -0,0 +1,71 @@
+import os
+import time
+import unittest
+from pathsjson.audit import *
+from pathsjson.impl import PathsJSON
+from tests import *
+
+
+class TestAudit(TempProjectMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.make_project({"__ENV": {"name": None},
+                           "FULL_DIR": ["$$_IMPLICIT_ROOT", "full"],
+                           "EMPTY_DIR": ["$$_IMPLICIT_ROOT", "empty"],
+                           "MISSING_FILE": ["$$_IMPLICIT_ROOT", "missing.txt"],
+                           "ITEM_FILE": ["$FULL_DIR", "$$name"]})
+
+        os.makedirs(os.path.join(self.root, "empty"))
+        with open(self.touch("full", "a"), "w") as fp:
+            fp.write("a")
+        self.touch("full", "b")
+
+        self.paths = PathsJSON(src_dir=self.root,
+                               enable_user_global_overrides=False)
+
+    def keys(self, entries):
+        return sorted((e.key, os.path.basename(e.path)) for e in entries)
+
+    def test_stat_path(self):
+        entry = stat_path("K", os.path.join(self.root, "full", "a"))
+        self.assertEqual((entry.exists, entry.is_dir, entry.size,
+                          entry.empty), (True, False, 1, False))
+
+        entry = stat_path("K", os.path.join(self.root, "empty"))
+        self.assertEqual((entry.exists, entry.is_dir, entry.empty),
+                         (True, True, True))
+
+        entry = stat_path("K", os.path.join(self.root, "nope"))
+        self.assertEqual((entry.exists, entry.size, entry.mtime),
+                         (False, None, None))
+
+    def test_audit(self):
+        report = self.paths.audit()
+        self.assertEqual(self.keys(report.entries),
+                         [("EMPTY_DIR", "empty"), ("FULL_DIR", "full"),
+                          ("MISSING_FILE", "missing.txt")])
+        self.assertEqual(self.keys(report.missing),
+                         [("MISSING_FILE", "missing.txt")])
+        self.assertEqual(self.keys(report.empty), [("EMPTY_DIR", "empty")])
+        self.assertEqual(report.stale, [])
+        self.assertGreaterEqual(report.elapsed, 0)
+
+    def test_audit_serial_matches(self):
+        self.assertEqual(self.paths.audit(max_workers=None).entries,
+                         self.paths.audit().entries)
+
+    def test_audit_instances(self):
+        report = self.paths.audit(keys=["ITEM_FILE"], instances=True)
+        self.assertEqual([(os.path.basename(e.path), e.args)
+                          for e in report.entries],
+                         [("a", {"name": "a"}), ("b", {"name": "b"})])
+        self.assertEqual(self.keys(report.empty), [("ITEM_FILE", "b")])
+
+    def test_audit_stale(self):
+        report = self.paths.audit(max_age=60)
+        self.assertEqual(report.stale, [])
+
+        report = audit_paths(self.paths._paths, max_age=60,
+                             now=time.time() + 120)
+        self.assertEqual(self.keys(report.stale),
+                         [("EMPTY_DIR", "empty"), ("FULL_DIR", "full")])
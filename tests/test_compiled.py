@@ -0,0 +1,94 @@
+import stat
+import sys
+import unittest
+from unittest import mock
+from pathsjson.compiled import *
+from pathsjson.impl import PathsJSON
+from tests import *
+
+
+class TestCompiledCache(TempProjectMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.make_project({"__ENV": {"VERSION": "1"},
+                           "DATA": ["$$_IMPLICIT_ROOT", "data"],
+                           "FILE": ["$DATA", "$$VERSION", "file.csv"]})
+        self.cache_dir = os.path.join(self.root, "cache")
+
+    def load(self):
+        return PathsJSON(self.file_path, enable_user_global_overrides=False,
+                         compiled_cache=self.cache_dir)
+
+    def test_hit(self):
+        PATHS = self.load()
+        self.assertTrue(PATHS._expansion)  # Compiled from source.
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+        CACHED = self.load()
+        self.assertFalse(CACHED._expansion)  # Loaded from the cache.
+        self.assertEqual(CACHED._paths, PATHS._paths)
+        self.assertEqual(CACHED._src, PATHS._src)
+        self.assertEqual(CACHED['FILE', '2'], PATHS['FILE', '2'])
+        self.assertFalse(CACHED.reload_if_changed())
+
+        if os.name == 'posix':
+            mode = stat.S_IMODE(os.stat(self.cache_dir).st_mode)
+            self.assertEqual(mode, 0o700)
+
+    def test_miss_on_source_change(self):
+        self.load()
+        self.write({"DATA": ["elsewhere"]})
+        PATHS = self.load()
+        self.assertTrue(PATHS._expansion)
+        self.assertEqual(PATHS['DATA'], "elsewhere")
+
+    def test_miss_on_env_change(self):
+        self.load()
+        with override_env(VERSION='2'):
+            PATHS = self.load()
+            self.assertTrue(PATHS._expansion)
+            self.assertIn(os.path.join("2", "file.csv"), PATHS['FILE'])
+
+    def test_miss_on_options(self):
+        self.load()
+        PATHS = PathsJSON(self.file_path, enable_user_global_overrides=False,
+                          compiled_cache=self.cache_dir, validate=False)
+        self.assertTrue(PATHS._expansion)
+
+    def test_miss_on_other_interpreter(self):
+        self.load()
+        with mock.patch.object(sys.implementation, 'cache_tag', 'other-00'):
+            self.assertTrue(self.load()._expansion)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+    def test_only(self):
+        PARTIAL = PathsJSON(self.file_path, enable_user_global_overrides=False,
+                            compiled_cache=self.cache_dir, only=["DATA"])
+        self.assertEqual(list(PARTIAL.all_resolvable_paths), ["DATA"])
+        self.assertFalse(os.path.exists(self.cache_dir))  # Not written.
+
+        PATHS = self.load()
+        CACHED = PathsJSON(self.file_path, enable_user_global_overrides=False,
+                           compiled_cache=self.cache_dir, only=["FILE"])
+        self.assertTrue(CACHED.stats.compiled)
+        self.assertEqual(sorted(CACHED.all_resolvable_paths), ["DATA", "FILE"])
+        self.assertEqual(CACHED["FILE"], PATHS["FILE"])
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+    def test_corrupt_cache_file(self):
+        self.load()
+        cache_path = os.path.join(self.cache_dir,
+                                  os.listdir(self.cache_dir)[0])
+        with open(cache_path, "wb") as fp:
+            fp.write(b"garbage")
+
+        self.assertTrue(self.load()._expansion)
+        self.assertFalse(self.load()._expansion)
+
+    def test_unwritable_cache_dir(self):
+        open(self.cache_dir, "w").close()  # A file, not a directory.
+        self.assertEqual(self.load()['DATA'], os.path.join(self.root, "data"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,185 @@
+import os
+import socket
+import stat
+import subprocess
+import threading
+import time
+import unittest
+from unittest import mock
+from pathsjson.daemon import *
+from tests import *
+
+
+class TestDaemon(TempProjectMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.make_project({"__ENV": {"VERSION": "1", "name": None},
+                           "DATA_DIR": ["$$_IMPLICIT_ROOT", "data",
+                                        "$$VERSION"],
+                           "ITEM": ["$DATA_DIR", "$$name"]})
+
+        self.socket_path = os.path.join(self.root, "d.sock")
+        ready = threading.Event()
+        self.thread = threading.Thread(
+            target=serve, args=(self.file_path, self.socket_path),
+            kwargs={"ready": lambda _: ready.set(),
+                    "enable_user_global_overrides": False})
+        self.thread.start()
+        ready.wait(5)
+
+    def tearDown(self):
+        try:
+            request(self.socket_path, ["stop"], env={})
+        finally:
+            self.thread.join(5)
+
+    def data_dir(self, version):
+        return os.path.join(self.root, "data", version)
+
+    def test_split_args(self):
+        self.assertEqual(split_args(["a", "b=c", "d"]), (["a", "d"],
+                                                         {"b": "c"}))
+
+    def test_cksum(self):
+        # As `printf '%s' ... | cksum` prints.
+        self.assertEqual(cksum(b""), 4294967295)
+        self.assertEqual(cksum(b"/a/.paths.json"), 3210776290)
+
+    def test_socket_path_for(self):
+        with override_env(XDG_RUNTIME_DIR="/run/user/1"):
+            self.assertEqual(socket_path_for("/a/.paths.json"),
+                             "/run/user/1/pathsjson/3210776290.sock")
+        with override_env(TMPDIR="/scratch"):
+            self.assertEqual(socket_path_for("/a/.paths.json"),
+                             "/scratch/pathsjson-{}/3210776290.sock".format(
+                                 os.getuid()))
+        with override_env(PATHSJSON_SOCKET="/tmp/x.sock"):
+            self.assertEqual(socket_path_for("/a/.paths.json"), "/tmp/x.sock")
+
+    def test_client_socket_path(self):
+        client = os.path.join(os.path.dirname(SELF_DIR), "bin",
+                              "pathsjson-client")
+        env = {"PATH": os.environ.get("PATH", ""),
+               "XDG_RUNTIME_DIR": os.path.join(self.root, "run")}
+        proc = subprocess.Popen(["sh", client, "ping"], cwd=self.root,
+                                env=env, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE,
+                                universal_newlines=True)
+        _, err = proc.communicate()
+        with override_env(**env):
+            self.assertIn(socket_path_for(self.file_path), err)
+
+    def test_make_private_dir(self):
+        dir_path = os.path.join(self.root, "private")
+        make_private_dir(dir_path)
+        make_private_dir(dir_path)
+        self.assertEqual(stat.S_IMODE(os.stat(dir_path).st_mode), 0o700)
+
+        os.chmod(dir_path, 0o755)
+        with self.assertRaisesRegexp(OSError, "private"):
+            make_private_dir(dir_path)
+
+    def test_socket_is_private(self):
+        mode = stat.S_IMODE(os.stat(self.socket_path).st_mode)
+        self.assertEqual(mode, 0o600)
+
+    def test_default_socket(self):
+        run_dir = os.path.join(self.root, "run")
+        with mock.patch.dict(os.environ, XDG_RUNTIME_DIR=run_dir):
+            socket_path = socket_path_for(self.file_path)
+            ready = threading.Event()
+            thread = threading.Thread(
+                target=serve, args=(self.file_path,),
+                kwargs={"ready": lambda _: ready.set(),
+                        "enable_user_global_overrides": False})
+            thread.start()
+            try:
+                self.assertTrue(ready.wait(5))
+                self.assertEqual(request(socket_path, ["ping"], env={}), "")
+            finally:
+                request(socket_path, ["stop"], env={})
+                thread.join(5)
+
+        mode = stat.S_IMODE(os.stat(os.path.dirname(socket_path)).st_mode)
+        self.assertEqual(mode, 0o700)
+        self.assertFalse(os.path.exists(socket_path))
+
+    def test_ping(self):
+        self.assertEqual(request(self.socket_path, ["ping"], env={}), "")
+
+    def test_stalled_client(self):
+        stalled = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            stalled.connect(self.socket_path)  # And never sends a request.
+            start = time.time()
+            self.assertEqual(request(self.socket_path, ["ping"], env={}), "")
+            self.assertLess(time.time() - start, 1)
+        finally:
+            stalled.close()
+
+    def test_get(self):
+        self.assertEqual(request(self.socket_path, ["get", "DATA_DIR"],
+                                 env={}), self.data_dir("1") + "\n")
+        self.assertEqual(request(self.socket_path, ["get", "ITEM", "name=x"],
+                                 env={}),
+                         os.path.join(self.data_dir("1"), "x") + "\n")
+        self.assertEqual(request(self.socket_path, ["get", "ITEM", "2", "x"],
+                                 env={}),
+                         os.path.join(self.data_dir("2"), "x") + "\n")
+
+    def test_exports(self):
+        self.assertEqual(request(self.socket_path, ["make-exports"], env={}),
+                         "DATA_DIR?={}\n".format(self.data_dir("1")))
+        self.assertEqual(request(self.socket_path, ["shell-exports"], env={}),
+                         'export DATA_DIR="{}"\n'.format(self.data_dir("1")))
+
+    def test_client_env(self):
+        self.assertEqual(request(self.socket_path, ["get", "DATA_DIR"],
+                                 env={"VERSION": "tmp"}),
+                         self.data_dir("tmp") + "\n")
+        self.assertEqual(request(self.socket_path, ["get", "DATA_DIR"],
+                                 env={}),
+                         self.data_dir("1") + "\n")
+
+    def test_loads_once_per_env(self):
+        resolver = Resolver(self.file_path,
+                            enable_user_global_overrides=False)
+        a = resolver.paths_for({"VERSION": "2", "OTHER": "a"})
+        b = resolver.paths_for({"OTHER": "a"})
+        self.assertIsNot(a, b)
+        self.assertIs(resolver.paths_for({"VERSION": "2", "OTHER": "b"}), a)
+        self.assertIs(resolver.paths_for({}), b)
+        self.assertEqual((a.stats.loads, b.stats.loads), (1, 1))
+        self.assertEqual(a["DATA_DIR"], self.data_dir("2"))
+
+        self.write({"__ENV": {"ROOT": "/r"}, "DATA_DIR": ["$$ROOT"]})
+        c = resolver.paths_for({"VERSION": "2", "ROOT": "/c"})
+        self.assertEqual(c["DATA_DIR"], "/c")
+        self.assertIs(resolver.paths_for({"ROOT": "/c"}), c)
+
+    def test_reloads(self):
+        with open(self.file_path, "w") as fp:
+            json.dump({"DATA_DIR": ["/elsewhere"]}, fp)
+        st = os.stat(self.file_path)
+        os.utime(self.file_path, ns=(st.st_atime_ns,
+                                     st.st_mtime_ns + 10 ** 9))
+
+        self.assertEqual(request(self.socket_path, ["get", "DATA_DIR"],
+                                 env={}), "/elsewhere\n")
+
+    def test_errors(self):
+        with self.assertRaisesRegexp(DaemonError, "Unknown command"):
+            request(self.socket_path, ["nope"], env={})
+        with self.assertRaisesRegexp(DaemonError, "NOPE"):
+            request(self.socket_path, ["get", "NOPE"], env={})
+        # Still serving.
+        self.assertEqual(request(self.socket_path, ["ping"], env={}), "")
+
+    def test_already_serving(self):
+        with self.assertRaisesRegexp(OSError, "already listens"):
+            serve(self.file_path, self.socket_path,
+                  enable_user_global_overrides=False)
+
+    def test_no_daemon(self):
+        with self.assertRaises(OSError):
+            request(os.path.join(self.root, "none.sock"), ["ping"], env={})
@@ -0,0 +1,76 @@
+import unittest
+from pathsjson.enumeration import enumerate_path
+from pathsjson.impl import PathsJSON
+from pathsjson.path import Path
+from tests import *
+
+
+class TestEnumeration(TempProjectMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.make_project()
+        for day in ['2017-01-01', '2017-01-02']:
+            for shard in ['0', '1']:
+                self.touch(day, 'shard-' + shard, 'part.csv')
+        self.touch('2017-01-03', 'shard-0', 'other.csv')
+        self.touch('2017-01-03', 'not-a-shard', 'part.csv')
+        self.touch('README')
+
+    def make_path(self):
+        tmpl = os.path.join("{}", "{}", "shard-{}", "part.csv")
+        return Path(tmpl, ['_IMPLICIT_ROOT', 'DAY', 'SHARD'],
+                    [self.root, '2017-01-01', None])
+
+    def test_enumerate(self):
+        result = list(enumerate_path(self.make_path()))
+        expected = [(os.path.join(self.root, d, 'shard-' + s, 'part.csv'),
+                     {'DAY': d, 'SHARD': s})
+                    for d in ['2017-01-01', '2017-01-02'] for s in '01']
+        self.assertEqual(result, expected)
+
+    def test_enumerate_with_fixed_args(self):
+        result = list(enumerate_path(self.make_path(), SHARD='1',
+                                     DAY='2017-01-02'))
+        expected = [(os.path.join(self.root, '2017-01-02', 'shard-1',
+                                  'part.csv'), {})]
+        self.assertEqual(result, expected)
+
+        result = list(enumerate_path(self.make_path(), SHARD=1))
+        self.assertEqual([b for _, b in result],
+                         [{'DAY': '2017-01-01'}, {'DAY': '2017-01-02'}])
+
+    def test_enumerate_unknown_arg(self):
+        with self.assertRaisesRegexp(TypeError, "Unknown args: NOPE"):
+            list(enumerate_path(self.make_path(), NOPE=1))
+
+    def test_enumerate_repeated_name(self):
+        self.touch('a', 'a.txt')
+        self.touch('b', 'a.txt')
+        path = Path(os.path.join(self.root, "{}", "{}.txt"), ['X', 'X'],
+                    [None, None])
+        result = list(enumerate_path(path))
+        self.assertEqual(result, [(os.path.join(self.root, 'a', 'a.txt'),
+                                   {'X': 'a'})])
+
+    def test_enumerate_constant(self):
+        path = Path(os.path.join(self.root, 'README'))
+        self.assertEqual(list(enumerate_path(path)),
+                         [(os.path.join(self.root, 'README'), {})])
+
+        path = Path(os.path.join(self.root, 'MISSING'))
+        self.assertEqual(list(enumerate_path(path)), [])
+
+    def test_paths_json_enumerate(self):
+        file_path = os.path.join(self.root, '.paths.json')
+        with open(file_path, 'w') as fp:
+            json.dump({"__ENV": {"DAY": None},
+                       "PARTS": ["$$_IMPLICIT_ROOT", "$$DAY", "shard-0",
+                                 "part.csv"]}, fp)
+
+        PATHS = PathsJSON(file_path, enable_user_global_overrides=False)
+        result = [b['DAY'] for _, b in PATHS.enumerate('PARTS')]
+        self.assertEqual(result, ['2017-01-01', '2017-01-02'])
+
+
+if __name__ == '__main__':
+    unittest.main()
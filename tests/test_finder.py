@@ -0,0 +1,128 @@
+import os
+import unittest
+from unittest import mock
+from pathsjson.finder import *
+from tests import *
+
+
+class TestFileFinder(TempProjectMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.make_project()
+        self.leaf = os.path.join(self.root, "repo", "a", "b")
+        os.makedirs(self.leaf)
+        self.target = self.touch("repo", "target")
+
+    def bump_mtime(self, dir_path):
+        # Don't rely on the file system's timestamp granularity.
+        st = os.stat(dir_path)
+        os.utime(dir_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+    def test_find(self):
+        finder = FileFinder("target")
+        self.assertEqual(finder.find(self.leaf), self.target)
+        self.assertEqual(finder.find(os.path.join(self.root, "repo")),
+                         self.target)
+        self.assertIsNone(finder.find(self.root))
+
+    def test_matches_find_file_asc(self):
+        from pathsjson.helpers import find_file_asc
+        finder = FileFinder("test_target")
+        self.assertEqual(finder.find(MOCK_LEAF),
+                         find_file_asc(MOCK_LEAF, "test_target"))
+
+    def test_caches_subtree(self):
+        finder = FileFinder("target")
+        finder.find(self.leaf)
+
+        os.unlink(self.target)
+        # Every directory visited on the way up is cached.
+        self.assertEqual(finder.find(os.path.join(self.root, "repo", "a")),
+                         self.target)
+
+        finder.clear()
+        self.assertIsNone(finder.find(self.leaf))
+
+    def test_caches_negative(self):
+        finder = FileFinder("target", stop_dirs=[self.leaf])
+        self.assertIsNone(finder.find(self.leaf))
+
+        self.touch(os.path.join(self.leaf, "target"))
+        self.assertIsNone(finder.find(self.leaf))
+
+    def test_validate(self):
+        finder = FileFinder("target", validate=True)
+        self.assertEqual(finder.find(self.leaf), self.target)
+
+        os.unlink(self.target)
+        self.bump_mtime(os.path.dirname(self.target))
+        self.assertIsNone(finder.find(self.leaf))
+
+        new_target = os.path.join(self.leaf, "target")
+        self.touch(new_target)
+        self.bump_mtime(self.leaf)
+        self.assertEqual(finder.find(self.leaf), new_target)
+
+    def test_boundaries(self):
+        self.touch(os.path.join(self.root, "target"))
+        os.unlink(self.target)
+
+        finder = FileFinder("target")
+        self.assertEqual(finder.find(self.leaf),
+                         os.path.join(self.root, "target"))
+
+        os.mkdir(os.path.join(self.root, "repo", ".git"))
+        finder = FileFinder("target", boundaries=[".git"])
+        self.assertIsNone(finder.find(self.leaf))
+
+        finder = FileFinder("target", stop_dirs=[os.path.join(self.root,
+                                                              "repo", "a")])
+        self.assertIsNone(finder.find(self.leaf))
+
+    def test_boundary_dir_is_searched(self):
+        os.mkdir(os.path.join(self.root, "repo", ".git"))
+        finder = FileFinder("target", boundaries=[".git"])
+        self.assertEqual(finder.find(self.leaf), self.target)
+
+    def test_find_many(self):
+        other = os.path.join(self.root, "other")
+        os.mkdir(other)
+
+        finder = FileFinder("target")
+        found = finder.find_many([self.leaf, other, self.leaf])
+        self.assertEqual(list(found.items()),
+                         [(self.leaf, self.target), (other, None)])
+
+    def test_other_target_name(self):
+        other = self.touch("repo", "a", "other")
+        finder = FileFinder("target")
+        self.assertEqual(finder.find(self.leaf), self.target)
+        self.assertEqual(finder.find(self.leaf, "other"), other)
+        self.assertEqual(finder.find(self.leaf), self.target)
+        self.assertIsNone(finder.find(self.leaf, "missing"))
+
+    def test_paths_json_target_name(self):
+        from pathsjson.impl import PathsJSON
+        self.write({"DATA_DIR": ["data"]},
+                   os.path.join(self.root, "repo", "a", "custom.json"))
+
+        finder = FileFinder()
+        paths = PathsJSON(src_dir=self.leaf, target_name="custom.json",
+                          finder=finder, enable_user_global_overrides=False)
+        self.assertEqual(paths._file_path,
+                         os.path.join(self.root, "repo", "a", "custom.json"))
+
+        with self.assertRaisesRegexp(IOError, "No `.paths.json` file"):
+            PathsJSON(src_dir=self.leaf, finder=finder)
+
+    def test_find_many_validated(self):
+        other = os.path.join(self.root, "repo", "a", "c")
+        os.mkdir(other)
+
+        finder = FileFinder("target", validate=True)
+        with mock.patch.object(finder, '_state', wraps=finder._state) as state:
+            found = finder.find_many([self.leaf, other])
+        self.assertEqual(list(found.values()), [self.target, self.target])
+
+        probed = [call[0][0] for call in state.call_args_list]
+        self.assertEqual(sorted(probed), sorted(set(probed)))
@@ -0,0 +1,112 @@
+import os
+import unittest
+from collections import OrderedDict
+from pathsjson.helpers import ResolveError, expand, to_paths
+from pathsjson.impl import PathsJSON
+from pathsjson.lazypaths import *
+from tests import *
+
+
+class TestLazyPaths(unittest.TestCase):
+
+    def test_matches_eager(self):
+        data = OrderedDict(SAMPLE_DATA)
+        self.assertEqual(dict(LazyPaths(data)), dict(to_paths(expand(data))))
+
+    def test_expands_on_access(self):
+        paths = LazyPaths(OrderedDict(SAMPLE_DATA))
+        self.assertEqual(paths.loaded, {})
+        self.assertEqual(list(paths), [k for k in SAMPLE_DATA
+                                       if k != '__ENV'])
+
+        paths['LATEST_DATA']
+        self.assertEqual(list(paths.loaded), ['LATEST_DATA'])
+        self.assertEqual(sorted(paths._expansion),
+                         ['DATA_DIR', 'LATEST_DATA', 'RAW_DIR'])
+
+    def test_unknown(self):
+        paths = LazyPaths(OrderedDict(SAMPLE_DATA))
+        for k in ['NOPE', '__ENV']:
+            self.assertNotIn(k, paths)
+            with self.assertRaises(KeyError):
+                paths[k]
+
+    def test_errors_on_access(self):
+        paths = LazyPaths({'__ENV': {}, 'OK': ["a"], 'A': ["$B"],
+                           'B': ["$A"], 'C': ["$OK", "$X"]})
+        self.assertEqual(paths['OK'].path, "a")
+
+        with self.assertRaisesRegexp(ResolveError, "cycle A -> B -> A"):
+            paths['A']
+        with self.assertRaisesRegexp(ResolveError, r"undefined \$X"):
+            paths['C']
+        with self.assertRaisesRegexp(ResolveError, "Resolve failed on A, B, C"):
+            paths.check()
+
+    def test_empty_path(self):
+        paths = LazyPaths({'E': []})
+        with self.assertRaisesRegexp(ValueError, "empty path"):
+            paths['E']
+
+    def test_deep_chain(self):
+        n = 5000
+        data = OrderedDict([('P0', ['root'])])
+        for i in range(1, n):
+            data['P{}'.format(i)] = ['$P{}'.format(i - 1), str(i)]
+
+        path = LazyPaths(data)['P{}'.format(n - 1)]
+        self.assertEqual(path.path, os.path.join('root', *[str(i) for i in
+                                                           range(1, n)]))
+
+
+class TestLazyPathsJSON(TempProjectMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.make_project({"DATA_DIR": ["data"],
+                           "RAW_DIR": ["$DATA_DIR", "raw"],
+                           "BROKEN": ["$NOPE"]})
+
+    def make(self, **kwargs):
+        return PathsJSON(file_path=self.file_path, lazy=True,
+                         enable_user_global_overrides=False, **kwargs)
+
+    def test_loads_despite_errors(self):
+        paths = self.make()
+        self.assertEqual(paths['RAW_DIR'], os.path.join("data", "raw"))
+        with self.assertRaises(ResolveError):
+            paths['BROKEN']
+        with self.assertRaises(ResolveError):
+            paths.check()
+
+        with self.assertRaises(ResolveError):
+            PathsJSON(file_path=self.file_path,
+                      enable_user_global_overrides=False)
+
+    def test_reload_reuses_unchanged(self):
+        paths = self.make(cache_size=8)
+        raw_dir, data_dir = paths._paths['RAW_DIR'], paths._paths['DATA_DIR']
+
+        self.write({"DATA_DIR": ["data"], "RAW_DIR": ["$DATA_DIR", "raw"],
+                    "OTHER": ["x"]})
+        self.assertTrue(paths.reload_if_changed())
+        self.assertIs(paths._paths['RAW_DIR'], raw_dir)
+        paths.check()
+
+        self.write({"DATA_DIR": ["elsewhere"],
+                    "RAW_DIR": ["$DATA_DIR", "raw"]})
+        paths.reload()
+        self.assertIsNot(paths._paths['DATA_DIR'], data_dir)
+        self.assertEqual(paths['RAW_DIR'], os.path.join("elsewhere", "raw"))
+
+    def test_ignores_compiled_cache(self):
+        cache_dir = os.path.join(self.root, "cache")
+        paths = self.make(compiled_cache=cache_dir)
+        self.assertIsNone(paths._compiled_cache_path)
+        paths.reload()
+        self.assertFalse(os.path.exists(cache_dir))
+
+    def test_cache_info_counts_loaded(self):
+        paths = self.make(cache_size=8)
+        paths['RAW_DIR']
+        self.assertEqual(paths.cache_info().currsize, 0)
+        self.assertEqual(list(paths._paths.loaded), ['RAW_DIR'])
@@ -0,0 +1,93 @@
+import os
+import unittest
+from collections import OrderedDict
+from pathsjson.helpers import expand, to_paths
+from pathsjson.impl import PathsJSON
+from pathsjson.matching import *
+from tests import *
+
+
+def make_matcher(data):
+    return PathMatcher(to_paths(expand(OrderedDict(data))))
+
+
+class TestPathMatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = make_matcher([
+            ("__ENV", {"_ROOT": "/srv/project", "VERSION": "1",
+                       "name": None, "kind": None, "year": None}),
+            ("DATA_DIR", ["$$_ROOT", "data"]),
+            ("VERSION_DIR", ["$DATA_DIR", "$$VERSION"]),
+            ("RAW_FILE", ["$VERSION_DIR", "raw", "$$year"]),
+            ("ANY_FILE", ["$DATA_DIR", "$$kind", "$$name"]),
+            ("LOG_FILE", ["$DATA_DIR", "logs", "$$name"]),
+            ("PAIR", ["$DATA_DIR", "pairs", "$$name", "$$name"]),
+        ])
+
+    def test_constant(self):
+        self.assertEqual(self.matcher.match("/srv/project/data"),
+                         ("DATA_DIR", {}))
+        self.assertEqual(self.matcher.match("/srv/project/./data/"),
+                         ("DATA_DIR", {}))
+
+    def test_args(self):
+        self.assertEqual(self.matcher.match("/srv/project/data/2/raw/x"),
+                         ("RAW_FILE", {"VERSION": "2", "year": "x"}))
+        self.assertEqual(self.matcher.match("/srv/project/data/2"),
+                         ("VERSION_DIR", {"VERSION": "2"}))
+
+    def test_most_specific(self):
+        self.assertEqual(self.matcher.match("/srv/project/data/logs/a"),
+                         ("LOG_FILE", {"name": "a"}))
+        self.assertEqual(self.matcher.match("/srv/project/data/tmp/a"),
+                         ("ANY_FILE", {"kind": "tmp", "name": "a"}))
+
+    def test_repeated_arg(self):
+        self.assertEqual(self.matcher.match("/srv/project/data/pairs/a/a"),
+                         ("PAIR", {"name": "a"}))
+        self.assertIsNone(self.matcher.match("/srv/project/data/pairs/a/b"))
+
+    def test_no_match(self):
+        for path_str in ["/srv/other/data", "/srv/project/data/2/raw/x/y",
+                         "/srv/project/data/2/raw/sub/x", "data", "/"]:
+            self.assertIsNone(self.matcher.match(path_str))
+
+    def test_relative(self):
+        matcher = make_matcher([("__ENV", {"x": None}), ("A", ["$$x", "a"]),
+                                ("B", ["./b", "$$x"])])
+        self.assertEqual(matcher.match("1/a"), ("A", {"x": "1"}))
+        self.assertEqual(matcher.match("b/2"), ("B", {"x": "2"}))
+
+    def test_match_many(self):
+        path_strs = ["/srv/project/data/logs/{}".format(i)
+                     for i in range(3)] + ["/srv/project/data", "/nope"]
+        self.assertEqual(list(self.matcher.match_many(path_strs)),
+                         [self.matcher.match(p) for p in path_strs])
+
+
+class TestPathsJSONMatch(TempProjectMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.make_project({"__ENV": {"name": None},
+                           "ITEM": ["$$_IMPLICIT_ROOT", "items", "$$name"]})
+
+    def test_match(self):
+        for lazy in [False, True]:
+            paths = PathsJSON(file_path=self.file_path, lazy=lazy,
+                              enable_user_global_overrides=False)
+            path_str = paths.resolve_path("ITEM", "x")
+            self.assertEqual(paths.match(path_str), ("ITEM", {"name": "x"}))
+            self.assertEqual(list(paths.match_many([path_str])),
+                             [("ITEM", {"name": "x"})])
+
+    def test_rebuilt_on_reload(self):
+        paths = PathsJSON(file_path=self.file_path,
+                          enable_user_global_overrides=False)
+        path_str = os.path.join(self.root, "things", "x")
+        self.assertIsNone(paths.match(path_str))
+
+        self.write({"__ENV": {"name": None},
+                    "THING": ["$$_IMPLICIT_ROOT", "things", "$$name"]})
+        paths.reload()
+        self.assertEqual(paths.match(path_str), ("THING", {"name": "x"}))
@@ -1,6 +1,6 @@
 import os
 import unittest
-from pathsjson.path import Path
+from pathsjson.path import Path, ResolveCache
 
 
 class TestPath(unittest.TestCase):
@@ -62,3 +62,167 @@ class TestPath(unittest.TestCase):
                     ['[implicit]', 'pathsjson'])
         path_str = os.path.join("[implicit]", "0.0.2")
         self.assertEqual(path.resolve("0.0.2"), path_str)
+
+    def test_resolve_matches_full_normalization(self):
+        tmpls = [os.path.join("data", "raw", "{}", "x.csv"),
+                 os.path.join(os.sep, "abs", "{}"),
+                 os.path.join(".", "{}"),
+                 os.path.join("a", "..", "{}", "b"),
+                 os.path.join("{}", "usr"),
+                 os.path.join("a", "{}{}")]
+        values = ["x", "..", os.sep, "", ".", os.path.join("a", ".", "b"),
+                  os.path.join("..", "y")]
+
+        for tmpl in tmpls:
+            n = tmpl.count("{}")
+            path = Path(tmpl, ['A{}'.format(i) for i in range(n)], ['d'] * n)
+            for i, v in enumerate(values):
+                args = [v] + values[i + 1:i + n]
+                args += ['d'] * (n - len(args))
+                self.assertEqual(path.resolve(*args),
+                                 os.path.normpath(tmpl.format(*args)))
+
+    def test_resolve_constant_is_precomputed(self):
+        path = Path(os.path.join("data", "{}"), ['VERSION'], ['0.0.1'])
+        self.assertIs(path.resolve(), path.resolve())
+
+    def test_resolve_with_repeated_arg_names(self):
+        path_tmpl = os.path.join("{}", "{}")
+        path = Path(path_tmpl, ['A', 'A'], ['x', 'y'])
+        self.assertEqual(path.resolve(A="z"), os.path.join("z", "y"))
+        self.assertEqual(path.resolve("a", "b"), os.path.join("a", "b"))
+
+    def test_resolve_many(self):
+        path = Path(os.path.join("data", "{}", "{}"), ['DAY', 'SHARD'],
+                    ['1', '0'])
+        arg_sets = [('2', '3'), ['4', '5'], {'SHARD': '6'}, '7', ('2', '3')]
+        expected = [path.resolve(*x) if isinstance(x, (tuple, list))
+                    else path.resolve(**x) if isinstance(x, dict)
+                    else path.resolve(x) for x in arg_sets]
+
+        self.assertEqual(list(path.resolve_many(arg_sets)), expected)
+        self.assertEqual(list(path.resolve_many(arg_sets, dedup=True)),
+                         expected)
+
+        with self.assertRaisesRegexp(TypeError, "Too many args"):
+            list(path.resolve_many([(1, 2, 3)]))
+
+        self.assertEqual(list(path.resolve_many([(1,), (True,), (1.0,)],
+                                                dedup=True)),
+                         list(path.resolve_many([(1,), (True,), (1.0,)])))
+
+    def test_resolve_columns(self):
+        path = Path(os.path.join("data", "{}", "{}"), ['DAY', 'SHARD'],
+                    ['1', '0'])
+        expected = [os.path.join("data", "a", "x"),
+                    os.path.join("data", "b", "y")]
+
+        self.assertEqual(list(path.resolve_columns([['a', 'b'], 'xy'])),
+                         expected)
+        self.assertEqual(list(path.resolve_columns({'SHARD': 'xy',
+                                                    'DAY': ['a', 'b']})),
+                         expected)
+        self.assertEqual(list(path.resolve_columns({'SHARD': 'xy'})),
+                         [os.path.join("data", "1", "x"),
+                          os.path.join("data", "1", "y")])
+
+        with self.assertRaisesRegexp(ValueError, "same length"):
+            path.resolve_columns([['a', 'b'], ['x']])
+
+        # Column-wise formatting matches resolving row by row, including
+        # values that need normalizing and equal values of other types.
+        for template in [os.path.join("data", "{}", "{}.csv"),
+                         os.path.join("data", "{1}-{0:03d}"),
+                         os.path.join("data", "{}", "..", "{}")]:
+            path = Path(template, ['DAY', 'SHARD'], [None, None])
+            days = [1, 1, 2, 3] if "03d" in template else [1, True, 1.0, 'a']
+            for shards in [['x', 'y', 'x', 'z'], ['x', '..', '.', 'a/b']]:
+                self.assertEqual(
+                    list(path.resolve_columns([days, shards])),
+                    [path.resolve(d, s) for d, s in zip(days, shards)])
+
+    def test_immutable(self):
+        path = Path("a/{}", ["x"], [None], cache_size=4)
+        with self.assertRaisesRegexp(AttributeError, "immutable"):
+            path._path = "b/{}"
+        with self.assertRaises(AttributeError):
+            del path._cache
+        self.assertFalse(hasattr(path, "__dict__"))
+
+    def test_pickle(self):
+        import pickle
+        path = Path("a/{}", ["x"], ["1"], cache_size=4)
+        copy = pickle.loads(pickle.dumps(path))
+        self.assertEqual(copy, path)
+        self.assertEqual(copy.resolve(), path.resolve())
+        self.assertEqual(copy.cache.maxsize, 4)
+
+
+class TestResolveCache(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        cache = ResolveCache(2)
+        cache['a'], cache['b'] = 'A', 'B'
+        self.assertEqual(cache.get('a'), 'A')
+        cache['c'] = 'C'
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.info(), (1, 1, 2, 2))
+
+    def test_clear(self):
+        cache = ResolveCache(2)
+        cache['a'] = 'A'
+        cache.get('a')
+        cache.clear()
+        self.assertEqual(cache.info(), (0, 0, 2, 0))
+
+    def test_rejects_non_positive_size(self):
+        with self.assertRaises(ValueError):
+            ResolveCache(0)
+
+    def test_thread_safe(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        path = Path(os.path.join("shard", "{}"), ["n"], [None], cache_size=4)
+
+        def resolve_all(offset):
+            return [path.resolve((i + offset) % 16) for i in range(2000)]
+
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(resolve_all, range(8)))
+
+        for offset, path_strs in enumerate(results):
+            self.assertEqual(path_strs, [os.path.join("shard", str(
+                (i + offset) % 16)) for i in range(2000)])
+        self.assertLessEqual(len(path.cache), 4)
+
+    def test_cached_resolve(self):
+        path_tmpl = os.path.join("data", "{}", "{}")
+        path = Path(path_tmpl, ['VERSION', 'PROJ'], ['0.0.1', 'pathsjson'],
+                    cache_size=8)
+        path_str = os.path.join("data", "0.0.2", "vaquero")
+
+        self.assertEqual(path.resolve("0.0.2", "vaquero"), path_str)
+        self.assertEqual(path.resolve("0.0.2", "vaquero"), path_str)
+        self.assertEqual(path.resolve(PROJ="vaquero", VERSION="0.0.2"),
+                         path_str)
+        self.assertEqual(path.resolve(VERSION="0.0.2", PROJ="vaquero"),
+                         path_str)
+        self.assertEqual(path.cache.info(), (2, 2, 8, 2))
+
+        # Unhashable arguments bypass the cache.
+        path.resolve(["x"])
+        self.assertEqual(path.cache.info(), (2, 2, 8, 2))
+
+        # Equal arguments of different types format differently.
+        shard = Path(os.path.join("shard", "{}"), ["n"], [None],
+                     cache_size=8)
+        self.assertEqual([shard.resolve(1), shard.resolve(True),
+                          shard.resolve(1.0), shard.resolve(n=True)],
+                         [os.path.join("shard", x)
+                          for x in ["1", "True", "1.0", "True"]])
+
+        # Errors aren't cached.
+        with self.assertRaisesRegexp(TypeError, "Too many args"):
+            path.resolve(1, 2, 3)
+        with self.assertRaisesRegexp(TypeError, "Too many args"):
+            path.resolve(1, 2, 3)
@@ -1,8 +1,11 @@
 import platform
+import subprocess
+import sys
 import uuid
 import unittest
 from tests import *
 from pathsjson.impl import *
+from pathsjson.lazy import LazyPathsJSON
 
 
 class TestPathsJSONFunctions(unittest.TestCase):
@@ -59,6 +62,31 @@ class TestPathsJSONFunctions(unittest.TestCase):
         with self.assertRaisesRegexp(LookupError, "Resolve failed on"):
             topo_sort(g)
 
+    def test_subgraph_of(self):
+        data = {'__ENV': {}, 'a': ["$b"], 'b': ["x"], 'c': ["$b"], 'd': []}
+        self.assertEqual(list(subgraph_of(data, ['a'])), ['__ENV', 'a', 'b'])
+        self.assertEqual(sorted(subgraph_of(data, ['[ac]'])),
+                         ['__ENV', 'a', 'b', 'c'])
+        self.assertEqual(list(subgraph_of(data, ['nope'])), ['__ENV'])
+
+    def test_topo_sort_leaves_requirements_untouched(self):
+        g = to_requirements_of(SAMPLE_DATA)
+        topo_sort(g)
+        self.assertEqual(g, to_requirements_of(SAMPLE_DATA))
+
+    def test_topo_sort_reports_all_failures(self):
+        g = to_requirements_of({'a': ["$b"], 'b': ["$c"], 'c': ["$a"],
+                                'd': ["$x"], 'e': ["$d", "$y"], 'f': []})
+        with self.assertRaises(ResolveError) as ctx:
+            topo_sort(g)
+
+        e = ctx.exception
+        self.assertEqual(e.failed, ['a', 'b', 'c', 'd', 'e'])
+        self.assertEqual(e.missing, {'d': ['x'], 'e': ['y']})
+        self.assertEqual(e.cycles, [['a', 'b', 'c', 'a']])
+        self.assertIn("cycle a -> b -> c -> a", str(e))
+        self.assertIn("undefined $x (required by d)", str(e))
+
     def test_expand(self):
         result = expand(SAMPLE_DATA)
 
@@ -73,6 +101,25 @@ class TestPathsJSONFunctions(unittest.TestCase):
                     "RAW_DIR": ["data", "raw"]}
         self.assertEqual(result, expected)
 
+    def test_expand_leaves_data_untouched(self):
+        data = copy.deepcopy(SAMPLE_DATA)
+        expand(data)
+        self.assertEqual(data, SAMPLE_DATA)
+
+    def test_expand_shares_prefixes(self):
+        result = expand(SAMPLE_DATA)
+        self.assertIs(result['CODEBOOK_DIR'].parts[0], result['CLEAN_DIR'])
+
+    def test_expand_deep_chain(self):
+        n = 5000
+        data = OrderedDict([('P0', ['root'])])
+        for i in range(1, n):
+            data['P{}'.format(i)] = ['$P{}'.format(i - 1), str(i)]
+
+        result = expand(data)
+        self.assertEqual(list(result['P{}'.format(n - 1)]),
+                         ['root'] + [str(i) for i in range(1, n)])
+
     def test_expand_env_var_with_null(self):
         result = expand({'__ENV': {'VERSION': None},
                          'PATH': ['a', '$$VERSION']})
@@ -93,6 +140,30 @@ class TestPathsJSONFunctions(unittest.TestCase):
                     "TEST_DIR": Path(os.path.join("data", "tests"))}
         self.assertEqual(paths, expected)
 
+    def test_to_paths_deep_chain(self):
+        data = OrderedDict([('P0', ['root', '$$V'])])
+        for i in range(1, 3000):
+            data['P{}'.format(i)] = ['$P{}'.format(i - 1), str(i)]
+
+        path = to_paths(expand(data))['P2999']
+        self.assertEqual(path.path, os.path.join('root', '{}',
+                                                 *map(str, range(1, 3000))))
+        self.assertEqual(path.arg_names, ('V',))
+
+    def test_to_paths_plain_lists(self):
+        # Each list is wrapped in a temporary Expansion, whose id may be
+        # reused once it's collected.
+        expansion = OrderedDict(('K{}'.format(i), ['a', str(i)])
+                                for i in range(8))
+        paths = to_paths(expansion)
+        for i in range(8):
+            self.assertEqual(paths['K{}'.format(i)].resolve(),
+                             os.path.join('a', str(i)))
+
+    def test_to_paths_rejects_empty_path(self):
+        with self.assertRaisesRegexp(ValueError, "empty path"):
+            to_paths(expand({'A': []}))
+
     def test_root_paths(self):
         data = {"__ENV": {}, "user_bin": ["$$_DRIVE_ROOT", "usr", "bin"]}
         inject_special_variables(data, FIXTURES_DIR)
@@ -123,6 +194,24 @@ class TestPathsJSONFunctions(unittest.TestCase):
             self.assertEqual(data['__ENV']['VERSION'], '3.1.4')
             self.assertEqual(data['RAW_DIR'], '/root')
 
+    def test_patch_with_env_mapping(self):
+        class LookupOnly(dict):
+            def __iter__(self):
+                raise AssertionError("Scanned the environment")
+
+            items = keys = values = __iter__
+
+        raw = copy.deepcopy(SAMPLE_DATA)
+        env = LookupOnly(VERSION='3.1.4', UNRELATED='x')
+        data = patch_with_env(raw, env)
+        self.assertEqual(data['__ENV']['VERSION'], '3.1.4')
+        self.assertNotIn('UNRELATED', data)
+
+    def test_env_names_in(self):
+        self.assertEqual(env_names_in(SAMPLE_DATA),
+                         ('CLEAN_DIR', 'CODEBOOK_DIR', 'DATA_DIR',
+                          'LATEST_DATA', 'RAW_DIR', 'TEST_DIR', 'VERSION'))
+
     def test_create_user_globals_file(self):
         path = get_user_globals_path()
 
@@ -148,7 +237,37 @@ class TestPathsJSONFunctions(unittest.TestCase):
                              expected)
 
 
-class TestPathsJSON(unittest.TestCase):
+class TestLazyPathsJSON(unittest.TestCase):
+
+    def test_loads_on_first_use(self):
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return PathsJSON(src_dir=FIXTURES_DIR,
+                             target_name="sample.paths.json",
+                             enable_user_global_overrides=False)
+
+        PATHS = LazyPathsJSON(factory)
+        self.assertFalse(PATHS.is_loaded)
+        self.assertEqual(PATHS['CLEAN_DIR'], os.path.join("data", "clean"))
+        self.assertEqual(PATHS.resolve_path('DATA_DIR'), "data")
+        self.assertTrue(repr(PATHS).startswith("PathsJSON("))
+        self.assertEqual(calls, [1])
+
+    def test_automagic_import_is_lazy(self):
+        code = ("import sys, pathsjson.automagic as m; "
+                "assert 'appdirs' not in sys.modules; "
+                "assert not m.PATHS.is_loaded; "
+                "print(m.PATHS['DATA_DIR'])")
+        env = dict(os.environ, PWD=TWITTER_DIR,
+                   PYTHONPATH=os.path.dirname(SELF_DIR))
+        output = subprocess.check_output([sys.executable, "-c", code],
+                                         env=env, universal_newlines=True)
+        self.assertTrue(output.strip())
+
+
+class TestPathsJSON(TempProjectMixin, unittest.TestCase):
 
     def setUp(self):
         self.PATHS = PathsJSON(src_dir=FIXTURES_DIR,
@@ -162,6 +281,17 @@ class TestPathsJSON(unittest.TestCase):
         with self.assertRaisesRegexp(IOError, "file found"):
             PathsJSON(src_dir=MOCK_LEAF, target_name=uuid.uuid4().hex)
 
+    def test_only(self):
+        paths = PathsJSON(src_dir=FIXTURES_DIR,
+                          target_name="sample.paths.json",
+                          enable_user_global_overrides=False,
+                          only=['LATEST_DATA'])
+        self.assertEqual(sorted(paths.all_resolvable_paths),
+                         ['DATA_DIR', 'LATEST_DATA', 'RAW_DIR'])
+        self.assertEqual(paths['LATEST_DATA'], self.PATHS['LATEST_DATA'])
+        with self.assertRaises(KeyError):
+            paths['CLEAN_DIR']
+
     def test_simple_path(self):
         self.assertEqual(self.PATHS['CLEAN_DIR'],
                          os.path.join("data", "clean"))
@@ -183,6 +313,37 @@ class TestPathsJSON(unittest.TestCase):
         self.assertEqual(resolution.path_str,
                          os.path.join("data", "raw", "99", "data.csv"))
 
+    def test_resolve_many(self):
+        expected = [os.path.join("data", "raw", v, "data.csv")
+                    for v in ['1', '2', '1']]
+
+        self.assertEqual(self.PATHS.resolve_many('LATEST_DATA', '121'),
+                         expected)
+        self.assertEqual(self.PATHS.resolve_many('LATEST_DATA',
+                                                 columns=[['1', '2', '1']],
+                                                 dedup=True),
+                         expected)
+
+        result = self.PATHS.resolve_many('LATEST_DATA',
+                                         [{'VERSION': '1'}], stream=True)
+        self.assertEqual(next(result), expected[0])
+
+        with self.assertRaises(TypeError):
+            self.PATHS.resolve_many('LATEST_DATA')
+
+    def test_ensure_dirs(self):
+        self.make_project({"DATA": ["$$_IMPLICIT_ROOT", "data"],
+                           "RAW": ["$DATA", "raw"],
+                           "FILE": ["$RAW", "file.csv"]})
+        PATHS = PathsJSON(self.file_path, enable_user_global_overrides=False)
+
+        PATHS.ensure_dirs(['DATA'])
+        self.assertTrue(os.path.isdir(os.path.join(self.root, 'data')))
+
+        PATHS.ensure_dirs(['FILE'], parents=True)
+        self.assertTrue(os.path.isdir(PATHS['RAW']))
+        self.assertFalse(os.path.exists(PATHS['FILE']))
+
     def test_repr(self):
         expected = ("PathsJSON($keys=[CLEAN_DIR, CODEBOOK_DIR, DATA_DIR, "
                     "LATEST_DATA, RAW_DIR, TEST_DIR])")
@@ -241,6 +402,99 @@ class TestPathsJSON(unittest.TestCase):
 
             self.assertEqual(PATHS.reload()["ref"], "modified")
 
+    def test_reload_if_changed(self):
+        example_path = os.path.join(MOCK_LEAF, "reloading.json")
+
+        with delete_and_replace(example_path):
+            with open(example_path, "w") as fp:
+                json.dump({"ref": ["original"], "other": ["same"]}, fp)
+            PATHS = PathsJSON(example_path, enable_user_global_overrides=False)
+            other = PATHS._paths["other"]
+
+            self.assertFalse(PATHS.reload_if_changed())
+
+            with open(example_path, "w") as fp:
+                json.dump({"ref": ["modified"], "other": ["same"]}, fp)
+
+            self.assertTrue(PATHS.reload_if_changed())
+            self.assertEqual(PATHS["ref"], "modified")
+            self.assertIs(PATHS._paths["other"], other)
+            self.assertFalse(PATHS.reload_if_changed())
+
+    def test_cache(self):
+        self.assertIsNone(self.PATHS.cache_info())
+
+        PATHS = PathsJSON(src_dir=FIXTURES_DIR,
+                          target_name="sample.paths.json",
+                          enable_user_global_overrides=False,
+                          cache_size=16)
+        for _ in range(3):
+            PATHS['LATEST_DATA', '2.1.3']
+        self.assertEqual(PATHS.cache_info(), (2, 1, 16, 1))
+
+        PATHS.clear_cache()
+        self.assertEqual(PATHS.cache_info(), (0, 0, 16, 0))
+
+    def test_cache_invalidated_on_reload(self):
+        PATHS = PathsJSON(src_dir=FIXTURES_DIR,
+                          target_name="sample.paths.json",
+                          enable_user_global_overrides=False,
+                          cache_size=16)
+        PATHS['LATEST_DATA']
+
+        with override_env(VERSION='3.1.4'):
+            PATHS.reload()
+            self.assertEqual(PATHS['LATEST_DATA'],
+                             os.path.join("data", "raw", "3.1.4", "data.csv"))
+
+    def test_explicit_env(self):
+        env = {'VERSION': '2.0.0'}
+        PATHS = PathsJSON(src_dir=FIXTURES_DIR,
+                          target_name="sample.paths.json",
+                          enable_user_global_overrides=False, env=env)
+
+        with override_env(VERSION='3.1.4'):
+            self.assertEqual(PATHS['LATEST_DATA'],
+                             os.path.join("data", "raw", "2.0.0", "data.csv"))
+            self.assertFalse(PATHS.reload_if_changed())
+
+        self.assertEqual(PATHS.env_overrides, {'VERSION': '2.0.0'})
+        self.assertEqual(self.PATHS.env_overrides, {})
+
+        env['VERSION'] = '2.0.1'
+        self.assertTrue(PATHS.reload_if_changed())
+        self.assertEqual(PATHS['LATEST_DATA'],
+                         os.path.join("data", "raw", "2.0.1", "data.csv"))
+
+    def test_reload_if_changed_on_env(self):
+        PATHS = self.PATHS
+        self.assertFalse(PATHS.reload_if_changed())
+
+        with override_env(VERSION='3.1.4', UNRELATED='x'):
+            self.assertTrue(PATHS.reload_if_changed())
+            self.assertEqual(PATHS['LATEST_DATA'],
+                             os.path.join("data", "raw", "3.1.4", "data.csv"))
+
+        with override_env(VERSION='1.0.0', UNRELATED='y'):
+            self.assertTrue(PATHS.reload_if_changed())
+
+        with override_env(VERSION='1.0.0', UNRELATED='z'):
+            self.assertFalse(PATHS.reload_if_changed())
+
+    def test_auto_reload(self):
+        example_path = os.path.join(MOCK_LEAF, "reloading.json")
+
+        with delete_and_replace(example_path):
+            with open(example_path, "w") as fp:
+                json.dump({"ref": ["original"]}, fp)
+            PATHS = PathsJSON(example_path, auto_reload=True)
+            self.assertEqual(PATHS["ref"], "original")
+
+            with open(example_path, "w") as fp:
+                json.dump({"ref": ["modified"]}, fp)
+
+            self.assertEqual(PATHS["ref"], "modified")
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+from pathsjson.helpers import get_user_globals_path
+from pathsjson.registry import *
+from tests import *
+
+
+class TestRegistry(TempProjectMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.make_project()
+        self.globals_path = get_user_globals_path()
+        self.globals_guard = delete_and_replace(self.globals_path)
+        self.globals_guard.__enter__()
+
+        self.write({"__ENV": {"SCRATCH": "/scratch"},
+                    "SCRATCH_DIR": ["$$SCRATCH", "me"],
+                    "TMP_DIR": ["$SCRATCH_DIR", "tmp"],
+                    "PROJ_TMP": ["$$_IMPLICIT_ROOT", "tmp"]},
+                   self.globals_path)
+
+        for name in ["a", "b"]:
+            self.write({"DATA_DIR": ["$$_IMPLICIT_ROOT", "data"],
+                        "WORK_DIR": ["$TMP_DIR", name]},
+                       os.path.join(self.root, name, ".paths.json"))
+        os.makedirs(os.path.join(self.root, "a", "deep", "er"))
+
+    def tearDown(self):
+        self.globals_guard.__exit__(None, None, None)
+
+    def test_closed_keys_of(self):
+        data = {"__ENV": {"X": "x"},
+                "A": ["$$X"], "B": ["$A", "b"], "C": ["$$Y"], "D": ["$C"],
+                "E": ["$PROJECT_KEY"]}
+        self.assertEqual(closed_keys_of(data), {"A", "B"})
+
+    def test_shares_globals(self):
+        registry = PathsJSONRegistry()
+        a = registry.get(os.path.join(self.root, "a"))
+        b = registry.get(os.path.join(self.root, "b"))
+
+        self.assertIs(a._paths['TMP_DIR'], b._paths['TMP_DIR'])
+        self.assertIsNot(a._paths['PROJ_TMP'], b._paths['PROJ_TMP'])
+
+        self.assertEqual(a['WORK_DIR'], os.path.join("/scratch", "me", "tmp",
+                                                     "a"))
+        self.assertEqual(b['PROJ_TMP'], os.path.join(self.root, "b", "tmp"))
+
+    def test_own_caches(self):
+        self.write({"__ENV": {"SCRATCH": "/scratch", "item": None},
+                    "TMP_DIR": ["$$SCRATCH", "tmp"],
+                    "ITEM": ["$TMP_DIR", "$$item"]}, self.globals_path)
+        registry = PathsJSONRegistry(cache_size=8)
+        a = registry.get(os.path.join(self.root, "a"))
+        b = registry.get(os.path.join(self.root, "b"))
+        self.assertIsNot(a._paths['ITEM'], b._paths['ITEM'])
+        self.assertEqual(a._paths['ITEM'], b._paths['ITEM'])
+
+        for paths in [a, a, b]:
+            paths.resolve_path('ITEM', item='x')
+        self.assertEqual(a.cache_info().hits, 1)
+        self.assertEqual(b.cache_info().hits, 0)
+
+        a.clear_cache()
+        self.assertEqual(b.cache_info().currsize, 1)
+
+        path = a._paths['ITEM']
+        a.reload()
+        self.assertIs(a._paths['ITEM'], path)  # Unchanged, so kept.
+
+        lazy = PathsJSON(src_dir=os.path.join(self.root, "a"),
+                         registry=registry, cache_size=4, lazy=True)
+        self.assertEqual(lazy._paths['ITEM'].cache.maxsize, 4)
+
+    def test_matches_unshared_loading(self):
+        registry = PathsJSONRegistry()
+        for name in ["a", "b"]:
+            src_dir = os.path.join(self.root, name)
+            self.assertEqual(registry.get(src_dir)._paths,
+                             PathsJSON(src_dir=src_dir)._paths)
+
+    def test_env_override_of_globals(self):
+        registry = PathsJSONRegistry(env={"SCRATCH": "/other"})
+        a = registry.get(os.path.join(self.root, "a"))
+        self.assertEqual(a['TMP_DIR'], os.path.join("/other", "me", "tmp"))
+
+    def test_find_is_memoized(self):
+        registry = PathsJSONRegistry()
+        src_dir = os.path.join(self.root, "a", "deep", "er")
+        expected = os.path.join(self.root, "a", ".paths.json")
+        self.assertEqual(registry.find(src_dir), expected)
+
+        os.unlink(expected)
+        self.assertEqual(registry.find(src_dir), expected)
+
+    def test_get_reuses_and_reloads(self):
+        registry = PathsJSONRegistry()
+        src_dir = os.path.join(self.root, "a")
+        a = registry.get(src_dir)
+        self.assertIs(registry.get(src_dir), a)
+
+        self.write({"DATA_DIR": ["elsewhere"]},
+                   os.path.join(src_dir, ".paths.json"))
+        self.assertIs(registry.get(src_dir), a)
+        self.assertEqual(a['DATA_DIR'], "elsewhere")
+
+    def test_get_many(self):
+        registry = PathsJSONRegistry()
+        src_dirs = [os.path.join(self.root, name) for name in "ab"]
+        result = registry.get_many(src_dirs)
+        self.assertEqual(list(result), src_dirs)
+
+        with self.assertRaisesRegexp(IOError, "file found"):
+            PathsJSONRegistry(target_name="missing.json").get(self.root)
+
+
+if __name__ == '__main__':
+    unittest.main()
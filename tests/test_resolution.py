@@ -1,6 +1,7 @@
 import shutil
 import unittest
-from pathsjson.resolution import Resolution
+from pathsjson.resolution import *
+from pathsjson.resolution import _KNOWN_DIRS
 from tests import *
 
 
@@ -19,6 +20,8 @@ class TestResolution(unittest.TestCase):
         c = Resolution("another/path")
         self.assertEqual(hash(a), hash(b))
         self.assertNotEqual(hash(a), hash(c))
+        self.assertEqual(hash(a), hash("some/path"))
+        self.assertEqual(a._hash, hash("some/path"))  # Computed once.
 
     def test_equal(self):
         a = Resolution("some/path")
@@ -27,6 +30,31 @@ class TestResolution(unittest.TestCase):
         self.assertEqual(a, b)
         self.assertNotEqual(a, c)
 
+    def test_fspath(self):
+        for path_str in ["/some/path", "some/path", "path", "/"]:
+            resolution = Resolution(path_str)
+            self.assertIsInstance(resolution, os.PathLike)
+            self.assertEqual(os.fspath(resolution), path_str)
+            self.assertEqual(resolution.path_str, path_str)
+
+    def test_immutable(self):
+        resolution = Resolution("some/path")
+        with self.assertRaisesRegexp(AttributeError, "immutable"):
+            resolution._name = "other"
+        with self.assertRaises(AttributeError):
+            resolution.extra = 1
+        self.assertFalse(hasattr(resolution, "__dict__"))
+
+    def test_shares_directories(self):
+        a = Resolution("".join(["some/", "dir/a"]))
+        b = Resolution("".join(["some/", "dir/b"]))
+        self.assertIs(a._dir, b._dir)
+
+    def test_pickle(self):
+        import pickle
+        resolution = Resolution("some/path")
+        self.assertEqual(pickle.loads(pickle.dumps(resolution)), resolution)
+
     def test_open(self):
         test_dir = os.path.join(SELF_DIR, "fake_env", "open_dir")
         test_path = os.path.join(test_dir, "target.txt")
@@ -50,3 +78,63 @@ class TestResolution(unittest.TestCase):
                 self.assertEqual(fp.read(), msg)
         finally:
             shutil.rmtree(test_dir)
+
+    def test_open_recreates_removed_dir(self):
+        test_dir = os.path.join(SELF_DIR, "fake_env", "open_dir")
+        resolution = Resolution(os.path.join(test_dir, "target.txt"))
+
+        try:
+            with resolution.open("w") as fp:
+                fp.write("a")
+            self.assertIn(test_dir, _KNOWN_DIRS)
+
+            shutil.rmtree(test_dir)
+            with resolution.open("w") as fp:
+                fp.write("b")
+            self.assertTrue(os.path.isdir(test_dir))
+        finally:
+            shutil.rmtree(test_dir)
+
+    def test_open_missing_file_in_known_dir(self):
+        resolution = Resolution(os.path.join(SELF_DIR, "missing.txt"))
+        with self.assertRaises(IOError):
+            with resolution.open("r"):
+                pass
+
+
+class TestEnsureDirs(TempProjectMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.make_project()
+        forget_known_dirs()
+
+    def tearDown(self):
+        forget_known_dirs()
+
+    def test_ensure_dir(self):
+        dir_path = os.path.join(self.root, "a", "b")
+        self.assertTrue(ensure_dir(dir_path))
+        self.assertTrue(os.path.isdir(dir_path))
+        self.assertIn(os.path.join(self.root, "a"), _KNOWN_DIRS)
+        self.assertTrue(ensure_dir(""))
+
+    def test_ensure_dir_failure(self):
+        file_path = os.path.join(self.root, "file")
+        open(file_path, "w").close()
+        self.assertFalse(ensure_dir(os.path.join(file_path, "sub")))
+
+    def test_ensure_dirs(self):
+        a, d = [os.path.join(self.root, name) for name in ["a", "d"]]
+        dir_paths = [a, os.path.join(a, "b"), os.path.join(a, "b", "c"),
+                     os.path.join(a, "b", "c"), d]
+
+        for max_workers in [None, 4]:
+            result = ensure_dirs(dir_paths, max_workers)
+            self.assertEqual(result, [d, os.path.join(a, "b", "c")])
+            self.assertTrue(all(os.path.isdir(p) for p in dir_paths))
+
+    def test_ensure_dirs_failure(self):
+        file_path = os.path.join(self.root, "file")
+        open(file_path, "w").close()
+        with self.assertRaisesRegexp(OSError, "Failed to create"):
+            ensure_dirs([os.path.join(file_path, "sub")])
@@ -0,0 +1,96 @@
+import marshal
+import os
+import pickle
+import subprocess
+import sys
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from pathsjson.impl import PathsJSON
+from pathsjson.snapshot import *
+from tests import *
+
+
+def resolve_attached(name, k, args):
+    return attach(name).resolve_path(k, *args)
+
+
+class TestSnapshot(TempProjectMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.make_project({"__ENV": {"VERSION": "1", "name": None},
+                           "DATA_DIR": ["$$_IMPLICIT_ROOT", "data",
+                                        "$$VERSION"],
+                           "ITEM": ["$DATA_DIR", "$$name"]})
+
+        self.paths = PathsJSON(file_path=self.file_path, cache_size=8,
+                               enable_user_global_overrides=False)
+
+    def assertResolvesLike(self, snapshot, paths):
+        self.assertEqual(list(snapshot), list(paths._paths))
+        self.assertEqual(snapshot.all_resolvable_paths,
+                         paths.all_resolvable_paths)
+        self.assertEqual(snapshot["ITEM", "2", "x"], paths["ITEM", "2", "x"])
+        self.assertEqual(snapshot.resolve("ITEM", name="x"),
+                         paths.resolve("ITEM", name="x"))
+        self.assertEqual(snapshot.resolve_many("ITEM", [{"name": "a"}]),
+                         paths.resolve_many("ITEM", [{"name": "a"}]))
+
+    def test_resolves_like_paths_json(self):
+        snapshot = self.paths.snapshot()
+        self.assertResolvesLike(snapshot, self.paths)
+        self.assertEqual(snapshot.file_path, self.file_path)
+        self.assertEqual(repr(snapshot),
+                         "PathsSnapshot($keys=[DATA_DIR, ITEM])")
+
+    def test_bytes(self):
+        data = self.paths.snapshot().to_bytes()
+        snapshot = PathsSnapshot.from_bytes(data)
+        self.assertResolvesLike(snapshot, self.paths)
+        self.assertEqual(snapshot._paths["ITEM"].cache.maxsize, 8)
+        self.assertNotIn(b"__ENV", data)
+
+        with self.assertRaisesRegexp(ValueError, "format"):
+            PathsSnapshot.from_bytes(marshal.dumps((0, None, [])))
+
+    def test_pickle(self):
+        snapshot = pickle.loads(pickle.dumps(self.paths.snapshot()))
+        self.assertResolvesLike(snapshot, self.paths)
+        self.assertLess(len(pickle.dumps(self.paths.snapshot())),
+                        len(pickle.dumps(self.paths)))
+
+    def test_frozen(self):
+        snapshot = self.paths.snapshot()
+        self.write({"DATA_DIR": ["elsewhere"]})
+        self.paths.reload()
+        self.assertEqual(snapshot["DATA_DIR"],
+                         os.path.join(self.root, "data", "1"))
+
+    @unittest.skipUnless(sys.version_info >= (3, 8), "Python 3.8+")
+    def test_shared_memory(self):
+        with SharedSnapshot(self.paths.snapshot()) as shared:
+            self.assertResolvesLike(attach(shared.name), self.paths)
+
+            with ProcessPoolExecutor(2) as pool:
+                results = list(pool.map(resolve_attached, [shared.name] * 2,
+                                        ["ITEM"] * 2,
+                                        [("1", "a"), ("2", "b")]))
+            self.assertEqual(results, [self.paths["ITEM", "1", "a"],
+                                       self.paths["ITEM", "2", "b"]])
+
+        with self.assertRaises(OSError):
+            attach(shared.name)
+        shared.close()  # Closing twice is fine.
+
+    @unittest.skipUnless(sys.version_info >= (3, 8), "Python 3.8+")
+    def test_attach_from_unrelated_process(self):
+        code = ("import sys; from pathsjson.snapshot import attach; "
+                "print(attach(sys.argv[1])['ITEM', '1', 'a'])")
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(SELF_DIR))
+
+        with SharedSnapshot(self.paths.snapshot()) as shared:
+            # Its own resource tracker mustn't unlink the segment on exit.
+            for _ in range(2):
+                output = subprocess.check_output(
+                    [sys.executable, "-c", code, shared.name], env=env,
+                    universal_newlines=True)
+                self.assertEqual(output.strip(), self.paths["ITEM", "1", "a"])
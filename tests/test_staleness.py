@@ -0,0 +1,92 @@
+import os
+import unittest
+from pathsjson.helpers import ResolveError
+from pathsjson.impl import PathsJSON
+from pathsjson.staleness import *
+from tests import *
+
+
+class TestBuildGraph(TempProjectMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.names = ["raw", "clean", "model", "report", "codebook"]
+        self.make_project({k.upper(): ["$$_IMPLICIT_ROOT", k]
+                           for k in self.names})
+
+        self.paths = PathsJSON(src_dir=self.root,
+                               enable_user_global_overrides=False)
+        self.paths.depends("CLEAN", "RAW")
+        self.paths.depends("MODEL", "CLEAN")
+        self.paths.depends("REPORT", "MODEL", "CODEBOOK")
+
+    def age_path(self, k, age):
+        """Create (or update) the file of a path var `age` seconds ago."""
+        path_str = self.paths[k]
+        with open(path_str, "a"):
+            pass
+        mtime = 10 ** 9 * (1000000 - age)
+        os.utime(path_str, ns=(mtime, mtime))
+        self.paths.build.mark_built(k)
+
+    def test_all_missing(self):
+        self.assertEqual(self.paths.stale(), ["CLEAN", "MODEL", "REPORT"])
+
+    def test_up_to_date(self):
+        for age, k in enumerate(["REPORT", "MODEL", "CODEBOOK", "CLEAN",
+                                 "RAW"]):
+            self.age_path(k, age)
+        self.assertEqual(self.paths.stale(), [])
+
+    def test_propagates(self):
+        for age, k in enumerate(["REPORT", "MODEL", "CODEBOOK", "CLEAN",
+                                 "RAW"]):
+            self.age_path(k, age)
+
+        self.age_path("RAW", -1)
+        self.assertEqual(self.paths.stale(), ["CLEAN", "MODEL", "REPORT"])
+        self.assertEqual(self.paths.stale("MODEL"), ["CLEAN", "MODEL"])
+
+        self.age_path("CLEAN", -2)
+        self.age_path("MODEL", -3)
+        self.assertEqual(self.paths.stale(), ["REPORT"])
+
+    def test_missing_input(self):
+        for k in ["REPORT", "MODEL", "CLEAN"]:
+            self.age_path(k, 0)
+        self.assertEqual(self.paths.stale(), ["CLEAN", "MODEL", "REPORT"])
+
+    def test_restats(self):
+        for age, k in enumerate(["REPORT", "MODEL", "CODEBOOK", "CLEAN",
+                                 "RAW"]):
+            self.age_path(k, age)
+        self.assertEqual(self.paths.stale(), [])
+
+        # Edit an input without telling the graph.
+        mtime = os.stat(self.paths["RAW"]).st_mtime_ns + 10 ** 10
+        os.utime(self.paths["RAW"], ns=(mtime, mtime))
+        self.assertEqual(self.paths.stale(), ["CLEAN", "MODEL", "REPORT"])
+
+    def test_stats_cached(self):
+        build = BuildGraph(self.paths.resolve_path, cache_mtimes=True)
+        build.depends("CLEAN", "RAW")
+        self.assertEqual(build.stale("CLEAN"), ["CLEAN"])
+
+        # Not marked as built, so the cached (missing) stat still holds.
+        with open(self.paths["CLEAN"], "w"):
+            pass
+        self.assertEqual(build.stale("CLEAN"), ["CLEAN"])
+
+        build.refresh()
+        self.assertEqual(build.stale("CLEAN"), ["CLEAN"])  # No RAW
+        self.age_path("RAW", 10)
+        build.mark_built("RAW")
+        self.assertEqual(build.stale("CLEAN"), [])
+
+    def test_cycle(self):
+        self.paths.depends("RAW", "REPORT")
+        with self.assertRaisesRegexp(ResolveError, "cycle"):
+            self.paths.stale()
+
+    def test_rules(self):
+        self.paths.depends("CLEAN", "RAW", "CODEBOOK")
+        self.assertEqual(self.paths.build.rules["CLEAN"], ["RAW", "CODEBOOK"])
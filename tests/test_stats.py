@@ -0,0 +1,93 @@
+import logging
+import os
+import subprocess
+import sys
+import unittest
+from pathsjson.impl import PathsJSON
+from pathsjson.stats import *
+from tests import *
+
+
+_AUDITED = []
+
+
+def _audit_hook(event, args):
+    if event == AUDIT_EVENT:
+        _AUDITED.append(args[0])
+
+
+class TestLoadStats(TempProjectMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.make_project({"__ENV": {"name": None}, "DATA_DIR": ["data"],
+                           "ITEM": ["$DATA_DIR", "$$name"]})
+
+    def make(self, **kwargs):
+        kwargs.setdefault("file_path", self.file_path)
+        return PathsJSON(enable_user_global_overrides=False, **kwargs)
+
+    def test_phases(self):
+        stats = self.make().stats
+        self.assertEqual(list(stats.phases), ["read", "parse", "env",
+                                              "validate", "expand", "paths"])
+        self.assertAlmostEqual(stats.total, sum(stats.phases.values()))
+        self.assertEqual((stats.file_path, stats.n_keys, stats.loads),
+                         (self.file_path, 2, 1))
+
+        lazy_stats = self.make(lazy=True).stats
+        self.assertEqual(list(lazy_stats.phases)[-1], "index")
+
+    def test_find_on_first_load(self):
+        paths = self.make(file_path=None, src_dir=self.root)
+        self.assertEqual(list(paths.stats.phases)[0], "find")
+
+        paths.reload()
+        self.assertNotIn("find", paths.stats.phases)
+        self.assertEqual(paths.stats.loads, 2)
+
+    def test_compiled(self):
+        cache_dir = os.path.join(self.root, "cache")
+        self.make(compiled_cache=cache_dir)
+        stats = self.make(compiled_cache=cache_dir).stats
+        self.assertTrue(stats.compiled)
+        self.assertEqual(list(stats.phases), ["read", "compiled"])
+
+    def test_resolves(self):
+        paths = self.make()
+        paths["DATA_DIR"]
+        paths.resolve_path("ITEM", "x")
+        paths.resolve("ITEM", "y")
+        paths.resolve_many("ITEM", ["a", "b"])
+        self.assertEqual(paths.stats.resolves, 5)
+
+    def test_on_load(self):
+        loaded = []
+        paths = self.make(on_load=loaded.append)
+        paths.reload()
+        self.assertEqual(loaded, [paths.stats, paths.stats])
+
+    @unittest.skipUnless(hasattr(sys, "addaudithook"), "Python 3.8+")
+    def test_audit_event(self):
+        sys.addaudithook(_audit_hook)  # Can't be removed, so it filters.
+        del _AUDITED[:]
+        paths = self.make()
+        self.assertEqual(_AUDITED, [paths.stats])
+
+    def test_logging(self):
+        with self.assertLogs(LOGGER_NAME, logging.DEBUG) as logs:
+            self.make()
+        self.assertIn(self.file_path, logs.output[0])
+        self.assertIn("total", logs.output[0])
+
+    def test_cli_profile(self):
+        env = dict(os.environ, PWD=TWITTER_DIR,
+                   PYTHONPATH=os.path.dirname(SELF_DIR))
+        env.pop('PATHSJSON_COMPILED_CACHE', None)
+        proc = subprocess.Popen([sys.executable, "-m", "pathsjson.cli",
+                                 "--profile", "--shell-exports"],
+                                env=env, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE,
+                                universal_newlines=True)
+        _, err = proc.communicate()
+        self.assertEqual(proc.returncode, 0)
+        self.assertIn("total", err)
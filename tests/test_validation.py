@@ -0,0 +1,50 @@
+import unittest
+from pathsjson.validation import *
+from tests import *
+
+
+class TestValidation(unittest.TestCase):
+
+    def test_validate_structure_accepts_sample(self):
+        self.assertIs(validate_structure(SAMPLE_DATA), SAMPLE_DATA)
+
+    def test_validate_structure_accepts_null_env(self):
+        validate_structure({'__ENV': {'VERSION': None}, 'A': ['a']})
+
+    def test_validate_structure_rejects_bad_env(self):
+        with self.assertRaisesRegexp(ValidationError, "__ENV.VERSION"):
+            validate_structure({'__ENV': {'VERSION': 1}})
+
+        with self.assertRaisesRegexp(ValidationError, "__ENV must be"):
+            validate_structure({'__ENV': []})
+
+    def test_validate_structure_rejects_bad_paths(self):
+        with self.assertRaisesRegexp(ValidationError, "A must be"):
+            validate_structure({'A': 'a'})
+
+        with self.assertRaisesRegexp(ValidationError, "A must be"):
+            validate_structure({'A': ['a', 1]})
+
+    def test_validate_structure_rejects_non_object(self):
+        with self.assertRaises(ValidationError):
+            validate_structure([])
+
+    def test_schema_validator_is_reused(self):
+        self.assertIs(get_schema_validator(), get_schema_validator())
+
+    def test_validate_modes(self):
+        bad = {'A': 'a'}
+        self.assertIs(validate(bad, False), bad)
+
+        with self.assertRaises(ValidationError):
+            validate(bad)
+
+        import jsonschema
+        with self.assertRaises(jsonschema.ValidationError):
+            validate(bad, 'strict')
+
+        self.assertIs(validate(SAMPLE_DATA, 'strict'), SAMPLE_DATA)
+
+
+if __name__ == '__main__':
+    unittest.main()